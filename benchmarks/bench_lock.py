@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark concurrent readers and writers of an application lock.
+
+Usage: ``python benchmarks/bench_lock.py [threads] [rounds] [hold]``
+
+Every acquisition holds the lock for `hold` seconds while sleeping (which releases
+the GIL, like I/O or native code would), so the results show how much holding the
+'read' lock lets readers overlap compared to the exclusive 'write' lock.
+"""
+
+import sys
+import time
+from threading import Thread
+
+from objetto._applications import ApplicationLock
+
+
+def run_threads(targets):
+    """Run targets in threads and get how long it took for all of them to finish."""
+    threads = [Thread(target=target) for target in targets]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start
+
+
+def bench_readers(threads, rounds, hold, shared):
+    """Acquire the lock for reading (shared) or writing (exclusive) in every thread."""
+    lock = ApplicationLock()
+
+    def read():
+        for _ in range(rounds):
+            if shared:
+                with lock.read_context():
+                    time.sleep(hold)
+            else:
+                with lock:
+                    time.sleep(hold)
+
+    return run_threads([read] * threads)
+
+
+def bench_mixed(threads, rounds, hold):
+    """Acquire the lock for reading in every thread but one, which writes."""
+    lock = ApplicationLock()
+    waits = []
+
+    def read():
+        for _ in range(rounds):
+            with lock.read_context():
+                time.sleep(hold)
+
+    def write():
+        for _ in range(rounds):
+            start = time.time()
+            with lock:
+                waits.append(time.time() - start)
+                time.sleep(hold)
+
+    duration = run_threads([read] * (threads - 1) + [write])
+    return duration, max(waits)
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    hold = float(sys.argv[3]) if len(sys.argv) > 3 else 0.001
+    acquisitions = threads * rounds
+    print(
+        "{} exclusive reads: {:.3f}s".format(
+            acquisitions, bench_readers(threads, rounds, hold, False)
+        )
+    )
+    print(
+        "{} shared reads: {:.3f}s".format(
+            acquisitions, bench_readers(threads, rounds, hold, True)
+        )
+    )
+    duration, max_wait = bench_mixed(threads, rounds, hold)
+    print(
+        "{} mixed reads/writes: {:.3f}s (max writer wait {:.3f}s)".format(
+            acquisitions, duration, max_wait
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
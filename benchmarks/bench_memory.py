@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark memory used per object in an :class:`objetto.applications.Application`.
+
+Usage: ``python benchmarks/bench_memory.py [objects]``
+
+Memory is measured with :mod:`tracemalloc` (Python 3 only), after initializing all
+objects in a single 'write' context and collecting garbage.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from objetto import Application, Object, attribute
+
+
+class Item(Object):
+    """Object with one attribute."""
+
+    value = attribute(int, default=0)
+
+
+def bench_memory(objects):
+    """Measure bytes per object (including its store and its data)."""
+    app = Application()
+    Item(app)  # warm up caches
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    with app.write_context():
+        items = [Item(app) for _ in range(objects)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(items) == objects
+    return float(after - before) / objects
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start = time.time()
+    per_object = bench_memory(objects)
+    print(
+        "{} objects: {:.0f} bytes per object ({:.3f}s)".format(
+            objects, per_object, time.time() - start
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
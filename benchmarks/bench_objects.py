@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark object storage lookups in an :class:`objetto.applications.Application`.
+
+Usage: ``python benchmarks/bench_objects.py [objects] [rounds]``
+"""
+
+import sys
+import time
+
+from objetto import Application, Object, attribute
+
+
+class Item(Object):
+    """Object with one attribute."""
+
+    value = attribute(int, default=0)
+
+
+def bench_reads(items, rounds):
+    """Read every object inside of a single read context."""
+    app = items[0].app
+    start = time.time()
+    with app.read_context():
+        for _ in range(rounds):
+            for item in items:
+                item.value
+    return time.time() - start
+
+
+def bench_writes(items, rounds):
+    """Write every object inside of a single write context."""
+    app = items[0].app
+    start = time.time()
+    with app.write_context():
+        for i in range(rounds):
+            for item in items:
+                item.value = i
+    return time.time() - start
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    app = Application()
+    start = time.time()
+    with app.write_context():
+        items = [Item(app) for _ in range(objects)]
+    print("{} inits: {:.3f}s".format(objects, time.time() - start))
+    print("{} reads: {:.3f}s".format(objects * rounds, bench_reads(items, rounds)))
+    print("{} writes: {:.3f}s".format(objects * rounds, bench_writes(items, rounds)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,39 +2,46 @@
 """Manages multiple objects under different contexts."""
 
 from collections import Counter as ValueCounter
+from collections import deque
+from concurrent.futures import Future
 from contextlib import contextmanager
 from copy import deepcopy
 from enum import Enum, unique
 from inspect import getmro
-from threading import RLock
+from threading import Condition, Lock, Thread, local
+from timeit import default_timer
 from traceback import format_exception
-from typing import TYPE_CHECKING, TypeVar, cast, overload
-from weakref import WeakKeyDictionary
+from types import TracebackType
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple, TypeVar, cast, overload
+from weakref import WeakKeyDictionary, ref
 
+try:
+    from threading import get_ident
+except ImportError:
+    from thread import get_ident  # type: ignore
+
+from pyrsistent import pmap
 from six import iteritems, itervalues, raise_from, with_metaclass
 
 from ._bases import Base, BaseMeta, Generic, final
-from ._changes import BaseChange
-from ._constants import BASE_STRING_TYPES, STRING_TYPES
-from ._data import BaseData, InteractiveDictData
+from ._changes import BaseChange, DictUpdate, Update
+from ._constants import BASE_STRING_TYPES
+from ._data import BaseData, InteractiveDictData, InteractiveSetData
+from ._digests import ActionDigestBuilder
 from ._exceptions import BaseObjettoException
-from ._states import BaseState, DictState
+from ._states import BaseState, DictState, ListState, SetState
 from .data import (
     Data,
-    DictData,
-    InteractiveData,
     ListData,
     data_attribute,
-    data_dict_attribute,
-    data_protected_dict_attribute,
     data_protected_list_attribute,
-    data_set_attribute,
 )
 from .utils.custom_repr import custom_mapping_repr
 from .utils.factoring import format_factory, run_factory
 from .utils.recursive_repr import recursive_repr
 from .utils.reraise_context import ReraiseContext
-from .utils.storage import Storage
+from .utils.storage import SlotAllocator, SlotStorage
+from .utils.subject_observer import ObserverLanes
 from .utils.type_checking import (
     assert_is_callable,
     assert_is_instance,
@@ -47,25 +54,32 @@ if TYPE_CHECKING:
         AbstractSet,
         Any,
         Callable,
+        ContextManager,
         Counter,
+        Deque,
         Dict,
-        Final,
+        FrozenSet,
+        Iterable,
         Iterator,
         List,
         Mapping,
         MutableMapping,
-        Optional,
         Set,
-        Tuple,
         Type,
         Union,
     )
 
+    from pyrsistent.typing import PMap, PMapEvolver
+
     from ._changes import BaseAtomicChange, Batch
-    from ._data import InteractiveSetData
+    from ._change_feed import ApplicationChangeFeed, ChangeRecord
     from ._history import HistoryObject
     from ._objects import BaseObject, Relationship
-    from ._observers import ActionObserverExceptionData, InternalObserver
+    from ._observers import (
+        ActionObserver,
+        ActionObserverExceptionData,
+        InternalObserver,
+    )
     from .utils.factoring import LazyFactory
     from .utils.subject_observer import ObserverExceptionInfo
 
@@ -80,11 +94,14 @@ if TYPE_CHECKING:
     ReadMetadataFunction = Callable[[], InteractiveDictData]
     UpdateMetadataFunction = Callable[[Mapping[str, Any]], None]
 
+    ObserverAwaitable = Tuple[ActionObserver, "ActionRecord", "Phase", Any]
+
 __all__ = [
     "ActionObserversFailedError",
     "RejectChangeException",
     "Phase",
     "Action",
+    "ActionRecord",
     "Store",
     "BO",
     "ApplicationMeta",
@@ -92,6 +109,9 @@ __all__ = [
     "ApplicationRoot",
     "ApplicationProperty",
     "ApplicationSnapshot",
+    "ApplicationSnapshotDiff",
+    "ApplicationFork",
+    "ApplicationAsyncContext",
 ]
 
 
@@ -125,10 +145,17 @@ class ActionObserversFailedError(BaseObjettoException):
                 + "\n\n"
                 + "\n".join(
                     (
-                        ("Observer: {}\n" "Change: {}\n" "Phase: {}\n").format(
-                            exception_info.observer,
-                            type(exception_info.action.change).__fullname__,
-                            exception_info.phase.name,
+                        (
+                            ("Observer: {}\n" "Change: {}\n" "Phase: {}\n").format(
+                                exception_info.observer,
+                                type(exception_info.action.change).__fullname__,
+                                exception_info.phase.name,
+                            )
+                            if exception_info.digest is None
+                            else ("Observer: {}\n" "Digest: {}\n").format(
+                                exception_info.observer,
+                                exception_info.digest.receiver,
+                            )
                         )
                         + "".join(
                             format_exception(
@@ -216,21 +243,55 @@ class TemporaryContextException(BaseObjettoException):
     """Temporary write context exception."""
 
 
-class ApplicationLock(Base):
+def _running_loop():
+    # type: () -> Any
     """
-    Re-entrant threading lock for thread-safe applications.
+    Get the asyncio event loop running in the current thread.
 
-      - Can be deep copied and pickled.
+    :return: Event loop or None.
     """
+    import asyncio
 
-    __slots__ = ("__lock",)
+    try:
+        get_running_loop = asyncio.get_running_loop
+    except AttributeError:
+        return asyncio._get_running_loop()
+    try:
+        return get_running_loop()
+    except RuntimeError:
+        return None
 
-    def __init__(self):
-        # type: () -> None
-        self.__lock = RLock()
+
+def _current_task():
+    # type: () -> Any
+    """
+    Get the asyncio task running in the current thread.
+
+    :return: Task or None.
+    """
+    import asyncio
+
+    try:
+        current_task = asyncio.current_task
+    except AttributeError:
+        return asyncio.Task.current_task()
+    try:
+        return current_task()
+    except RuntimeError:
+        return None
+
+
+# noinspection PyTypeChecker
+_FC = TypeVar("_FC", bound="_FreshCopy")
+
+
+class _FreshCopy(object):
+    """Deep copies and pickles as a new instance (initialized with no arguments)."""
+
+    __slots__ = ()
 
     def __deepcopy__(self, memo=None):
-        # type: (Optional[Dict[int, Any]]) -> ApplicationLock
+        # type: (_FC, Optional[Dict[int, Any]]) -> _FC
         """
         Make a deep copy.
 
@@ -245,16 +306,8 @@ class ApplicationLock(Base):
             deep_copy = memo[id(self)] = type(self)()
         return deep_copy
 
-    def __enter__(self):
-        """Enter lock context."""
-        return self.__lock.__enter__()
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Exit lock context."""
-        return self.__lock.__exit__(exc_type, exc_val, exc_tb)
-
     def __reduce__(self):
-        # type: () -> Tuple[Type[ApplicationLock], Tuple]
+        # type: (_FC) -> Tuple[Type[_FC], Tuple]
         """
         Reduce for pickling.
 
@@ -263,52 +316,433 @@ class ApplicationLock(Base):
         return type(self), ()
 
 
-class Store(InteractiveData):
-    """Holds an object's state, data, metadata, hierarchy, and history information."""
-
-    state = data_attribute(BaseState, subtypes=True, checked=False)  # type: BaseState
-    """State."""
-
-    data = data_attribute(
-        (BaseData, None), subtypes=True, checked=False
-    )  # type: Optional[BaseData]
-    """Data."""
-
-    metadata = data_dict_attribute(
-        key_types=STRING_TYPES, checked=False
-    )  # type: InteractiveDictData[str, Any]
-    """Metadata."""
-
-    parent_ref = data_attribute(
-        cast("Type[WeakReference[BaseObject]]", WeakReference),
-        checked=False,
-        default=WeakReference(),
-    )  # type: WeakReference[BaseObject]
-    """Weak reference to the parent."""
-
-    history_provider_ref = data_attribute(
-        cast("Type[WeakReference[BaseObject]]", WeakReference),
-        checked=False,
-        default=WeakReference(),
-    )  # type: WeakReference[BaseObject]
-    """Weak reference to the history provider."""
-
-    last_parent_history_ref = data_attribute(
-        cast("Type[WeakReference[HistoryObject]]", WeakReference),
-        checked=False,
-        default=WeakReference(),
-    )  # type: WeakReference[HistoryObject]
-    """Weak reference to the last history object."""
-
-    history = data_attribute(
-        (".._history|HistoryObject", None), checked=False, default=None
-    )  # type: HistoryObject
-    """History object."""
-
-    children = data_set_attribute(
-        ".._objects|BaseObject", subtypes=True, checked=False
-    )  # type: InteractiveSetData[BaseObject]
-    """Children."""
+class ApplicationLock(Base, _FreshCopy):
+    """
+    Re-entrant reader-writer threading lock for thread-safe applications.
+
+      - Allows many simultaneous readers or a single writer.
+      - A thread holding the 'write' lock can also acquire the 'read' lock.
+      - A thread holding the 'read' lock can upgrade to the 'write' lock as long as
+        no other thread is also trying to upgrade.
+      - Entering it as a context manager acquires the 'write' lock.
+      - Can be deep copied and pickled.
+    """
+
+    __slots__ = (
+        "__condition",
+        "__readers",
+        "__writer",
+        "__writer_count",
+        "__writers_waiting",
+        "__upgrading",
+    )
+
+    def __init__(self):
+        # type: () -> None
+        self.__condition = Condition(Lock())
+        self.__readers = {}  # type: Dict[int, int]
+        self.__writer = None  # type: Optional[int]
+        self.__writer_count = 0
+        self.__writers_waiting = 0
+        self.__upgrading = None  # type: Optional[int]
+
+    def __enter__(self):
+        """Enter 'write' lock context."""
+        self.acquire_write()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Exit 'write' lock context."""
+        self.release_write()
+
+    def acquire_read(self, blocking=True):
+        # type: (bool) -> bool
+        """
+        Acquire the 'read' lock, waiting for writers to finish.
+
+        :param blocking: Whether to wait (if False, fail if it can't acquire now).
+        :return: True if acquired.
+        """
+        ident = get_ident()
+        with self.__condition:
+            if self.__writer == ident or ident in self.__readers:
+                self.__readers[ident] = self.__readers.get(ident, 0) + 1
+                return True
+            while self.__writer is not None or self.__writers_waiting:
+                if not blocking:
+                    return False
+                self.__condition.wait()
+            self.__readers[ident] = 1
+            return True
+
+    def release_read(self):
+        # type: () -> None
+        """
+        Release the 'read' lock.
+
+        :raises RuntimeError: Lock not acquired for reading by this thread.
+        """
+        ident = get_ident()
+        with self.__condition:
+            count = self.__readers.get(ident, 0)
+            if not count:
+                error = "can't release un-acquired 'read' lock"
+                raise RuntimeError(error)
+            if count == 1:
+                del self.__readers[ident]
+                self.__condition.notify_all()
+            else:
+                self.__readers[ident] = count - 1
+
+    def acquire_write(self, blocking=True):
+        # type: (bool) -> bool
+        """
+        Acquire the 'write' lock, waiting for readers and writers to finish.
+
+        :param blocking: Whether to wait (if False, fail if it can't acquire now).
+        :return: True if acquired.
+        :raises RuntimeError: Another thread is already upgrading to 'write'.
+        """
+        ident = get_ident()
+        with self.__condition:
+            if self.__writer == ident:
+                self.__writer_count += 1
+                return True
+            max_readers = 1 if ident in self.__readers else 0
+            if not blocking:
+                if self.__writer is not None or len(self.__readers) > max_readers:
+                    return False
+                self.__writer = ident
+                self.__writer_count = 1
+                return True
+            if max_readers:
+                if self.__upgrading is not None:
+                    error = (
+                        "can't upgrade from 'read' to 'write' lock while another "
+                        "thread is also upgrading"
+                    )
+                    raise RuntimeError(error)
+                self.__upgrading = ident
+            self.__writers_waiting += 1
+            try:
+                while self.__writer is not None or len(self.__readers) > max_readers:
+                    self.__condition.wait()
+            finally:
+                self.__writers_waiting -= 1
+                if max_readers:
+                    self.__upgrading = None
+            self.__writer = ident
+            self.__writer_count = 1
+            return True
+
+    def release_write(self):
+        # type: () -> None
+        """
+        Release the 'write' lock.
+
+        :raises RuntimeError: Lock not acquired for writing by this thread.
+        """
+        with self.__condition:
+            if self.__writer != get_ident():
+                error = "can't release un-acquired 'write' lock"
+                raise RuntimeError(error)
+            self.__writer_count -= 1
+            if not self.__writer_count:
+                self.__writer = None
+                self.__condition.notify_all()
+
+    @contextmanager
+    def read_context(self):
+        # type: () -> Iterator
+        """
+        Context manager that holds the 'read' lock.
+
+        :return: Context manager.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+
+class ApplicationLocal(_FreshCopy, local):
+    """
+    Per-thread application state.
+
+      - Can be deep copied and pickled (always as a fresh state).
+
+    :ivar locked: How many locked contexts the current thread is in.
+    :ivar reading: Objects being read by the current thread.
+    :ivar storage: Storage pinned by the current thread's lock-free read context.
+    :ivar shards: Roots locked by the current thread (`None` if locked exclusively).
+    :ivar histories: Histories of objects guarded by the roots locked.
+    :ivar writing: Objects being written by the current thread.
+    :ivar journal: Current thread's transaction journal.
+    :ivar overlay: Stores being delivered to observers by the current thread.
+    :ivar busy_writing: Objects with a 'write' operation in progress.
+    :ivar busy_hierarchy: Objects whose parent can't change at the moment.
+    :ivar bulk_loading: How many bulk load contexts the current thread is in.
+    :ivar bulk_objects: Objects changed while bulk loading.
+    :ivar task: Asyncio task that owns the current thread's contexts, if any.
+    :ivar awaitables: Awaitables returned by observers to the asynchronous context.
+    :ivar deliveries: Items to put in queues once the current transaction is merged.
+    :ivar queued: Queues to wait for once the current thread releases locks.
+    :ivar reparented: Objects reparented in the current transaction (by journal index).
+    :ivar fork: Fork the current thread is working on (`None` if not in a fork).
+    :ivar snapshot: Snapshot being read by the current thread.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.locked = 0
+        self.reading = []  # type: List[Optional[BaseObject]]
+        self.storage = None  # type: Optional[SlotStorage[BaseObject, Store]]
+        self.shards = None  # type: Optional[FrozenSet[BaseObject]]
+        self.histories = set()  # type: Set[HistoryObject]
+        self.writing = []  # type: List[Optional[BaseObject]]
+        self.journal = Journal()
+        self.overlay = None  # type: Optional[PMap[int, Tuple[BaseObject, Store]]]
+        self.busy_writing = set()  # type: Set[BaseObject]
+        self.busy_hierarchy = ValueCounter()  # type: Counter[BaseObject]
+        self.bulk_loading = 0
+        self.bulk_objects = set()  # type: Set[BaseObject]
+        self.task = None  # type: Any
+        self.awaitables = None  # type: Optional[List[ObserverAwaitable]]
+        self.deliveries = {}  # type: Dict[Any, List[Any]]
+        self.queued = []  # type: List[Any]
+        self.reparented = []  # type: List[Tuple[int, BaseObject]]
+        self.fork = None  # type: Optional[ApplicationFork]
+        self.snapshot = None  # type: Optional[ApplicationSnapshot]
+
+
+class ApplicationWriteQueue(Base, _FreshCopy):
+    """
+    Queue of callables to be executed by a single writer thread.
+
+      - Groups queued callables into one outermost 'write' context (group commit).
+      - Runs each callable inside its own nested 'write' context (savepoint), so an
+        exception only rolls back the changes made by that callable.
+      - Resolves futures only after the group's changes are pushed, or fails all of
+        them if the group's changes get rolled back.
+      - Raises observer failures in the writer thread (after resolving futures, in a
+        new writer thread if there are callables left), since changes are merged.
+      - Can be deep copied and pickled (always as an empty queue).
+    """
+
+    __slots__ = ("__lock", "__queue", "__running")
+
+    max_group = 64
+    """Maximum number of callables per group."""
+
+    def __init__(self):
+        # type: () -> None
+        self.__lock = Lock()
+        self.__queue = deque()  # type: Deque[Tuple[Future, Callable, Tuple, Dict]]
+        self.__running = False
+
+    def __run(self, internals):
+        # type: (ApplicationInternals) -> None
+        """
+        Commit groups until the queue is empty.
+
+        :param internals: Application internals.
+        :raises ActionObserversFailedError: External observers raised exceptions.
+        """
+        while True:
+            with self.__lock:
+                if not self.__queue:
+                    self.__running = False
+                    return
+            try:
+                error = self.__commit(internals)
+            except BaseException:
+                self.__hand_over(internals)
+                raise
+            if error is not None:
+                self.__hand_over(internals)
+                raise error
+
+    def __hand_over(self, internals):
+        # type: (ApplicationInternals) -> None
+        """
+        Start a new writer thread if there are callables left, before this one exits.
+
+        :param internals: Application internals.
+        """
+        with self.__lock:
+            if self.__queue:
+                self.__start(internals)
+            else:
+                self.__running = False
+
+    def __start(self, internals):
+        # type: (ApplicationInternals) -> None
+        """
+        Start a writer thread.
+
+        :param internals: Application internals.
+        """
+        thread = Thread(target=self.__run, args=(internals,))
+        thread.daemon = True
+        thread.start()
+
+    def __commit(self, internals):
+        # type: (ApplicationInternals) -> Optional[ActionObserversFailedError]
+        """
+        Execute a group of queued callables in a single outermost 'write' context.
+
+        The group is only taken from the queue after the lock is acquired, so that
+        callables queued while waiting for it are part of the same group.
+
+        :param internals: Application internals.
+        :return: Observer failures after the group's changes were merged (if any).
+        :raises BaseException: Exceptions that are not an :class:`Exception` get \
+re-raised (after failing the whole group).
+        """
+        error = None  # type: Optional[ActionObserversFailedError]
+        group = []  # type: List[Tuple[Future, Callable, Tuple, Dict]]
+        started = set()  # type: Set[Future]
+        outcomes = []  # type: List[Tuple[Future, bool, Any]]
+        try:
+            with internals.write_context():
+                with self.__lock:
+                    while self.__queue and len(group) < self.max_group:
+                        group.append(self.__queue.popleft())
+                for future, func, args, kwargs in group:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    started.add(future)
+                    try:
+                        with internals.write_context():
+                            result = func(*args, **kwargs)
+                    except Exception as e:
+                        outcomes.append((future, False, e))
+                    else:
+                        outcomes.append((future, True, result))
+        except ActionObserversFailedError as e:
+            # Only raised by the push after merging, so the outcomes still stand.
+            error = e
+        except BaseException as e:
+            # The group's changes were rolled back, fail all of its callables.
+            for future, _, _, _ in group:
+                if future in started or future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            if isinstance(e, Exception):
+                return None
+            raise
+        for future, success, value in outcomes:
+            if success:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        return error
+
+    def submit(
+        self,
+        internals,  # type: ApplicationInternals
+        func,  # type: Callable
+        args,  # type: Tuple
+        kwargs,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> Future
+        """
+        Queue a callable, starting the writer thread if it's not running.
+
+        :param internals: Application internals.
+        :param func: Callable.
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+        :return: Future.
+        """
+        future = Future()  # type: Future
+        with self.__lock:
+            self.__queue.append((future, func, args, kwargs))
+            if not self.__running:
+                self.__running = True
+                self.__start(internals)
+        return future
+
+
+_EMPTY_REF = WeakReference()  # type: WeakReference[Any]
+_EMPTY_METADATA = InteractiveDictData()  # type: InteractiveDictData[str, Any]
+_EMPTY_CHILDREN = InteractiveSetData()  # type: InteractiveSetData[BaseObject]
+
+
+# noinspection PyUnresolvedReferences
+class Store(
+    NamedTuple(
+        "Store",
+        (
+            ("state", BaseState),
+            ("data", Optional[BaseData]),
+            ("metadata", "InteractiveDictData[str, Any]"),
+            ("parent_ref", "WeakReference[BaseObject]"),
+            ("history_provider_ref", "WeakReference[BaseObject]"),
+            ("last_parent_history_ref", "WeakReference[HistoryObject]"),
+            ("history", "Optional[HistoryObject]"),
+            ("children", "InteractiveSetData[BaseObject]"),
+        ),
+    )
+):
+    """
+    Holds an object's state, data, metadata, hierarchy, and history information.
+
+    :param state: State.
+    :param data: Data.
+    :param metadata: Metadata.
+    :param parent_ref: Weak reference to the parent.
+    :param history_provider_ref: Weak reference to the history provider.
+    :param last_parent_history_ref: Weak reference to the last history object.
+    :param history: History object.
+    :param children: Children.
+    """
+
+    __slots__ = ()
+
+    def __new__(
+        cls,
+        state,  # type: BaseState
+        data=None,  # type: Optional[BaseData]
+        metadata=_EMPTY_METADATA,  # type: InteractiveDictData[str, Any]
+        parent_ref=_EMPTY_REF,  # type: WeakReference[BaseObject]
+        history_provider_ref=_EMPTY_REF,  # type: WeakReference[BaseObject]
+        last_parent_history_ref=_EMPTY_REF,  # type: WeakReference[HistoryObject]
+        history=None,  # type: Optional[HistoryObject]
+        children=_EMPTY_CHILDREN,  # type: InteractiveSetData[BaseObject]
+    ):
+        # type: (...) -> Store
+        return super(Store, cls).__new__(
+            cls,
+            state,
+            data,
+            metadata,
+            parent_ref,
+            history_provider_ref,
+            last_parent_history_ref,
+            history,
+            children,
+        )
+
+    def set(self, name, value):
+        # type: (str, Any) -> Store
+        """
+        Get new store with a field replaced.
+
+        :param name: Field name.
+        :param value: Value.
+        :return: New store.
+        """
+        return self._replace(**{name: value})
+
+    def update(self, update):
+        # type: (Mapping[str, Any]) -> Store
+        """
+        Get new store with fields replaced.
+
+        :param update: Field names and values.
+        :return: New store.
+        """
+        return self._replace(**update)
 
 
 @final
@@ -355,136 +789,106 @@ class Action(Data):
     """
 
 
-class Commit(Data):
-    """Holds unmerged, modified stores."""
-
-    actions = data_protected_list_attribute(
-        Action, checked=False, finalized=True
-    )  # type: Final[ListData[Action]]
-    """Actions."""
-
-    stores = data_protected_dict_attribute(
-        Store,
-        checked=False,
-        key_types=".._objects|BaseObject",
-        key_subtypes=True,
-    )  # type: Final[DictData[BaseObject, Store]]
-    """Modified stores."""
-
-
-@final
-class BatchCommit(Commit):
-    """Batch commit."""
-
-    phase = data_attribute(Phase, checked=False)  # type: Phase
-    """Batch phase."""
-
-
-# noinspection PyTypeChecker
-_AR = TypeVar("_AR", bound="ApplicationRoot")
-
-# noinspection PyTypeChecker
-BO = TypeVar("BO", bound="BaseObject")
-
-
-@final
-class ApplicationRoot(Base, Generic[BO]):
+# noinspection PyUnresolvedReferences
+class ActionRecord(
+    NamedTuple(
+        "ActionRecord",
+        (
+            ("sender", "BaseObject"),
+            ("receiver", "BaseObject"),
+            ("locations", "Tuple[Any, ...]"),
+            ("change", BaseChange),
+        ),
+    )
+):
     """
-    Describes a root object that gets initialized with the application.
-
-    .. note::
-        Prefer using the :func:`objetto.applications.root` factory over
-        instantiating :class:`objetto.applications.ApplicationRoot` directly.
+    Lightweight, tuple-backed record of an :class:`objetto.objects.Action`.
 
-    Inherits from:
-      - :class:`objetto.bases.Base`
+    This is what reactions and action observers receive. It exposes the same public
+    attributes as the action it describes, but locations are stored as a tuple.
+    A full :class:`objetto.objects.Action` gets built on demand whenever `Data`
+    semantics are required (hashing, comparison, serialization, `_update`, etc).
 
-    :param obj_type: Object type.
-    :type obj_type: type[objetto.bases.BaseObject]
+    .. code:: python
 
-    :param priority: Initialization priority.
-    :type priority: int or None
+        >>> from objetto import Application, Object, attribute
+        >>> from objetto.objects import Action, ActionRecord
+        >>> from objetto.changes import Batch
 
-    :param kwargs: Keyword arguments to be passed to the object's `__init__`.
+        >>> class MyObject(Object):
+        ...     name = attribute(str, default="foo")
+        ...
+        >>> app = Application()
+        >>> obj = MyObject(app)
+        >>> change = Batch(name="My Batch", obj=obj)
+        >>> record = ActionRecord(obj, obj, (), change)
+        >>> record.locations
+        ()
+        >>> isinstance(record.to_action(), Action)
+        True
+        >>> record == record.to_action()
+        True
+        >>> list(record._update(locations=("name",)).locations)
+        ['name']
 
-    :raises ValueError: Used reserved keyword argument.
-    :raises TypeError: Invalid object type.
+    :param sender: Object where the action originated from.
+    :param receiver: Object relaying the action up the hierarchy.
+    :param locations: Relative locations from the receiver to the sender.
+    :param change: Change that happened in the sender.
     """
 
-    __slots__ = ("__obj_type", "__priority", "__kwargs")
-
-    def __init__(self, obj_type, priority=None, **kwargs):
-        # type: (Type[BO], Optional[int], Any) -> None
-
-        # Check kwargs for reserved keys.
-        if "app" in kwargs:
-            error = "can't use reserved keyword argument 'app'"
-            raise ValueError(error)
-
-        from ._objects import BaseObject
-
-        with ReraiseContext(TypeError, "'obj_type' parameter"):
-            assert_is_subclass(obj_type, BaseObject)
-        self.__obj_type = obj_type
-        self.__priority = priority
-        self.__kwargs = DictState(kwargs)
-
-    @overload
-    def __get__(self, instance, owner):
-        # type: (_AR, None, Type[Application]) -> _AR
-        pass
-
-    @overload
-    def __get__(self, instance, owner):
-        # type: (Application, Type[Application]) -> BO
-        pass
-
-    @overload
-    def __get__(self, instance, owner):
-        # type: (_AR, object, type) -> _AR
-        pass
+    __slots__ = ()
 
-    def __get__(self, instance, owner):
+    def __getattr__(self, name):
+        # type: (str) -> Any
         """
-        Get attribute value when accessing from valid instance or this descriptor
-        otherwise.
-
-        :param instance: Instance.
-        :type instance: objetto.applications.Application or None
+        Get other attributes from the full action.
 
-        :param owner: Owner class.
-        :type owner: type[objetto.applications.Application]
-
-        :return: Object instance or this descriptor.
-        :rtype: objetto.bases.BaseObject or objetto.applications.ApplicationRoot
+        :param name: Attribute name.
+        :return: Attribute value.
+        :raises AttributeError: No such attribute.
         """
-        if instance is not None and isinstance(instance, Application):
-            return instance.__.get_root_obj(self)
-        return self
+        if name.startswith("__") and name.endswith("__"):
+            error = "'{}' object has no attribute '{}'".format(
+                type(self).__name__, name
+            )
+            raise AttributeError(error)
+        return getattr(self.to_action(), name)
 
     def __hash__(self):
         # type: () -> int
         """
-        Get hash based on object id.
+        Get hash of the full action.
 
-        :return: Hash based on object id.
+        :return: Hash.
         :rtype: int
         """
-        return hash(id(self))
+        return hash(self.to_action())
 
     def __eq__(self, other):
         # type: (object) -> bool
         """
-        Compare with another object for identity.
+        Compare with another record or action.
 
         :param other: Another object.
+        :return: True if equal.
+        :rtype: bool
+        """
+        if isinstance(other, ActionRecord):
+            other = other.to_action()
+        return self.to_action() == other
 
-        :return: True if the same object.
+    def __ne__(self, other):
+        # type: (object) -> bool
+        """
+        Compare for inequality.
+
+        :param other: Another object.
+        :return: True if not equal.
         :rtype: bool
         """
-        return other is self
+        return not self.__eq__(other)
 
-    @recursive_repr
     def __repr__(self):
         # type: () -> str
         """
@@ -494,34 +898,473 @@ class ApplicationRoot(Base, Generic[BO]):
         :rtype: str
         """
         return custom_mapping_repr(
-            self.to_dict(),
+            self._asdict(),
             prefix="{}(".format(type(self).__name__),
             template="{key}={value}",
             suffix=")",
             key_repr=str,
         )
 
-    def to_dict(self):
-        # type: () -> Dict[str, Any]
+    def to_action(self):
+        # type: () -> Action
         """
-        Convert to dictionary.
+        Build the full action.
 
-        :return: Dictionary.
-        :rtype: dict[str, Any]
+        :return: Action.
+        :rtype: objetto.objects.Action
         """
-        return {
-            "obj_type": self.obj_type,
-            "priority": self.priority,
-            "kwargs": self.kwargs,
-        }
+        return Action(
+            sender=self.sender,
+            receiver=self.receiver,
+            locations=self.locations,
+            change=self.change,
+        )
 
-    @property
-    def obj_type(self):
-        # type: () -> Type[BO]
-        """
-        Object type.
 
-        :rtype: type[objetto.bases.BaseObject]
+_CHANGE_TYPE_KEYS = {}  # type: Dict[Type[BaseChange], Tuple[Any, ...]]
+
+
+def _get_subscription_keys(action, phase):
+    # type: (ActionRecord, Phase) -> Iterator[Tuple[Any, Any, Any, Any]]
+    """
+    Get the keys an action is sent to observers with (see
+    :meth:`objetto.observers.ActionObserver.start_observing`).
+
+    Keys are `(phase, change type, attribute, depth)` tuples, where `None` matches
+    any value, so every combination of concrete and `None` values is yielded.
+    The attribute is the receiver's location the action came through or, for changes
+    in the receiver itself, the updated attributes/keys.
+
+    :param action: Action record.
+    :param phase: Phase.
+    :return: Subscription keys.
+    """
+    change = action.change
+    change_type = type(change)
+    try:
+        change_types = _CHANGE_TYPE_KEYS[change_type]
+    except KeyError:
+        change_types = _CHANGE_TYPE_KEYS[change_type] = tuple(
+            c for c in getmro(change_type) if issubclass(c, BaseChange)
+        ) + (None,)
+
+    locations = action.locations
+    if locations:
+        attributes = (locations[0], None)  # type: Tuple[Any, ...]
+    elif change_type in (Update, DictUpdate):
+        attributes = tuple(cast("Update", change).new_values) + (None,)
+    else:
+        attributes = (None,)
+
+    for phase_key in (phase, None):
+        for change_type_key in change_types:
+            for attribute in attributes:
+                yield phase_key, change_type_key, attribute, len(locations)
+                yield phase_key, change_type_key, attribute, None
+
+
+# noinspection PyUnresolvedReferences
+class JournalEntry(
+    NamedTuple(
+        "JournalEntry",
+        (
+            ("actions", Tuple[ActionRecord, ...]),
+            ("phase", Optional[Phase]),
+            ("stores", "PMap[int, Tuple[BaseObject, Store]]"),
+            ("dirty", "PMap[int, BaseObject]"),
+            ("stale", "PMap[int, bool]"),
+            ("changes", "Tuple[BaseAtomicChange, ...]"),
+        ),
+    )
+):
+    """
+    Committed journal entry.
+
+    :param actions: Actions.
+    :param phase: Batch phase (or `None` if not a batch entry).
+    :param stores: All modified objects and stores up to (and including) this entry, \
+mapped by the objects' slots.
+    :param dirty: Objects with data not yet propagated to their parents.
+    :param stale: Objects with data not yet updated from their descendants.
+    :param changes: Atomic changes to be sent to change feeds.
+    """
+
+    __slots__ = ()
+
+
+def _unpickle_journal(entries, stores, dirty=pmap(), stale=pmap()):
+    # type: (...) -> Journal
+    journal = Journal()
+    journal.entries.extend(entries)
+    journal.set_stores(stores)
+    journal.set_pending_data(dirty, stale)
+    return journal
+
+
+class Journal(Base):
+    """
+    Mutable transaction journal.
+
+    Modified stores are accumulated in a single evolver, keyed by the objects' slots.
+    Each commit appends an entry
+    holding its actions and a persistent view of the stores at that point, so its
+    length can be used as a watermark to roll back to.
+
+    Upstream data changes are not applied right away. Objects whose data changed are
+    marked as 'dirty' and their ancestors as 'stale' until the application propagates
+    the data up the hierarchy.
+    """
+
+    __slots__ = ("__stores", "__entries", "__dirty", "__stale")
+
+    def __init__(self):
+        # type: () -> None
+        self.__stores = (
+            pmap().evolver()
+        )  # type: PMapEvolver[int, Tuple[BaseObject, Store]]
+        self.__entries = []  # type: List[JournalEntry]
+        self.__dirty = pmap().evolver()  # type: PMapEvolver[int, BaseObject]
+        self.__stale = pmap().evolver()  # type: PMapEvolver[int, bool]
+
+    def __deepcopy__(self, memo=None):
+        # type: (Optional[Dict[int, Any]]) -> Journal
+        """
+        Make a deep copy.
+
+        :param memo: Memo dict.
+        :return: Deep copy.
+        """
+        if memo is None:
+            memo = {}
+        try:
+            deep_copy = memo[id(self)]
+        except KeyError:
+            deep_copy = memo[id(self)] = type(self).__new__(type(self))
+            args = (
+                self.__entries,
+                self.__stores.persistent(),
+                self.__dirty.persistent(),
+                self.__stale.persistent(),
+            ), memo
+            entries, stores, dirty, stale = deepcopy(*args)
+            deep_copy.__entries = entries
+            deep_copy.__stores = stores.evolver()
+            deep_copy.__dirty = dirty.evolver()
+            deep_copy.__stale = stale.evolver()
+        return deep_copy
+
+    def __reduce__(self):
+        # type: () -> Tuple[Callable, Tuple]
+        """
+        Reduce for pickling.
+
+        :return: Unpickle function and arguments.
+        """
+        return _unpickle_journal, (
+            self.__entries,
+            self.__stores.persistent(),
+            self.__dirty.persistent(),
+            self.__stale.persistent(),
+        )
+
+    def __len__(self):
+        # type: () -> int
+        """
+        Get number of committed entries (watermark).
+
+        :return: Number of committed entries.
+        """
+        return len(self.__entries)
+
+    def query(self, obj):
+        # type: (BaseObject) -> Store
+        """
+        Query modified store for an object.
+
+        :param obj: Object.
+        :return: Store.
+        :raises KeyError: Object's store was not modified.
+        """
+        entry = self.__stores[obj.__.slot]
+        if entry[0] is not obj:
+            raise KeyError(obj)
+        return entry[1]
+
+    def set(self, obj, store):
+        # type: (BaseObject, Store) -> None
+        """
+        Set modified store for an object.
+
+        :param obj: Object.
+        :param store: Store.
+        """
+        self.__stores[obj.__.slot] = (obj, store)
+
+    def set_stores(self, stores):
+        # type: (Mapping[int, Tuple[BaseObject, Store]]) -> None
+        """
+        Replace all modified stores.
+
+        :param stores: Objects and stores mapped by the objects' slots.
+        """
+        self.__stores = pmap(stores).evolver()
+
+    def set_pending_data(self, dirty, stale):
+        # type: (Mapping[int, BaseObject], Mapping[int, bool]) -> None
+        """
+        Replace objects pending data propagation.
+
+        :param dirty: Objects with data not yet propagated to their parents.
+        :param stale: Objects with data not yet updated from their descendants.
+        """
+        self.__dirty = pmap(dirty).evolver()
+        self.__stale = pmap(stale).evolver()
+
+    def mark_dirty(self, obj, ancestors):
+        # type: (BaseObject, Iterable[BaseObject]) -> None
+        """
+        Mark an object's data as not propagated to its ancestors yet.
+
+        :param obj: Object whose data changed.
+        :param ancestors: Ancestors (which become stale).
+        """
+        self.__dirty[obj.__.slot] = obj
+        stale = self.__stale
+        for ancestor in ancestors:
+            slot = ancestor.__.slot
+            if slot not in stale:
+                stale[slot] = True
+
+    def is_stale(self, obj):
+        # type: (BaseObject) -> bool
+        """
+        Get whether an object's data is not updated from its descendants yet.
+
+        :param obj: Object.
+        :return: True if stale.
+        """
+        return obj.__.slot in self.__stale
+
+    def pop_dirty(self):
+        # type: () -> List[BaseObject]
+        """
+        Get dirty objects and clear objects pending data propagation.
+
+        :return: Dirty objects.
+        """
+        dirty = list(self.__dirty.persistent().values())
+        if dirty or len(self.__stale):
+            self.__dirty = pmap().evolver()
+            self.__stale = pmap().evolver()
+        return dirty
+
+    def commit(
+        self,
+        actions=(),  # type: Iterable[ActionRecord]
+        phase=None,  # type: Optional[Phase]
+        changes=(),  # type: Tuple[BaseAtomicChange, ...]
+    ):
+        # type: (...) -> None
+        """
+        Commit modified stores along with actions.
+
+        :param actions: Actions.
+        :param phase: Batch phase (or `None` if not a batch commit).
+        :param changes: Atomic changes to be sent to change feeds.
+        """
+        entry = JournalEntry(
+            tuple(actions),
+            phase,
+            self.__stores.persistent(),
+            self.__dirty.persistent(),
+            self.__stale.persistent(),
+            changes,
+        )
+        self.__entries.append(entry)
+
+    def revert(self, index):
+        # type: (int) -> None
+        """
+        Revert to a watermark, discarding later commits and uncommitted stores.
+
+        :param index: Watermark.
+        """
+        del self.__entries[index:]
+        if index:
+            entry = self.__entries[-1]
+            self.__stores = entry.stores.evolver()
+            self.__dirty = entry.dirty.evolver()
+            self.__stale = entry.stale.evolver()
+        else:
+            self.__stores = pmap().evolver()
+            self.__dirty = pmap().evolver()
+            self.__stale = pmap().evolver()
+
+    @property
+    def entries(self):
+        # type: () -> List[JournalEntry]
+        """Committed entries."""
+        return self.__entries
+
+    @property
+    def stores(self):
+        # type: () -> PMap[int, Tuple[BaseObject, Store]]
+        """All modified objects and stores, mapped by the objects' slots."""
+        return self.__stores.persistent()
+
+
+# noinspection PyTypeChecker
+_AR = TypeVar("_AR", bound="ApplicationRoot")
+
+# noinspection PyTypeChecker
+BO = TypeVar("BO", bound="BaseObject")
+
+
+@final
+class ApplicationRoot(Base, Generic[BO]):
+    """
+    Describes a root object that gets initialized with the application.
+
+    .. note::
+        Prefer using the :func:`objetto.applications.root` factory over
+        instantiating :class:`objetto.applications.ApplicationRoot` directly.
+
+    Inherits from:
+      - :class:`objetto.bases.Base`
+
+    :param obj_type: Object type.
+    :type obj_type: type[objetto.bases.BaseObject]
+
+    :param priority: Initialization priority.
+    :type priority: int or None
+
+    :param kwargs: Keyword arguments to be passed to the object's `__init__`.
+
+    :raises ValueError: Used reserved keyword argument.
+    :raises TypeError: Invalid object type.
+    """
+
+    __slots__ = ("__obj_type", "__priority", "__kwargs")
+
+    def __init__(self, obj_type, priority=None, **kwargs):
+        # type: (Type[BO], Optional[int], Any) -> None
+
+        # Check kwargs for reserved keys.
+        if "app" in kwargs:
+            error = "can't use reserved keyword argument 'app'"
+            raise ValueError(error)
+
+        from ._objects import BaseObject
+
+        with ReraiseContext(TypeError, "'obj_type' parameter"):
+            assert_is_subclass(obj_type, BaseObject)
+        self.__obj_type = obj_type
+        self.__priority = priority
+        self.__kwargs = DictState(kwargs)
+
+    @overload
+    def __get__(self, instance, owner):
+        # type: (_AR, None, Type[Application]) -> _AR
+        pass
+
+    @overload
+    def __get__(self, instance, owner):
+        # type: (Application, Type[Application]) -> BO
+        pass
+
+    @overload
+    def __get__(self, instance, owner):
+        # type: (_AR, object, type) -> _AR
+        pass
+
+    def __get__(self, instance, owner):
+        """
+        Get attribute value when accessing from valid instance or this descriptor
+        otherwise.
+
+        :param instance: Instance.
+        :type instance: objetto.applications.Application or None
+
+        :param owner: Owner class.
+        :type owner: type[objetto.applications.Application]
+
+        :return: Object instance or this descriptor.
+        :rtype: objetto.bases.BaseObject or objetto.applications.ApplicationRoot
+        """
+        if instance is not None and isinstance(instance, Application):
+            return instance.__.get_root_obj(self)
+        return self
+
+    def __deepcopy__(self, memo=None):
+        # type: (_AR, Optional[Dict[int, Any]]) -> _AR
+        """
+        Get itself, since roots are shared by all instances of an application class.
+
+        :param memo: Memo dict.
+        :return: Itself.
+        """
+        return self
+
+    def __hash__(self):
+        # type: () -> int
+        """
+        Get hash based on object id.
+
+        :return: Hash based on object id.
+        :rtype: int
+        """
+        return hash(id(self))
+
+    def __eq__(self, other):
+        # type: (object) -> bool
+        """
+        Compare with another object for identity.
+
+        :param other: Another object.
+
+        :return: True if the same object.
+        :rtype: bool
+        """
+        return other is self
+
+    @recursive_repr
+    def __repr__(self):
+        # type: () -> str
+        """
+        Get representation.
+
+        :return: Representation.
+        :rtype: str
+        """
+        return custom_mapping_repr(
+            self.to_dict(),
+            prefix="{}(".format(type(self).__name__),
+            template="{key}={value}",
+            suffix=")",
+            key_repr=str,
+        )
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        """
+        Convert to dictionary.
+
+        :return: Dictionary.
+        :rtype: dict[str, Any]
+        """
+        return {
+            "obj_type": self.obj_type,
+            "priority": self.priority,
+            "kwargs": self.kwargs,
+        }
+
+    @property
+    def obj_type(self):
+        # type: () -> Type[BO]
+        """
+        Object type.
+
+        :rtype: type[objetto.bases.BaseObject]
         """
         return self.__obj_type
 
@@ -609,6 +1452,235 @@ class ApplicationProperty(Base):
         return self.__module
 
 
+# noinspection PyUnresolvedReferences
+class ApplicationStats(
+    NamedTuple(
+        "ApplicationStats",
+        (
+            ("write_contexts", int),
+            ("commits", int),
+            ("changes", int),
+            ("actions", int),
+            ("reactions", int),
+            ("observer_sends", int),
+            ("rollbacks", int),
+            ("write_time", float),
+            ("push_time", float),
+            ("reaction_time", float),
+            ("observer_time", float),
+            ("objects", int),
+            ("stores", int),
+        ),
+    )
+):
+    """
+    Performance counters of an application (see
+    :meth:`objetto.applications.Application.stats`).
+
+    Times are cumulative and in seconds. Time spent in nested operations is also
+    counted by the outer ones (reactions run inside of writes, for example).
+
+    :param write_contexts: Write contexts entered (including nested ones).
+    :param commits: Transactions pushed to the application's storage.
+    :param changes: Atomic changes written.
+    :param actions: Actions built for objects with reactions or observers.
+    :param reactions: Reactions invoked.
+    :param observer_sends: Actions sent to observed objects.
+    :param rollbacks: Changes rolled back (by exceptions or rejected changes).
+    :param write_time: Time spent writing atomic changes.
+    :param push_time: Time spent pushing transactions (including observers).
+    :param reaction_time: Time spent running reactions.
+    :param observer_time: Time spent sending actions to observers.
+    :param objects: Live objects.
+    :param stores: Stores kept by the application.
+    """
+
+    __slots__ = ()
+
+
+def _zero_counters():
+    # type: () -> Dict[str, Union[int, float]]
+    """
+    Get zeroed counter values.
+
+    :return: Values mapped by counter name.
+    """
+    return dict(
+        (n, 0.0 if n.endswith("_time") else 0) for n in ApplicationStats._fields[:-2]
+    )
+
+
+class ApplicationCounters(Base, _FreshCopy):
+    """
+    Accumulates performance counters for an application.
+
+      - Can be deep copied and pickled (always as zeroed counters).
+    """
+
+    __slots__ = ("__lock", "__values")
+
+    def __init__(self):
+        # type: () -> None
+        self.__lock = Lock()
+        self.__values = _zero_counters()
+
+    def add(self, name, amount=1):
+        # type: (str, Union[int, float]) -> None
+        """
+        Add to a counter.
+
+        :param name: Counter name.
+        :param amount: Amount.
+        """
+        with self.__lock:
+            self.__values[name] += amount
+
+    def to_dict(self):
+        # type: () -> Dict[str, Union[int, float]]
+        """
+        Get counter values.
+
+        :return: Values mapped by counter name.
+        """
+        with self.__lock:
+            return dict(self.__values)
+
+
+class ApplicationReplication(Base, _FreshCopy):
+    """
+    Change feeds attached to an application and objects replayed into it.
+
+      - Can be deep copied and pickled (always with no feeds or replayed objects).
+    """
+
+    __slots__ = ("__lock", "__feeds", "__objects", "__replaying")
+
+    def __init__(self):
+        # type: () -> None
+        self.__lock = Lock()
+        self.__feeds = ()  # type: Tuple[ApplicationChangeFeed, ...]
+        self.__objects = {}  # type: Dict[Any, BaseObject]
+        self.__replaying = False
+
+    def add_feed(self, feed):
+        # type: (ApplicationChangeFeed) -> None
+        """
+        Attach a change feed.
+
+        :param feed: Change feed.
+        """
+        with self.__lock:
+            if feed not in self.__feeds:
+                self.__feeds += (feed,)
+
+    def remove_feed(self, feed):
+        # type: (ApplicationChangeFeed) -> None
+        """
+        Detach a change feed.
+
+        :param feed: Change feed.
+        """
+        with self.__lock:
+            self.__feeds = tuple(f for f in self.__feeds if f is not feed)
+
+    @property
+    def feeds(self):
+        # type: () -> Tuple[ApplicationChangeFeed, ...]
+        """Attached change feeds."""
+        return self.__feeds
+
+    @property
+    def objects(self):
+        # type: () -> Dict[Any, BaseObject]
+        """Objects being replayed, mapped by their id (or path) in the feed."""
+        return self.__objects
+
+    @property
+    def replaying(self):
+        # type: () -> bool
+        """Whether changes were replayed into the application."""
+        return self.__replaying
+
+    @replaying.setter
+    def replaying(self, value):
+        # type: (bool) -> None
+        self.__replaying = value
+
+
+class ApplicationDispatch(Base, _FreshCopy):
+    """
+    How observers get actions dispatched to them.
+
+      - Can be deep copied and pickled (always dispatching synchronously).
+    """
+
+    __slots__ = ("__lanes",)
+
+    def __init__(self):
+        # type: () -> None
+        self.__lanes = None  # type: Optional[ObserverLanes]
+
+    def set_executor(self, executor):
+        # type: (Any) -> None
+        """
+        Set executor to dispatch actions to observers with.
+
+        :param executor: Executor (or `None` to dispatch synchronously).
+        """
+        self.__lanes = None if executor is None else ObserverLanes(executor)
+
+    @property
+    def lanes(self):
+        # type: () -> Optional[ObserverLanes]
+        """Observer lanes (or `None` if dispatching synchronously)."""
+        return self.__lanes
+
+
+def _to_action_exception_infos(result):
+    # type: (Iterable[ObserverExceptionInfo]) -> List[ActionObserverExceptionData]
+    """
+    Convert exception information from subject-observers.
+
+    :param result: Exception information from subject-observers.
+    :return: Exception information for action (and digest) observers.
+    """
+    from ._observers import ActionObserverExceptionData
+
+    action_exception_infos = []  # type: List[ActionObserverExceptionData]
+    for exception_info in result:
+        internal_observer = cast("InternalObserver", exception_info.observer)
+        action_observer = internal_observer.action_observer_ref()
+        if action_observer is not None:
+            payload = exception_info.payload
+            if len(payload) == 1:
+                action, phase, digest = None, None, payload[0]
+            else:
+                action = cast("ActionRecord", payload[0]).to_action()
+                phase, digest = payload[1], None
+            action_exception_info = ActionObserverExceptionData(
+                observer=action_observer,
+                action=action,
+                phase=phase,
+                digest=digest,
+                exception_type=exception_info.exception_type,
+                exception=exception_info.exception,
+                traceback=exception_info.traceback,
+            )
+            action_exception_infos.append(action_exception_info)
+    return action_exception_infos
+
+
+def _get_slot(obj):
+    # type: (BaseObject) -> Optional[int]
+    """
+    Get an object's slot in its application's storage.
+
+    :param obj: Object.
+    :return: Slot (or `None` if not initialized).
+    """
+    return obj.__.slot
+
+
 class ApplicationInternals(Base):
     """Internals for `Application`."""
 
@@ -616,29 +1688,37 @@ class ApplicationInternals(Base):
         "__app_ref",
         "__history_cls",
         "__lock",
+        "__local",
+        "__allocator",
         "__storage",
-        "__snapshot",
-        "__busy_writing",
-        "__busy_hierarchy",
-        "__commits",
-        "__reading",
-        "__writing",
+        "__published",
         "__roots",
+        "__shards",
+        "__merge_lock",
+        "__write_queue",
+        "__replication",
+        "__counters",
+        "__dispatch",
     )
 
-    def __init__(self, app):
-        # type: (Application) -> None
+    def __init__(self, app, sharded=False):
+        # type: (Application, bool) -> None
         self.__app_ref = WeakReference(app)
         self.__history_cls = None  # type: Optional[Type[HistoryObject]]
         self.__lock = ApplicationLock()
-        self.__storage = Storage()  # type: Storage[BaseObject, Store]
-        self.__snapshot = None  # type: Optional[ApplicationSnapshot]
-        self.__busy_writing = set()  # type: Set[BaseObject]
-        self.__busy_hierarchy = ValueCounter()  # type: Counter[BaseObject]
-        self.__commits = []  # type: List[Commit]
-        self.__reading = []  # type: List[Optional[BaseObject]]
-        self.__writing = []  # type: List[Optional[BaseObject]]
+        self.__local = ApplicationLocal()
+        self.__allocator = SlotAllocator()  # type: SlotAllocator[BaseObject]
+        self.__storage = SlotStorage(_get_slot)  # type: SlotStorage[BaseObject, Store]
+        self.__published = self.__storage  # type: SlotStorage[BaseObject, Store]
         self.__roots = {}  # type: Dict[ApplicationRoot, BaseObject]
+        self.__shards = (
+            {} if sharded else None
+        )  # type: Optional[Dict[BaseObject, Tuple[str, ApplicationLock]]]
+        self.__merge_lock = ApplicationLock()
+        self.__write_queue = ApplicationWriteQueue()
+        self.__replication = ApplicationReplication()
+        self.__counters = None  # type: Optional[ApplicationCounters]
+        self.__dispatch = ApplicationDispatch()
 
     def __deepcopy__(self, memo=None):
         # type: (Optional[Dict[int, Any]]) -> ApplicationInternals
@@ -651,8 +1731,8 @@ class ApplicationInternals(Base):
         """
         if memo is None:
             memo = {}
-        with self.read_context():
-            if self.__writing:
+        with self.__lock:
+            if self.__local.writing:
                 error = "can't deep copy while application is in a 'write' context"
                 raise RuntimeError(error)
             try:
@@ -673,12 +1753,60 @@ class ApplicationInternals(Base):
         :return: State.
         :raises RuntimeError: Can't pickle while application is in a 'write' context.
         """
-        with self.read_context():
-            if self.__writing:
+        with self.__lock:
+            if self.__local.writing:
                 error = "can't pickle while application is in a 'write' context"
                 raise RuntimeError(error)
             return super(ApplicationInternals, self).__getstate__()
 
+    def __get_storage(self):
+        # type: () -> SlotStorage[BaseObject, Store]
+        """
+        Get the storage of the current thread's fork or of the application.
+
+        :return: Storage.
+        """
+        fork = self.__local.fork
+        if fork is not None:
+            return fork._storage
+        return self.__storage
+
+    def __get_published(self):
+        # type: () -> SlotStorage[BaseObject, Store]
+        """
+        Get the storage published to lock-free readers of the current thread's fork or
+        of the application.
+
+        :return: Storage.
+        """
+        fork = self.__local.fork
+        if fork is not None:
+            return fork._storage
+        return self.__published
+
+    def __get_lock(self):
+        # type: () -> ApplicationLock
+        """
+        Get the lock of the current thread's fork or of the application.
+
+        :return: Lock.
+        """
+        fork = self.__local.fork
+        if fork is not None:
+            return fork._lock
+        return self.__lock
+
+    def __in_other_task(self):
+        # type: () -> bool
+        """
+        Get whether another asyncio task running in the current thread is inside an
+        asynchronous context (its uncommitted changes are not visible to this task).
+
+        :return: True if in another task.
+        """
+        task = self.__local.task
+        return task is not None and task is not _current_task()
+
     def __read(self, obj):
         # type: (BaseObject) -> Store
         """
@@ -687,19 +1815,25 @@ class ApplicationInternals(Base):
         :param obj: Object.
         :return: Store.
         """
-        if self.__snapshot is not None:
+        snapshot = self.__local.snapshot
+        if snapshot is not None:
             try:
-                return self.__snapshot._storage.query(obj)
+                return snapshot._storage.query(obj)
             except KeyError:
                 error = "object with id {} is not valid in snapshot".format(id(obj))
                 raise RuntimeError(error)
-        if self.__writing:
+        if self.__local.writing and not self.__in_other_task():
             try:
-                return self.__commits[-1].stores[obj]
-            except (IndexError, KeyError):
+                return self.__local.journal.query(obj)
+            except KeyError:
                 pass
+            overlay = self.__local.overlay
+            if overlay is not None:
+                entry = overlay.get(obj.__.slot)
+                if entry is not None and entry[0] is obj:
+                    return entry[1]
         try:
-            return self.__storage.query(obj)
+            return self.__get_storage().query(obj)
         except KeyError:
             error = "object with id {} is no longer valid".format(id(obj))
             raise RuntimeError(error)
@@ -717,6 +1851,10 @@ class ApplicationInternals(Base):
         """
         store = self.__read(obj)
         if store.history is not None:
+            # History objects are guarded by the subtree locks of their providers.
+            shards = self.__local.shards
+            if shards is not None and self.__is_guarded(obj, shards):
+                self.__local.histories.add(store.history)
             return store.history, obj
         provider = store.history_provider_ref()
         if provider is not None:
@@ -726,7 +1864,7 @@ class ApplicationInternals(Base):
     def __pre_parent_check(
         self,
         obj,  # type: BaseObject
-        hierarchy,  # type: List[BaseObject]
+        hierarchy,  # type: Tuple[BaseObject, ...]
         child_counter,  # type: Counter[BaseObject]
     ):
         # type: (...) -> None
@@ -762,7 +1900,7 @@ class ApplicationInternals(Base):
                         type(child).__fullname__
                     )
                     raise ValueError(error)
-                if self.__busy_hierarchy.get(child):
+                if self.__local.busy_hierarchy.get(child):
                     error = (
                         "can't change parent for {} while its hierarchy is locked"
                     ).format(child)
@@ -823,17 +1961,34 @@ class ApplicationInternals(Base):
         with self.__hierarchy_context(obj) as hierarchy:
             assert hierarchy[0] is obj
 
+            # Check whether the subtree is locked by this thread.
+            shards = self.__local.shards
+            if shards is not None:
+                if hierarchy[-1] not in shards and not self.__is_guarded(obj, shards):
+                    error = "can't write to {} without locking its subtree".format(obj)
+                    raise RuntimeError(error)
+                for child in change.new_children:
+                    if not self.__is_guarded(child, shards):
+                        error = "can't adopt {} without locking it".format(child)
+                        raise RuntimeError(error)
+
             # Perform pre-parent check.
             self.__pre_parent_check(obj, hierarchy, child_counter)
 
             # Lock parenting for new children.
             with self.__new_children_context(change.new_children):
 
+                # Bulk loading suspends actions, reactions, and history recording.
+                bulk_loading = bool(self.__local.bulk_loading)
+                if bulk_loading:
+                    self.__local.bulk_objects.add(obj)
+
                 # Enter history atomic batch if not in a batch.
                 history, history_provider = self.__read_history(obj)
                 atomic_batch_change = None
                 if (
                     history is not None
+                    and not bulk_loading
                     and not obj._initializing
                     and not history.executing
                     and not history.in_batch()
@@ -847,53 +2002,22 @@ class ApplicationInternals(Base):
                     )
                     history.__enter_batch__(atomic_batch_change)
 
-                # Pre phase.
-                child = None  # type: Optional[BaseObject]
-                single_locations = []  # type: List[Any]
-                single_data_locations = []  # type: List[Any]
-                all_locations = []  # type: List[List[Any]]
-                all_data_locations = []  # type: List[List[Any]]
-                actions = []  # type: List[Action]
-                for i, parent in enumerate(hierarchy):
-                    if i == 0:
-                        location = None
-                        locations = []
-                        data_location = None
-                        data_locations = []
-                    else:
-                        assert child is not None
-                        location = parent._locate(child)
-                        locations = [location] + all_locations[-1]
-
-                        relationship = cast(
-                            "Relationship", parent._get_relationship(location)
-                        )
-                        if relationship.data:
-                            data_location = parent._locate_data(child)
-                            data_locations = [data_location, all_data_locations[-1]]
-                        else:
-                            data_location = None
-                            data_locations = []
-
-                    single_locations.append(location)
-                    all_locations.append(locations)
-
-                    single_data_locations.append(data_location)
-                    all_data_locations.append(data_locations)
-
-                    action = Action(
-                        sender=obj,
-                        receiver=parent,
-                        locations=locations,
-                        change=change,
-                    )
-                    assert action.sender is obj
-                    assert action.receiver is parent
-
-                    actions.append(action)
-                    self.__react(action.receiver, action, Phase.PRE)
+                # Pre phase (actions only for objects with reactions or observers).
+                actions = []  # type: List[ActionRecord]
+                if not bulk_loading:
+                    interested = [self.__is_interested(p) for p in hierarchy]
+                    top = max(i for i, p in enumerate(interested) if p or not i)
+                    locations = ()  # type: Tuple[Any, ...]
+                    for i, parent in enumerate(hierarchy[: top + 1]):
+                        if i:
+                            location = parent._locate(hierarchy[i - 1])
+                            locations = (location,) + locations
+                        if not interested[i]:
+                            continue
 
-                    child = parent
+                        action = ActionRecord(obj, parent, locations, change)
+                        actions.append(action)
+                        self.__react(action.receiver, action, Phase.PRE)
 
                 # Flush histories and filter history adopters.
                 new_children_last_parent_history_updates = set()
@@ -922,12 +2046,13 @@ class ApplicationInternals(Base):
                 for history_to_flush in histories_to_flush:
                     history_to_flush.flush()
 
-                # Store changes.
-                try:
-                    stores = self.__commits[-1].stores
-                except IndexError:
-                    stores = InteractiveDictData()
+                # External observers see the data as it was before this change.
+                observed = self.__is_observed(actions)
+                if observed:
+                    self.__flush_data(commit=True)
 
+                # Store changes.
+                journal = self.__local.journal
                 store = self.__read(obj)
                 old_data = store.data
                 store = store.update(
@@ -946,9 +2071,10 @@ class ApplicationInternals(Base):
                     for old_child in change.old_children:
                         children = children.remove(old_child)
                         child_store = self.__read(old_child).set(
-                            "parent_ref", WeakReference()
+                            "parent_ref", _EMPTY_REF
                         )
-                        stores = stores._set(old_child, child_store)
+                        journal.set(old_child, child_store)
+                        self.__reparent(old_child)
 
                     # noinspection PyTypeChecker
                     for new_child in change.new_children:
@@ -960,67 +2086,39 @@ class ApplicationInternals(Base):
                             child_store = child_store.set(
                                 "last_parent_history_ref", WeakReference(history)
                             )
-                        stores = stores._set(new_child, child_store)
+                        journal.set(new_child, child_store)
+                        self.__reparent(new_child)
                     store = store.set("children", children)
-                stores = stores._set(obj, store)
+                journal.set(obj, store)
 
                 # History propagation.
                 for adopter in filtered_history_adopters:
-                    try:
-                        adopter_store = stores[adopter]
-                    except KeyError:
-                        adopter_store = self.__read(adopter)
-                    adopter_store = adopter_store.set(
+                    adopter_store = self.__read(adopter).set(
                         "history_provider_ref", WeakReference(obj)
                     )
-                    stores = stores._set(adopter, adopter_store)
-
-                # Upstream data changes.
-                if data is not old_data:
-                    child_data = data
-                    child = None
-                    for i, parent in enumerate(hierarchy):
-                        if i == 0:
-                            child = parent
-                            continue
-                        assert child is not None
+                    journal.set(adopter, adopter_store)
 
-                        location = single_locations[i]
-                        relationship = cast(
-                            "Relationship", parent._get_relationship(location)
-                        )
-                        if not relationship.data:
-                            break
-
-                        assert data is not None
-                        assert child_data is not None
-
-                        data_location = single_data_locations[i]
-
-                        parent_old_store = self.__read(parent)
-                        parent_new_store = type(
-                            parent
-                        ).__functions__.replace_child_data(
-                            parent_old_store,
-                            child,
-                            data_location,
-                            child_data,
-                        )
-                        if parent_new_store is parent_old_store:
-                            break
-                        stores = stores._set(parent, parent_new_store)
+                # Upstream data changes are deferred (unless observed).
+                if data is not old_data and len(hierarchy) > 1:
+                    journal.mark_dirty(obj, hierarchy[1:])
+                if observed:
+                    self.__flush_data()
 
-                        child = parent
-                        child_data = parent_new_store.data
+                counters = self.__counters
+                if counters is not None and actions:
+                    counters.add("actions", len(actions))
 
-                # Commit!
-                commit = Commit(actions=actions, stores=stores)
-                self.__commits.append(commit)
+                # Commit (along with the change, if there are change feeds)!
+                if self.__replication.feeds and not self.__is_history(hierarchy[-1]):
+                    journal.commit(actions, changes=(change,))
+                else:
+                    journal.commit(actions)
 
                 # Push change to history.
                 if (
                     history is not None
                     and history_provider is not None
+                    and not bulk_loading
                     and not obj._initializing
                     and not history_provider._initializing
                 ):
@@ -1034,6 +2132,61 @@ class ApplicationInternals(Base):
                 if history is not None and atomic_batch_change is not None:
                     history.__exit_batch__(atomic_batch_change)
 
+    def __flush_data(self, commit=False):
+        # type: (bool) -> None
+        """
+        Propagate pending data changes up the hierarchy.
+
+        Parents get their data rebuilt once from all of their dirty children, from the
+        bottom up, so every ancestor is only rebuilt once.
+
+        :param commit: Whether to commit the propagated changes.
+        """
+        journal = self.__local.journal
+        dirty = journal.pop_dirty()
+        if not dirty:
+            return
+
+        # Sort dirty objects by depth.
+        levels = {}  # type: Dict[int, List[BaseObject]]
+        for obj in dirty:
+            depth = len(self.__get_hierarchy(obj)) - 1
+            levels.setdefault(depth, []).append(obj)
+
+        # Replace child data in parents, from the bottom up.
+        for depth in range(max(levels), 0, -1):
+            for child in levels.pop(depth, ()):
+                parent = self.__read(child).parent_ref()
+                assert parent is not None
+
+                location = parent._locate(child)
+                relationship = cast("Relationship", parent._get_relationship(location))
+                if not relationship.data:
+                    continue
+
+                child_data = self.__read(child).data
+                assert child_data is not None
+
+                data_location = parent._locate_data(child)
+
+                parent_old_store = self.__read(parent)
+                parent_new_store = type(parent).__functions__.replace_child_data(
+                    parent_old_store,
+                    child,
+                    data_location,
+                    child_data,
+                )
+                if parent_new_store is parent_old_store:
+                    continue
+                journal.set(parent, parent_new_store)
+
+                parent_level = levels.setdefault(depth - 1, [])
+                if parent not in parent_level:
+                    parent_level.append(parent)
+
+        if commit:
+            journal.commit()
+
     def __update_metadata(
         self,
         obj,  # type: BaseObject
@@ -1047,18 +2200,13 @@ class ApplicationInternals(Base):
         :param update: Metadata update.
         """
         # Store changes.
-        try:
-            stores = self.__commits[-1].stores
-        except IndexError:
-            stores = InteractiveDictData()
         store = self.__read(obj)
         old_metadata = store.metadata
         store = store.update({"metadata": old_metadata.update(update)})
-        stores = stores._set(obj, store)
+        self.__local.journal.set(obj, store)
 
         # Commit!
-        commit = Commit(actions=(), stores=stores)
-        self.__commits.append(commit)
+        self.__local.journal.commit()
 
     def __revert(self, index):
         # type: (int) -> None
@@ -1067,62 +2215,116 @@ class ApplicationInternals(Base):
 
         :param index: Index.
         """
-        del self.__commits[index:]
+        self.__local.journal.revert(index)
+
+        # Cached hierarchies that went through reparented objects are stale now.
+        reparented = self.__local.reparented
+        while reparented and reparented[-1][0] >= index:
+            reparented.pop()[1].__.bump_parent_version()
+        counters = self.__counters
+        if counters is not None:
+            counters.add("rollbacks")
 
     def __push(self):
         # type: () -> None
         """Push and merge changes to permanent storage."""
-        if self.__commits:
-            commits = self.__commits
-            self.__commits = []
+        if self.__local.journal:
+            self.__flush_data()
+            journal = self.__local.journal
+            self.__local.journal = Journal()
+            counters = self.__counters
+            if counters is not None:
+                counters.add("commits")
+
+            # Forks don't notify observers and merge into their own storage only.
+            fork = self.__local.fork
+            if fork is not None:
+                fork._storage = fork._storage.update_slots(journal.stores)
+                return
 
             action_exception_infos = []  # type: List[ActionObserverExceptionData]
 
-            def ingest_action_exception_infos(result):
-                # type: (Tuple[ObserverExceptionInfo, ...]) -> None
+            lanes = self.__dispatch.lanes
+
+            def send(action, phase):
+                # type: (ActionRecord, Phase) -> None
                 """
-                Ingest exception information.
+                Send (or dispatch) action to observers of the receiver.
 
-                :param result: Exception information from subject-observers.
+                :param action: Action.
+                :param phase: Phase.
                 """
-                for exception_info in result:
-                    internal_observer = cast(
-                        "InternalObserver", exception_info.observer
-                    )
-                    action_observer = internal_observer.action_observer_ref()
-                    if action_observer is not None:
-                        from objetto._observers import ActionObserverExceptionData
-
-                        action_exception_info = ActionObserverExceptionData(
-                            observer=action_observer,
-                            action=cast("Action", exception_info.payload[0]),
-                            phase=cast("Phase", exception_info.payload[1]),
-                            exception_type=exception_info.exception_type,
-                            exception=exception_info.exception,
-                            traceback=exception_info.traceback,
-                        )
-                        action_exception_infos.append(action_exception_info)
-
-            for commit in commits:
-                if type(commit) is BatchCommit:
-                    for action in commit.actions:
-                        phase = commit.phase  # type: ignore
-                        ingest_action_exception_infos(
-                            action.receiver.__.subject.send(
-                                action, cast("Phase", phase)
-                            )
+                subject = action.receiver.__.subject
+                start = None if counters is None else default_timer()
+                try:
+                    if lanes is None:
+                        result = subject.send_filtered(
+                            _get_subscription_keys, action, phase
                         )
-                else:
-                    for action in commit.actions:
-                        ingest_action_exception_infos(
-                            action.receiver.__.subject.send(action, Phase.PRE)
+                    else:
+                        result = subject.dispatch(
+                            lanes, _get_subscription_keys, action, phase
                         )
+                finally:
+                    if counters is not None and start is not None:
+                        counters.add("observer_sends")
+                        counters.add("observer_time", default_timer() - start)
+                if result:
+                    action_exception_infos.extend(_to_action_exception_infos(result))
+
+            # Observers read the stores of the entry being delivered on top of the
+            # storage, which only gets merged once at the end.
+            # Actions of atomic changes are also coalesced into digests on the way.
+            digests = ActionDigestBuilder()
+            try:
+                for entry in journal.entries:
+                    if entry.phase is not None:
+                        for action in entry.actions:
+                            send(action, entry.phase)
+                    else:
+                        for action in entry.actions:
+                            send(action, Phase.PRE)
 
-                    self.__storage = self.__storage.update(commit.stores)
+                        self.__local.overlay = entry.stores
 
-                    for action in commit.actions:
-                        ingest_action_exception_infos(
-                            action.receiver.__.subject.send(action, Phase.POST)
+                        for action in entry.actions:
+                            send(action, Phase.POST)
+                            if action.receiver.__.has_digest_observers:
+                                digests.add(action)
+            finally:
+                self.__local.overlay = None
+
+                # Merge and publish storage to lock-free readers.
+                with self.__merge_lock:
+                    self.__storage = self.__storage.update_slots(journal.stores)
+                    self.__published = self.__storage
+
+                    # Discard stores of dead objects. Releasing those stores might
+                    # release their children, so keep going until nothing dies.
+                    released = self.__allocator.pop_released()
+                    while released:
+                        self.__storage = self.__storage.discard(released)
+                        self.__published = self.__storage
+                        released = self.__allocator.pop_released()
+
+                    # Queue deferred items in the order transactions are merged.
+                    self.__put_deliveries()
+
+                # Send changes to change feeds, in the order they were merged.
+                feeds = self.__replication.feeds
+                if feeds:
+                    changes = tuple(c for e in journal.entries for c in e.changes)
+                    if changes:
+                        for feed in feeds:
+                            feed.__send__(changes)
+
+            # Send digests to digest observers, now that changes are merged.
+            if digests:
+                for digest in digests.build():
+                    result = digest.receiver.__.digest_subject.send(digest)
+                    if result:
+                        action_exception_infos.extend(
+                            _to_action_exception_infos(result)
                         )
 
             if action_exception_infos:
@@ -1131,29 +2333,90 @@ class ApplicationInternals(Base):
                     tuple(action_exception_infos),
                 )
 
-    @contextmanager
-    def __hierarchy_context(self, obj):
-        # type: (BaseObject) -> Iterator[List[BaseObject]]
+    def __get_hierarchy(self, obj):
+        # type: (BaseObject) -> Tuple[BaseObject, ...]
         """
-        Context manager that locks and caches an object's upper hierarchy.
+        Get an object's upper hierarchy.
+
+        Hierarchies are cached in the objects' internals along with the parent
+        versions of the objects in them, so ancestors only need to be looked up once
+        and a cached hierarchy stays valid until any object in it gets reparented.
+        Ancestors are cached as weak references, so children don't keep their parents
+        alive.
+
+        Hierarchies are not cached nor looked up in the cache while in a fork, since
+        parenting in a fork can differ from the application's.
 
         :param obj: Object.
-        :return: Cached upper hierarchy (starting with the object itself).
+        :return: Upper hierarchy (starting with the object itself).
         """
-        hierarchy = []  # type: List[BaseObject]
+        hierarchy = ()  # type: Tuple[BaseObject, ...]
         parent = obj  # type: Optional[BaseObject]
+        if self.__local.fork is not None:
+            while parent is not None:
+                hierarchy += (parent,)
+                # noinspection PyCallingNonCallable
+                parent = self.__read(parent).parent_ref()
+            return hierarchy
+
+        versions = ()  # type: Tuple[int, ...]
+        chain = []  # type: List[Tuple[BaseObject, int]]
         while parent is not None:
-            self.__busy_hierarchy[parent] += 1
-            hierarchy.append(parent)
+            version = parent.__.parent_version
+            cached = parent.__.hierarchy
+            if cached is not None and cached[0][0] == version:
+                ancestors = tuple(weak_ancestor() for weak_ancestor in cached[1])
+                if all(
+                    ancestor is not None and ancestor.__.parent_version == v
+                    for ancestor, v in zip(ancestors, cached[0][1:])
+                ):
+                    hierarchy = (parent,) + ancestors
+                    versions = cached[0]
+                    break
+            chain.append((parent, version))
             # noinspection PyCallingNonCallable
             parent = self.__read(parent).parent_ref()
+        for chain_obj, version in reversed(chain):
+            weak_ancestors = tuple(ref(ancestor) for ancestor in hierarchy)
+            versions = (version,) + versions
+            chain_obj.__.set_hierarchy(versions, weak_ancestors)
+            hierarchy = (chain_obj,) + hierarchy
+        return hierarchy
+
+    def __reparent(self, obj):
+        # type: (BaseObject) -> None
+        """
+        Invalidate cached hierarchies going through an object whose parent changed.
+
+        Parent versions are only bumped by the thread holding the lock that guards the
+        object, and not at all in forks (which don't cache hierarchies).
+
+        :param obj: Object.
+        """
+        local = self.__local
+        if local.fork is None:
+            obj.__.bump_parent_version()
+            local.reparented.append((len(local.journal), obj))
+
+    @contextmanager
+    def __hierarchy_context(self, obj):
+        # type: (BaseObject) -> Iterator[Tuple[BaseObject, ...]]
+        """
+        Context manager that locks and caches an object's upper hierarchy.
+
+        :param obj: Object.
+        :return: Cached upper hierarchy (starting with the object itself).
+        """
+        hierarchy = self.__get_hierarchy(obj)
+        for parent in hierarchy:
+            self.__local.busy_hierarchy[parent] += 1
         try:
             yield hierarchy
         finally:
             for parent in hierarchy:
-                self.__busy_hierarchy[parent] -= 1
-                if not self.__busy_hierarchy[parent]:
-                    del self.__busy_hierarchy[parent]
+                self.__local.busy_hierarchy[parent] -= 1
+                if not self.__local.busy_hierarchy[parent]:
+                    del self.__local.busy_hierarchy[parent]
 
     @contextmanager
     def __new_children_context(self, new_children):
@@ -1164,18 +2427,53 @@ class ApplicationInternals(Base):
         :param new_children: New children.
         """
         for new_child in new_children:
-            self.__busy_hierarchy[new_child] += 1
+            self.__local.busy_hierarchy[new_child] += 1
         try:
             yield
         finally:
             for new_child in new_children:
-                self.__busy_hierarchy[new_child] -= 1
-                if not self.__busy_hierarchy[new_child]:
-                    del self.__busy_hierarchy[new_child]
+                self.__local.busy_hierarchy[new_child] -= 1
+                if not self.__local.busy_hierarchy[new_child]:
+                    del self.__local.busy_hierarchy[new_child]
+
+    @staticmethod
+    def __is_interested(obj):
+        # type: (BaseObject) -> bool
+        """
+        Get whether an object has reactions or observers (and needs actions).
+
+        :param obj: Object.
+        :return: True if interested.
+        """
+        return (
+            bool(type(obj)._reactions)
+            or obj.__.subject.has_observers
+            or obj.__.has_digest_observers
+        )
+
+    def __is_history(self, obj):
+        # type: (BaseObject) -> bool
+        """
+        Get whether an object is a history object.
+
+        :param obj: Object.
+        :return: True if history object.
+        """
+        return self.__history_cls is not None and isinstance(obj, self.__history_cls)
+
+    @staticmethod
+    def __is_observed(actions):
+        # type: (Iterable[ActionRecord]) -> bool
+        """
+        Get whether any of the actions will be sent to external observers.
+
+        :param actions: Actions.
+        :return: True if observed.
+        """
+        return any(a.receiver.__.subject.has_observers for a in actions)
 
-    @staticmethod
-    def __react(obj, action, phase):
-        # type: (BaseObject, Action, Phase) -> None
+    def __react(self, obj, action, phase):
+        # type: (BaseObject, ActionRecord, Phase) -> None
         """
         Run object's reactions.
 
@@ -1183,8 +2481,19 @@ class ApplicationInternals(Base):
         :param action: Action.
         :param phase: Phase.
         """
-        for reaction in type(obj)._reactions:
-            reaction(obj, action, phase)
+        reactions = type(obj)._reactions
+        counters = self.__counters
+        if counters is None or not reactions:
+            for reaction in reactions:
+                reaction(obj, action, phase)
+            return
+        start = default_timer()
+        try:
+            for reaction in reactions:
+                reaction(obj, action, phase)
+        finally:
+            counters.add("reactions", len(reactions))
+            counters.add("reaction_time", default_timer() - start)
 
     def init_object(self, obj):
         # type: (BaseObject) -> None
@@ -1193,23 +2502,11 @@ class ApplicationInternals(Base):
 
         :param obj: Object.
         """
-        with self.write_context():
-            try:
-                stores = self.__commits[-1].stores
-            except IndexError:
-                stores = InteractiveDictData()
-
-            def _obj_in_storage():
-                try:
-                    self.__storage.query(obj)
-                except KeyError:
-                    return False
-                else:
-                    return True
-
-            if obj in stores or _obj_in_storage():
+        with self.write_context(subtrees=()):
+            if obj.__.slot is not None:
                 error = "object {} can't be initialized more than once".format(obj)
                 raise RuntimeError(error)
+            obj.__.set_slot(self.__allocator.allocate(obj))
 
             cls = type(obj)  # type: Type[BaseObject]
             kwargs = {}  # type: Dict[str, Any]
@@ -1241,9 +2538,8 @@ class ApplicationInternals(Base):
                 data = None
 
             # Commit!
-            stores = stores._set(obj, Store(state=state, data=data, **kwargs))
-            commit = Commit(stores=stores)
-            self.__commits.append(commit)
+            self.__local.journal.set(obj, Store(state=state, data=data, **kwargs))
+            self.__local.journal.commit()
 
     @contextmanager
     def snapshot_context(self, snapshot):
@@ -1251,14 +2547,351 @@ class ApplicationInternals(Base):
         """
         Snapshot read context manager.
 
+        Snapshots are bound to the current thread and read without acquiring the
+        lock, so different threads can read from different snapshots at once.
+
         :param snapshot: Snapshot.
         """
+        local = self.__local
         with self.read_context():
-            self.__snapshot = snapshot
+            previous = local.snapshot
+            local.snapshot = snapshot
+            try:
+                yield
+            finally:
+                local.snapshot = previous
+
+    def __get_shard_roots(self, objs):
+        # type: (Iterable[BaseObject]) -> FrozenSet[BaseObject]
+        """
+        Get the roots whose subtrees contain objects.
+
+        :param objs: Objects.
+        :return: Root objects or None if any of the objects is not under a root \
+(objects that were not published yet are ignored).
+        """
+        assert self.__shards is not None
+        roots = set()
+        for obj in objs:
+            parent = obj  # type: Optional[BaseObject]
+            while parent is not None:
+                if parent in self.__shards:
+                    roots.add(parent)
+                    break
+                try:
+                    store = self.__published.query(parent)
+                except KeyError:
+                    break
+                parent = store.parent_ref()
+                if parent is None:
+                    return None
+        return frozenset(roots)
+
+    def __is_guarded(self, obj, shards):
+        # type: (BaseObject, FrozenSet[BaseObject]) -> bool
+        """
+        Get whether writing to an object is guarded by the subtree locks held.
+
+        Objects that were not published yet are only reachable from the transaction
+        that created them, so they are guarded. History objects (and their children) are
+        guarded if their providers are.
+
+        :param obj: Object.
+        :param shards: Roots locked by the current thread.
+        :return: True if guarded.
+        """
+        histories = self.__local.histories
+        parent = obj  # type: Optional[BaseObject]
+        while parent is not None:
+            if parent in shards or parent in histories:
+                return True
+            try:
+                store = self.__published.query(parent)
+            except KeyError:
+                return parent is obj
+            parent = store.parent_ref()
+        return False
+
+    @contextmanager
+    def __locked_context(self, subtrees=None):
+        # type: (Optional[Iterable[BaseObject]]) -> Iterator
+        """
+        Context manager that acquires the lock on behalf of the current thread.
+
+        In sharded applications, if objects are provided and all of them are under a
+        root (or were not published yet), the lock is only shared and the locks for
+        the roots of their subtrees are acquired in a deterministic order instead.
+        Otherwise, the lock is acquired exclusively.
+
+        Forks are always locked exclusively with their own lock.
+
+        :param subtrees: Objects whose subtrees should be locked.
+        :raises RuntimeError: Can't lock more subtrees while already locked.
+        """
+        local = self.__local
+        sharded = subtrees is not None and self.__shards is not None
+        sharded = sharded and local.fork is None
+
+        # Already locked, check whether subtrees are covered.
+        if sharded and local.locked:
+            assert subtrees is not None
+            shards = local.shards
+            if shards is not None:
+                for obj in subtrees:
+                    if not self.__is_guarded(obj, shards):
+                        error = (
+                            "can't lock more subtrees while already in a sharded "
+                            "'write' context"
+                        )
+                        raise RuntimeError(error)
+            local.locked += 1
             try:
                 yield
             finally:
-                self.__snapshot = None
+                local.locked -= 1
+            return
+
+        # Acquire shared lock and subtree locks, retry if subtrees moved meanwhile.
+        roots = None  # type: Optional[FrozenSet[BaseObject]]
+        acquired = []  # type: List[ApplicationLock]
+        while sharded:
+            assert subtrees is not None
+            roots = self.__get_shard_roots(subtrees)
+            if roots is None:
+                # Objects that are not under a root are guarded by the exclusive lock.
+                sharded = False
+                break
+            locks = [lock for _, lock in sorted(self.__shards[r] for r in roots)]
+            acquired = []  # type: List[ApplicationLock]
+            self.__lock.acquire_read()
+            try:
+                for lock in locks:
+                    lock.acquire_write()
+                    acquired.append(lock)
+                if self.__get_shard_roots(subtrees) == roots:
+                    break
+            except BaseException:
+                for lock in reversed(acquired):
+                    lock.release_write()
+                self.__lock.release_read()
+                raise
+            for lock in reversed(acquired):
+                lock.release_write()
+            self.__lock.release_read()
+
+        # Exclusive.
+        if not sharded:
+            with self.__get_lock():
+                local.locked += 1
+                try:
+                    yield
+                finally:
+                    local.locked -= 1
+            return
+
+        local.shards = roots
+        local.locked += 1
+        try:
+            yield
+        finally:
+            local.locked -= 1
+            local.shards = None
+            local.histories.clear()
+            for lock in reversed(acquired):
+                lock.release_write()
+            self.__lock.release_read()
+
+    def read(self, obj):
+        # type: (BaseObject) -> Store
+        """
+        Read an object's store without entering a read context.
+
+        Threads that are not inside their own 'write' context read from their snapshot
+        or from the last published storage without acquiring the lock. So do asyncio
+        tasks while another task in the same thread is inside an asynchronous context.
+
+        :param obj: Object.
+        :return: Store.
+        """
+        local = self.__local
+        if local.snapshot is not None:
+            return self.__read(obj)
+        in_other_task = False
+        if local.locked:
+            in_other_task = self.__in_other_task()
+            if not in_other_task:
+                return self.__read(obj)
+        storage = local.storage
+        if storage is None:
+            storage = self.__get_published()
+        try:
+            return storage.query(obj)
+        except KeyError:
+            if in_other_task:
+                error = "object with id {} is no longer valid".format(id(obj))
+                raise RuntimeError(error)
+
+        # Object might have been committed by a writer after the storage was pinned.
+        with self.__get_lock().read_context():
+            return self.__read(obj)
+
+    def read_data(self, obj):
+        # type: (BaseObject) -> Optional[BaseData]
+        """
+        Read an object's data, propagating pending data changes first if needed.
+
+        :param obj: Object.
+        :return: Data.
+        """
+        local = self.__local
+        if (
+            local.locked
+            and local.writing
+            and local.snapshot is None
+            and local.journal.is_stale(obj)
+            and not self.__in_other_task()
+        ):
+            self.__flush_data()
+        return self.read(obj).data
+
+    def __try_lock(self, subtrees=None):
+        # type: (Optional[Iterable[BaseObject]]) -> Optional[Callable[[], None]]
+        """
+        Try to acquire the locks a topmost locked context would without blocking.
+
+        :param subtrees: Objects whose subtrees should be locked (sharded only).
+        :return: Function that releases the locks or None if they are not available.
+        """
+        roots = None  # type: Optional[FrozenSet[BaseObject]]
+        if subtrees is not None and self.__shards is not None:
+            if self.__local.fork is None:
+                roots = self.__get_shard_roots(subtrees)
+        if roots is None:
+            lock = self.__get_lock()
+            if lock.acquire_write(blocking=False):
+                return lock.release_write
+            return None
+
+        locks = [lock for _, lock in sorted(self.__shards[r] for r in roots)]
+        if not self.__lock.acquire_read(blocking=False):
+            return None
+        acquired = []  # type: List[ApplicationLock]
+
+        def release():
+            # type: () -> None
+            """Release acquired locks."""
+            for lock_ in reversed(acquired):
+                lock_.release_write()
+            self.__lock.release_read()
+
+        for lock in locks:
+            if not lock.acquire_write(blocking=False):
+                release()
+                return None
+            acquired.append(lock)
+        return release
+
+    def async_enter(
+        self,
+        task,  # type: Any
+        context,  # type: ContextManager
+        lock=True,  # type: bool
+        subtrees=None,  # type: Optional[Iterable[BaseObject]]
+    ):
+        # type: (...) -> Optional[bool]
+        """
+        Try to enter a context on behalf of an asyncio task without blocking.
+
+        :param task: Asyncio task.
+        :param context: Context manager.
+        :param lock: Whether the context acquires locks.
+        :param subtrees: Objects whose subtrees should be locked (sharded only).
+        :return: Whether it's the topmost asynchronous context or None if not entered.
+        """
+        local = self.__local
+        if local.task is not None:
+            if local.task is not task:
+                return None
+            context.__enter__()
+            return False
+
+        release = None
+        if lock:
+            release = self.__try_lock(subtrees)
+            if release is None:
+                return None
+        try:
+            context.__enter__()
+        finally:
+            if release is not None:
+                release()
+        local.task = task
+        local.awaitables = []
+        return True
+
+    def async_exit(
+        self,
+        context,  # type: ContextManager
+        topmost,  # type: bool
+        exc_type,  # type: Optional[Type[BaseException]]
+        exc_value,  # type: Optional[BaseException]
+        exc_tb,  # type: Optional[TracebackType]
+    ):
+        # type: (...) -> Tuple[bool, List[ObserverAwaitable]]
+        """
+        Exit a context entered on behalf of an asyncio task.
+
+        :param context: Context manager.
+        :param topmost: Whether it's the topmost asynchronous context.
+        :param exc_type: Exception type.
+        :param exc_value: Exception.
+        :param exc_tb: Traceback.
+        :return: Whether to suppress the exception and awaitables from observers.
+        """
+        local = self.__local
+        if not topmost:
+            return bool(context.__exit__(exc_type, exc_value, exc_tb)), []
+        try:
+            suppress = bool(context.__exit__(exc_type, exc_value, exc_tb))
+        except BaseException:
+            for _, _, _, awaitable in local.awaitables or ():
+                close = getattr(awaitable, "close", None)
+                if close is not None:
+                    close()
+            raise
+        else:
+            return suppress, local.awaitables or []
+        finally:
+            local.task = None
+            local.awaitables = None
+
+    def add_awaitable(
+        self,
+        observer,  # type: ActionObserver
+        action,  # type: ActionRecord
+        phase,  # type: Phase
+        awaitable,  # type: Any
+    ):
+        # type: (...) -> None
+        """
+        Add an awaitable returned by an observer to the asynchronous context.
+
+        :param observer: Action observer.
+        :param action: Action.
+        :param phase: Phase.
+        :param awaitable: Awaitable.
+        :raises RuntimeError: Not in an asynchronous context.
+        """
+        awaitables = self.__local.awaitables
+        if awaitables is None:
+            close = getattr(awaitable, "close", None)
+            if close is not None:
+                close()
+            error = (
+                "observer {} returned an awaitable outside of an asynchronous context"
+            ).format(observer)
+            raise RuntimeError(error)
+        awaitables.append((observer, action, phase, awaitable))
 
     @contextmanager
     def read_context(self, obj=None):
@@ -1266,97 +2899,181 @@ class ApplicationInternals(Base):
         """
         Read context manager.
 
+        Threads that are not inside their own 'write' context pin the last published
+        storage and read from it without acquiring the lock.
+
         :param obj: Object.
         :return: Read handle function.
         """
-        with self.__lock:
-            topmost = not self.__reading
-            self.__reading.append(obj)
-
-            def read():
-                # type: () -> Store
-                """Read object store."""
-                assert obj is not None
-                return self.__read(obj)
+        local = self.__local
+        topmost = not local.reading
+        if topmost and (not local.locked or self.__in_other_task()):
+            local.storage = self.__get_published()
+        local.reading.append(obj)
+
+        def read():
+            # type: () -> Store
+            """Read object store."""
+            assert obj is not None
+            return self.read(obj)
 
-            try:
-                yield read
-            finally:
-                self.__reading.pop()
-                if topmost:
-                    assert not self.__reading
+        try:
+            yield read
+        finally:
+            local.reading.pop()
+            if topmost:
+                assert not local.reading
+                local.storage = None
 
     @contextmanager
     def write_context(
         self,
         obj=None,  # type: Optional[BaseObject]
+        subtrees=None,  # type: Optional[Iterable[BaseObject]]
     ):
         # type: (...) -> Iterator[Tuple[ReadFunction, WriteFunction]]
         """
         Write context manager.
 
         :param obj: Object.
+        :param subtrees: Objects whose subtrees will be written to (sharded only).
         :return: Read and write handle functions.
         """
-        with self.__lock:
-            if self.__reading:
-                error = "can't enter a 'write' context while in a 'read' context"
-                raise RuntimeError(error)
-            topmost = not self.__writing
-            index = len(self.__commits)
-            self.__writing.append(obj)
-
-            def read():
-                # type: () -> Store
-                """Read object store."""
-                assert obj is not None
-                return self.__read(obj)
+        if subtrees is None:
+            if self.__local.writing:
+                subtrees = ()
+            elif obj is not None:
+                subtrees = (obj,)
+        task = self.__local.task
+        if task is not None and task is not _current_task():
+            error = (
+                "can't enter a 'write' context while another task is inside an "
+                "asynchronous context"
+            )
+            raise RuntimeError(error)
+        try:
+            with self.__locked_context(subtrees):
+                if self.__local.reading:
+                    error = "can't enter a 'write' context while in a 'read' context"
+                    raise RuntimeError(error)
+                topmost = not self.__local.writing
+                index = len(self.__local.journal)
+                self.__local.writing.append(obj)
+                counters = self.__counters
+                if counters is not None:
+                    counters.add("write_contexts")
+
+                def read():
+                    # type: () -> Store
+                    """Read object store."""
+                    assert obj is not None
+                    if self.__local.journal.is_stale(obj):
+                        self.__flush_data()
+                    return self.__read(obj)
+
+                def write(
+                    state,  # type: Any
+                    data,  # type: BaseData
+                    metadata,  # type: Mapping[str, Any]
+                    child_counter,  # type: Counter[BaseObject]
+                    change,  # type: BaseAtomicChange
+                ):
+                    # type: (...) -> None
+                    """Write changes to object."""
+                    assert obj is not None
+                    if obj in self.__local.busy_writing:
+                        error_ = "reaction cycle detected on {}".format(obj)
+                        raise RuntimeError(error_)
+                    self.__local.busy_writing.add(obj)
+                    counters_ = self.__counters
+                    start = None if counters_ is None else default_timer()
+                    try:
+                        self.__write(obj, state, data, metadata, child_counter, change)
+                    except RejectChangeException as e_:
+                        self.__local.busy_writing.remove(obj)
+                        if e_.change is not change:
+                            raise
+                        self.__revert(index)
+                        e_.callback()
+                    except BaseException:
+                        self.__local.busy_writing.remove(obj)
+                        raise
+                    else:
+                        self.__local.busy_writing.remove(obj)
+                    finally:
+                        if counters_ is not None and start is not None:
+                            counters_.add("changes")
+                            counters_.add("write_time", default_timer() - start)
 
-            def write(
-                state,  # type: Any
-                data,  # type: BaseData
-                metadata,  # type: Mapping[str, Any]
-                child_counter,  # type: Counter[BaseObject]
-                change,  # type: BaseAtomicChange
-            ):
-                # type: (...) -> None
-                """Write changes to object."""
-                assert obj is not None
-                if obj in self.__busy_writing:
-                    error_ = "reaction cycle detected on {}".format(obj)
-                    raise RuntimeError(error_)
-                self.__busy_writing.add(obj)
                 try:
-                    self.__write(obj, state, data, metadata, child_counter, change)
-                except RejectChangeException as e_:
-                    self.__busy_writing.remove(obj)
-                    if e_.change is not change:
-                        raise
+                    yield read, write
+                except BaseException as e:
                     self.__revert(index)
-                    e_.callback()
-                except Exception:
-                    self.__busy_writing.remove(obj)
-                    raise
+                    if not topmost or type(e) is not TemporaryContextException:
+                        raise
                 else:
-                    self.__busy_writing.remove(obj)
+                    if topmost:
+                        with self.read_context():
+                            if counters is None:
+                                self.__push()
+                            else:
+                                start_ = default_timer()
+                                try:
+                                    self.__push()
+                                finally:
+                                    counters.add("push_time", default_timer() - start_)
+                finally:
+                    self.__local.writing.pop()
+                    if topmost:
+                        del self.__local.reparented[:]
+                        assert not self.__local.busy_hierarchy
+                        assert not self.__local.busy_writing
+                        assert not self.__local.journal
+                        assert not self.__local.writing
+        finally:
+            local = self.__local
+            if (local.deliveries or local.queued) and not local.locked:
+                self.__deliver()
 
-            try:
-                yield read, write
-            except Exception as e:
-                self.__revert(index)
-                if not topmost or type(e) is not TemporaryContextException:
-                    raise
-            else:
-                if topmost:
-                    with self.read_context():
-                        self.__push()
-            finally:
-                self.__writing.pop()
-                if topmost:
-                    assert not self.__busy_hierarchy
-                    assert not self.__busy_writing
-                    assert not self.__commits
-                    assert not self.__writing
+    def defer_delivery(self, queue, item):
+        # type: (Any, Any) -> None
+        """
+        Put an item in a queue once the current transaction is merged.
+
+        Items are put in batches (one per queue) by calling the queue's `put` method
+        with a list of items, in the order they were deferred, while the transaction
+        is being merged (so batches are in commit order). The queue's `wait` method is
+        called once the current thread releases its locks.
+
+        :param queue: Queue.
+        :param item: Item.
+        """
+        deliveries = self.__local.deliveries
+        try:
+            deliveries[queue].append(item)
+        except KeyError:
+            deliveries[queue] = [item]
+
+    def __put_deliveries(self):
+        # type: () -> None
+        """Put deferred items in their queues without waiting."""
+        local = self.__local
+        deliveries = local.deliveries
+        if deliveries:
+            local.deliveries = {}
+            for queue, items in iteritems(deliveries):
+                queue.put(items)
+                if queue not in local.queued:
+                    local.queued.append(queue)
+
+    def __deliver(self):
+        # type: () -> None
+        """Put deferred items left in their queues, then wait for the queues."""
+        self.__put_deliveries()
+        queued = self.__local.queued
+        self.__local.queued = []
+        for queue in queued:
+            queue.wait()
 
     @contextmanager
     def update_metadata_context(
@@ -1395,14 +3112,12 @@ class ApplicationInternals(Base):
         :param obj: Object.
         :param change: Batch change.
         """
-        with self.write_context():
-            index = len(self.__commits)
+        with self.write_context(subtrees=(obj,)):
+            if self.__local.bulk_loading:
+                yield change
+                return
 
-            def _get_stores():
-                try:
-                    return self.__commits[-1].stores
-                except IndexError:
-                    return {}
+            index = len(self.__local.journal)
 
             try:
                 with self.__hierarchy_context(obj) as hierarchy:
@@ -1411,40 +3126,25 @@ class ApplicationInternals(Base):
                     # Get history.
                     history, history_provider = self.__read_history(obj)
 
-                    # Gather actions.
-                    child = None  # type: Optional[BaseObject]
-                    single_locations = []  # type: List[Any]
-                    all_locations = []  # type: List[List[Any]]
-                    actions = []  # type: List[Action]
-                    for i, parent in enumerate(hierarchy):
-                        if i == 0:
-                            location = None
-                            locations = []
-                        else:
-                            assert child is not None
-                            location = parent._locate(child)
-                            locations = [location] + all_locations[-1]
-
-                        single_locations.append(location)
-                        all_locations.append(locations)
-
-                        action = Action(
-                            sender=obj,
-                            receiver=parent,
-                            locations=locations,
-                            change=change,
-                        )
-                        assert action.sender is obj
-                        assert action.receiver is parent
+                    # Gather actions for objects with reactions or observers.
+                    interested = [self.__is_interested(p) for p in hierarchy]
+                    top = max(i for i, p in enumerate(interested) if p or not i)
+                    locations = ()  # type: Tuple[Any, ...]
+                    actions = []  # type: List[ActionRecord]
+                    for i, parent in enumerate(hierarchy[: top + 1]):
+                        if i:
+                            location = parent._locate(hierarchy[i - 1])
+                            locations = (location,) + locations
+                        if not interested[i]:
+                            continue
 
+                        action = ActionRecord(obj, parent, locations, change)
                         actions.append(action)
-                        child = parent
 
                     # Commit Pre.
-                    pre_commit = BatchCommit(
-                        actions=actions, stores=_get_stores(), phase=Phase.PRE
-                    )
-                    self.__commits.append(pre_commit)
+                    if self.__is_observed(actions):
+                        self.__flush_data(commit=True)
+                    self.__local.journal.commit(actions, Phase.PRE)
 
                     # History Pre.
                     if (
@@ -1475,10 +3175,9 @@ class ApplicationInternals(Base):
                         self.__react(action.receiver, action, Phase.POST)
 
                     # Commit Post.
-                    post_commit = BatchCommit(
-                        actions=actions, stores=_get_stores(), phase=Phase.POST
-                    )
-                    self.__commits.append(post_commit)
+                    if self.__is_observed(actions):
+                        self.__flush_data(commit=True)
+                    self.__local.journal.commit(actions, Phase.POST)
 
             # Catch rejection.
             except RejectChangeException as e:
@@ -1487,6 +3186,94 @@ class ApplicationInternals(Base):
                     raise
                 e.callback()
 
+    @contextmanager
+    def bulk_load_context(self):
+        # type: () -> Iterator
+        """Bulk load context manager."""
+        with self.write_context():
+            topmost = not self.__local.bulk_loading
+            self.__local.bulk_loading += 1
+            try:
+                yield
+                if topmost and self.__local.bulk_objects:
+                    self.__finish_bulk_load(set(self.__local.bulk_objects))
+            finally:
+                self.__local.bulk_loading -= 1
+                if topmost:
+                    self.__local.bulk_objects = set()
+
+    @contextmanager
+    def replay_context(self):
+        # type: () -> Iterator
+        """
+        Replay context manager.
+
+        Works like a bulk load, except that reactions don't run and no summary actions
+        are sent afterwards, since the changes being replayed already include the
+        effects of reactions.
+        """
+        with self.write_context():
+            self.__local.bulk_loading += 1
+            try:
+                yield
+            finally:
+                self.__local.bulk_loading -= 1
+                if not self.__local.bulk_loading:
+                    self.__local.bulk_objects = set()
+
+    def __finish_bulk_load(self, objects):
+        # type: (Set[BaseObject]) -> None
+        """
+        Run reactions and send a summary action per hierarchy root after bulk loading.
+        Changes made by reactions are still considered part of the bulk load.
+
+        :param objects: Objects changed while bulk loading.
+        """
+        from ._changes import BulkLoad
+
+        # Find the root of every changed object and the depth of every affected one.
+        roots = {}  # type: Dict[BaseObject, BaseObject]
+        depths = {}  # type: Dict[BaseObject, int]
+        loaded = {}  # type: Dict[BaseObject, Set[BaseObject]]
+        for obj in objects:
+            hierarchy = self.__get_hierarchy(obj)
+            root = hierarchy[-1]
+            for depth, chain_obj in enumerate(reversed(hierarchy)):
+                roots[chain_obj] = root
+                depths[chain_obj] = depth
+            loaded.setdefault(root, set()).add(obj)
+
+        # Summary actions.
+        changes = {}  # type: Dict[BaseObject, BulkLoad]
+        actions = []  # type: List[ActionRecord]
+        for root, root_objects in iteritems(loaded):
+            change = changes[root] = BulkLoad(obj=root, objects=root_objects)
+            actions.append(ActionRecord(root, root, (), change))
+
+        # Reactions run once for every affected object, from the bottom up.
+        reactions_actions = []  # type: List[ActionRecord]
+        for obj in sorted(depths, key=lambda o: -depths[o]):
+            if not type(obj)._reactions:
+                continue
+            if obj in changes:
+                change = changes[obj]
+            else:
+                change = BulkLoad(obj=obj, objects=changes[roots[obj]].objects)
+            action = ActionRecord(obj, obj, (), change)
+            reactions_actions.append(action)
+
+        observed = self.__is_observed(actions)
+        if observed:
+            self.__flush_data(commit=True)
+        self.__local.journal.commit(actions, Phase.PRE)
+        for action in reactions_actions:
+            self.__react(action.receiver, action, Phase.PRE)
+        for action in reactions_actions:
+            self.__react(action.receiver, action, Phase.POST)
+        if observed:
+            self.__flush_data(commit=True)
+        self.__local.journal.commit(actions, Phase.POST)
+
     def init_root_objs(self):
         # type: () -> None
         """Initialize root objects."""
@@ -1499,56 +3286,266 @@ class ApplicationInternals(Base):
                 sorted_roots = sorted(
                     itervalues(roots), key=lambda r: (r.priority is None, r.priority)
                 )
+                root_names = type(app)._root_names
                 for root in sorted_roots:
                     root_obj = root.obj_type(app, **root.kwargs)
                     self.__roots[root] = root_obj
                     root_obj.__.set_root()
+                    if self.__shards is not None:
+                        shard = (root_names[root], ApplicationLock())
+                        self.__shards[root_obj] = shard
+
+    def make_object(self, cls):
+        # type: (Type[BO]) -> BO
+        """
+        Make and initialize an object without running its type's `__init__` (for
+        objects whose contents get replayed or restored afterwards).
+
+        :param cls: Object type.
+        :return: Object.
+        """
+        from ._objects.bases import BaseObjectInternals
+
+        app = self.__app_ref()
+        assert app is not None
+        obj = cls.__new__(cls)
+        obj.__ = BaseObjectInternals(obj, app)
+        self.init_object(obj)
+        return obj
+
+    def restore_snapshot(self, snapshot):
+        # type: (ApplicationSnapshot) -> None
+        """
+        Restore a snapshot of this application, replacing its current state.
+
+        Changes are not recorded in the history and observers are not notified.
+
+        :param snapshot: Snapshot.
+        :raises ValueError: Snapshot belongs to another application.
+        :raises RuntimeError: Can't restore a snapshot while in a context.
+        """
+        if snapshot.app is not self.__app_ref():
+            error = "snapshot belongs to another application"
+            raise ValueError(error)
+        local = self.__local
+        if local.locked or local.reading or local.fork is not None:
+            error = "can't restore a snapshot while in a context"
+            raise RuntimeError(error)
+        with self.__locked_context():
+            with self.__merge_lock:
+                self.__storage = snapshot._storage
+                self.__published = self.__storage
+
+            # Parents might have changed, invalidate all cached hierarchies.
+            allocator = self.__allocator
+            for slot in range(allocator.size):
+                obj = allocator.get(slot)
+                if obj is not None:
+                    obj.__.bump_parent_version()
+
+    def get_root_obj(self, root):
+        # type: (ApplicationRoot) -> BaseObject
+        """
+        Get root object.
+
+        :param root: Application root descriptor.
+        :return: Root object.
+        """
+        return self.__roots[root]
+
+    def submit(self, func, *args, **kwargs):
+        # type: (Callable, Any, Any) -> Future
+        """
+        Queue a callable to be executed by the writer thread.
+
+        :param func: Callable.
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+        :return: Future.
+        """
+        return self.__write_queue.submit(self, func, args, kwargs)
+
+    def __get_current_storage(self):
+        # type: () -> SlotStorage[BaseObject, Store]
+        """
+        Get storage with the current state, as seen by the current thread.
+
+        :return: Storage.
+        """
+        if not self.__local.locked:
+            return self.__get_published()
+        storage = self.__get_storage()
+        if self.__local.writing:
+            if self.__local.snapshot is None:
+                self.__flush_data()
+            if self.__local.overlay is not None:
+                storage = storage.update_slots(self.__local.overlay)
+            storage = storage.update_slots(self.__local.journal.stores)
+        return storage
+
+    def take_snapshot(self):
+        """
+        Take a snapshot of the current application state.
+
+        :return: Application snapshot.
+        :rtype: objetto.applications.ApplicationSnapshot
+        """
+        app = self.__app_ref()
+        assert app is not None
+        return ApplicationSnapshot(app, self.__get_current_storage())
+
+    def fork(self):
+        """
+        Fork the current application state.
+
+        :return: Application fork.
+        :rtype: objetto.applications.ApplicationFork
+        """
+        app = self.__app_ref()
+        assert app is not None
+        return ApplicationFork(app, self.__get_current_storage())
+
+    @contextmanager
+    def fork_context(self, fork):
+        # type: (ApplicationFork) -> Iterator
+        """
+        Fork context manager.
+
+        :param fork: Fork.
+        :raises RuntimeError: Can't enter a fork context while in another context.
+        """
+        local = self.__local
+        if local.fork is fork:
+            yield
+            return
+        if (
+            local.fork is not None
+            or local.locked
+            or local.reading
+            or local.task is not None
+        ):
+            error = "can't enter a fork context while in another context"
+            raise RuntimeError(error)
+        local.fork = fork
+        try:
+            yield
+        finally:
+            local.fork = None
+
+    @property
+    def is_sharded(self):
+        # type: () -> bool
+        """
+        Whether root subtrees have their own locks.
+
+        :rtype: bool
+        """
+        return self.__shards is not None
+
+    @property
+    def is_writing(self):
+        # type: () -> bool
+        """
+        Whether this application is inside a write context.
+
+        :rtype: bool
+        """
+        return bool(self.__local.locked and self.__local.writing)
+
+    @property
+    def is_reading(self):
+        # type: () -> bool
+        """
+        Whether this application is inside a read context.
+
+        :rtype: bool
+        """
+        return bool(self.__local.reading)
+
+    @property
+    def is_forked(self):
+        # type: () -> bool
+        """
+        Whether the current thread is inside a fork context.
+
+        :rtype: bool
+        """
+        return self.__local.fork is not None
 
-    def get_root_obj(self, root):
-        # type: (ApplicationRoot) -> BaseObject
+    def set_stats_enabled(self, enabled):
+        # type: (bool) -> None
         """
-        Get root object.
+        Enable or disable performance counters.
 
-        :param root: Application root descriptor.
-        :return: Root object.
+        :param enabled: Whether to enable.
         """
-        return self.__roots[root]
+        if not enabled:
+            self.__counters = None
+        elif self.__counters is None:
+            self.__counters = ApplicationCounters()
 
-    def take_snapshot(self):
+    def reset_stats(self):
+        # type: () -> None
+        """Reset performance counters (if enabled)."""
+        if self.__counters is not None:
+            self.__counters = ApplicationCounters()
+
+    def stats(self):
+        # type: () -> ApplicationStats
         """
-        Take a snapshot of the current application state.
+        Get performance counters.
 
-        :return: Application snapshot.
-        :rtype: objetto.applications.ApplicationSnapshot
+        :return: Application stats.
         """
-        storage = self.__storage
-        if self.__writing and self.__commits:
-            storage = storage.update(self.__commits[-1].stores)
-        app = self.__app_ref()
-        assert app is not None
-        return ApplicationSnapshot(app, storage)
+        counters = self.__counters
+        values = _zero_counters() if counters is None else counters.to_dict()
+        return ApplicationStats(
+            objects=self.__allocator.count, stores=self.__published.count, **values
+        )
 
     @property
-    def is_writing(self):
+    def stats_enabled(self):
         # type: () -> bool
+        """Whether performance counters are enabled."""
+        return self.__counters is not None
+
+    def set_observer_executor(self, executor):
+        # type: (Any) -> None
         """
-        Whether this application is inside a write context.
+        Set executor to dispatch actions to observers with (after draining).
 
-        :rtype: bool
+        :param executor: Executor (or `None` to dispatch synchronously).
+        :raises ActionObserversFailedError: External observers raised exceptions.
         """
-        with self.read_context():
-            return bool(self.__writing)
+        try:
+            self.drain_observers()
+        finally:
+            self.__dispatch.set_executor(executor)
 
-    @property
-    def is_reading(self):
-        # type: () -> bool
+    def drain_observers(self, timeout=None):
+        # type: (Optional[float]) -> None
         """
-        Whether this application is inside a read context.
+        Wait for observers to receive actions dispatched through an executor.
 
-        :rtype: bool
+        :param timeout: Timeout in seconds (None to wait indefinitely).
+        :raises ActionObserversFailedError: External observers raised exceptions.
+        :raises RuntimeError: Timed out or called from an observer lane.
         """
-        with self.read_context():
-            return len(self.__reading) > 1
+        lanes = self.__dispatch.lanes
+        if lanes is None:
+            return
+        result = lanes.drain(timeout)
+        if result:
+            raise ActionObserversFailedError(
+                "external observers raised exceptions (see tracebacks below)",
+                tuple(_to_action_exception_infos(result)),
+            )
+
+    @property
+    def replication(self):
+        # type: () -> ApplicationReplication
+        """Change feeds and replayed objects."""
+        return self.__replication
 
 
 class ApplicationMeta(BaseMeta):
@@ -1638,12 +3635,21 @@ class Application(with_metaclass(ApplicationMeta, Base)):
         >>> obj = Object(app)  # pass application as first parameter
         >>> obj.app is app  # access it through the 'app' property
         True
+
+    Sharded applications give each `root <objetto.applications.root>`_ subtree its own
+    lock, so writes to disjoint subtrees can happen in parallel from different
+    threads. Write contexts for objects that are not under a root lock the whole
+    application exclusively.
+
+    :param sharded: Whether root subtrees have their own locks.
+    :type sharded: bool
     """
 
     __slots__ = ("__weakref__", "__", "__properties")
 
-    def __init__(self):
-        self.__ = ApplicationInternals(self)
+    def __init__(self, sharded=False):
+        # type: (bool) -> None
+        self.__ = ApplicationInternals(self, sharded=sharded)
         self.__.init_root_objs()
         self.__properties = WeakKeyDictionary()
 
@@ -1748,15 +3754,143 @@ class Application(with_metaclass(ApplicationMeta, Base)):
 
     @final
     @contextmanager
-    def write_context(self):
-        # type: () -> Iterator
+    def write_context(self, *subtrees):
+        # type: (BaseObject) -> Iterator
         """
         Write context.
 
+        In sharded applications, only the subtrees containing the objects provided are
+        locked (in a deterministic order). If no objects are provided, or if any of
+        them is not under a root, the whole application is locked.
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute, root
+
+            >>> class Document(Object):
+            ...     title = attribute(str, default="")
+            ...
+            >>> class Settings(Object):
+            ...     theme = attribute(str, default="light")
+            ...
+            >>> class App(Application):
+            ...     document = root(Document)
+            ...     settings = root(Settings)
+            ...
+            >>> app = App(sharded=True)
+            >>> with app.write_context(app.document):  # doctest: +ELLIPSIS
+            ...     app.document.title = "Draft"
+            ...     app.settings.theme = "dark"
+            Traceback (most recent call last):
+            RuntimeError: can't write to Settings(...) without locking its subtree
+            >>> app.document.title
+            ''
+            >>> with app.write_context(app.document, app.settings):
+            ...     app.document.title = "Draft"
+            ...     app.settings.theme = "dark"
+            ...
+            >>> app.document.title, app.settings.theme
+            ('Draft', 'dark')
+
+        :param subtrees: Objects whose subtrees will be written to (sharded only).
+        :type subtrees: objetto.bases.BaseObject
+
         :return: Context manager.
         :rtype: contextlib.AbstractContextManager
+
+        :raises RuntimeError: Can't lock more subtrees while already locked.
         """
-        with self.__.write_context():
+        if subtrees:
+            context = self.__.write_context(subtrees=subtrees)
+        else:
+            context = self.__.write_context()
+        with context:
+            yield
+
+    @final
+    def async_read_context(self, snapshot=None):
+        # type: (Optional[ApplicationSnapshot]) -> ApplicationAsyncContext
+        """
+        Asynchronous read context, for `async with` statements.
+
+        :param snapshot: Application state snapshot.
+        :type snapshot: objetto.applications.ApplicationSnapshot
+
+        :return: Asynchronous context manager.
+        :rtype: objetto.applications.ApplicationAsyncContext
+
+        :raises ValueError: Application mismatch.
+        """
+        return ApplicationAsyncContext(self, self.read_context(snapshot), lock=False)
+
+    @final
+    def async_write_context(self, *subtrees):
+        # type: (BaseObject) -> ApplicationAsyncContext
+        """
+        Asynchronous write context, for `async with` statements.
+
+        Waits for the lock without blocking the event loop. Observers may return
+        awaitables (by implementing `__observe__` as a coroutine function), which get
+        awaited when exiting the topmost asynchronous context.
+
+        :param subtrees: Objects whose subtrees will be written to (sharded only).
+        :type subtrees: objetto.bases.BaseObject
+
+        :return: Asynchronous context manager.
+        :rtype: objetto.applications.ApplicationAsyncContext
+
+        :raises RuntimeError: Can't lock more subtrees while already locked.
+        """
+        if subtrees:
+            context = self.__.write_context(subtrees=subtrees)
+            return ApplicationAsyncContext(self, context, subtrees=subtrees)
+        return ApplicationAsyncContext(self, self.__.write_context())
+
+    @final
+    @contextmanager
+    def bulk_load_context(self):
+        # type: () -> Iterator
+        """
+        Bulk load context.
+
+        While loading, changes don't create actions, don't trigger reactions, and
+        are not recorded by histories. Hierarchy and data are still kept up to date.
+        When exiting, reactions run once for every affected object with a
+        :class:`objetto.changes.BulkLoad` change (changes they make are also part of
+        the load), and a single action carrying that change is sent for the root of
+        every affected hierarchy.
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute, list_attribute
+            >>> from objetto.observers import ActionObserver
+
+            >>> class Item(Object):
+            ...     value = attribute(int, default=0)
+            ...
+            >>> class Inventory(Object):
+            ...     items = list_attribute(Item)
+            ...
+            >>> class InventoryObserver(ActionObserver):
+            ...     def __observe__(self, action, phase):
+            ...         print((action.change.name, phase.value))
+            ...
+            >>> app = Application()
+            >>> inventory = Inventory(app)
+            >>> observer = InventoryObserver()
+            >>> token = observer.start_observing(inventory)
+            >>> with app.bulk_load_context():
+            ...     inventory.items.extend(Item(app, value=i) for i in range(100))
+            ...
+            ('Bulk Load', 'PRE')
+            ('Bulk Load', 'POST')
+            >>> inventory.data.items[-1].value
+            99
+
+        :return: Context manager.
+        :rtype: contextlib.AbstractContextManager
+        """
+        with self.__.bulk_load_context():
             yield
 
     @final
@@ -1777,6 +3911,50 @@ class Application(with_metaclass(ApplicationMeta, Base)):
             else:
                 raise TemporaryContextException()
 
+    @final
+    def submit(self, func, *args, **kwargs):
+        # type: (Callable, Any, Any) -> Future
+        """
+        Queue a callable to be executed inside a 'write' context by a single writer
+        thread and get a future for its result.
+
+        Queued callables are grouped into one outermost 'write' context (group
+        commit), so the lock is acquired and observers are notified once per group.
+        Each callable runs inside its own nested 'write' context, so if it raises an
+        exception only its own changes are rolled back. Futures are resolved after the
+        group's changes are pushed. If external observers fail after the changes are
+        merged, futures still get their own results and the
+        :class:`objetto.exceptions.ActionObserversFailedError` is raised in the writer
+        thread.
+
+        .. note::
+            Waiting on a future from within a 'write' context will deadlock.
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute
+
+            >>> class Person(Object):
+            ...     name = attribute(str, default="Albert")
+            ...
+            >>> app = Application()
+            >>> person = Person(app)
+            >>> future = app.submit(setattr, person, "name", "Einstein")
+            >>> future.result()
+            >>> person.name
+            'Einstein'
+
+        :param func: Callable.
+        :type func: collections.abc.Callable
+
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+
+        :return: Future.
+        :rtype: concurrent.futures.Future
+        """
+        return self.__.submit(func, *args, **kwargs)
+
     @final
     def take_snapshot(self):
         # type: () -> ApplicationSnapshot
@@ -1788,6 +3966,267 @@ class Application(with_metaclass(ApplicationMeta, Base)):
         """
         return self.__.take_snapshot()
 
+    @final
+    def fork(self):
+        # type: () -> ApplicationFork
+        """
+        Fork the current application state.
+
+        Forking is cheap, since the fork shares the application's storage until
+        changes are made in it. Changes made in a fork only copy the stores they touch
+        and are never seen by the application.
+
+        :return: Application fork.
+        :rtype: objetto.applications.ApplicationFork
+        """
+        return self.__.fork()
+
+    @final
+    @contextmanager
+    def fork_context(self, fork):
+        # type: (ApplicationFork) -> Iterator
+        """
+        Fork context.
+
+        While inside of it, the current thread reads from and writes to the fork
+        instead of the application. Reactions still run, but external observers are
+        not notified of changes made in forks. Each fork has its own lock, so different
+        forks can be used in parallel by different threads.
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute
+
+            >>> class Person(Object):
+            ...     name = attribute(str)
+            ...
+            >>> app = Application()
+            >>> obj = Person(app, name="Albert")
+            >>> fork = app.fork()
+            >>> with app.fork_context(fork):
+            ...     obj.name = "Einstein"
+            ...     obj.name
+            ...
+            'Einstein'
+            >>> obj.name
+            'Albert'
+            >>> with app.fork_context(fork):
+            ...     obj.name
+            ...
+            'Einstein'
+
+        :param fork: Application fork.
+        :type fork: objetto.applications.ApplicationFork
+
+        :return: Context manager.
+        :rtype: contextlib.AbstractContextManager
+
+        :raises ValueError: Application mismatch.
+        :raises RuntimeError: Can't enter a fork context while in another context.
+        """
+        with ReraiseContext((TypeError, ValueError), "'fork' parameter"):
+            assert_is_instance(fork, ApplicationFork)
+            if fork.app is not self:
+                error = "application mismatch"
+                raise ValueError(error)
+        with self.__.fork_context(fork):
+            yield
+
+    @final
+    def change_feed(self, sink):
+        # type: (Callable[[Tuple[ChangeRecord, ...]], Any]) -> ApplicationChangeFeed
+        """
+        Start sending every committed atomic change to a sink.
+
+        The sink gets called once per commit (in the order commits are merged) with a
+        tuple of :class:`objetto.applications.ChangeRecord`, which can be written to a
+        file, put in a queue, sent over the network, etc. Changes made to history
+        objects and in forks are not sent.
+
+        :param sink: Function that takes the change records of a commit.
+        :type sink: function
+
+        :return: Change feed (can be used as a context manager to stop it).
+        :rtype: objetto.applications.ApplicationChangeFeed
+        """
+        from ._change_feed import ApplicationChangeFeed
+
+        return ApplicationChangeFeed(self, sink)
+
+    @final
+    def replay(self, records):
+        # type: (Iterable[ChangeRecord]) -> None
+        """
+        Apply change records in bulk, with reactions and observers suspended.
+
+        Can be called repeatedly to catch up with a feed. The application should start
+        in the same state the application being fed was in when its change feed
+        started (usually both only have their root objects).
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute, root
+
+            >>> class Person(Object):
+            ...     name = attribute(str, default="")
+            ...
+            >>> class App(Application):
+            ...     person = root(Person)
+            ...
+            >>> app, replica = App(), App()
+            >>> records = []
+            >>> with app.change_feed(records.extend):
+            ...     app.person.name = "Albert"
+            ...
+            >>> replica.replay(records)
+            >>> replica.person.name
+            'Albert'
+
+        :param records: Change records.
+        :type records: collections.abc.Iterable[objetto.applications.ChangeRecord]
+
+        :raises ValueError: Can't replay record.
+        """
+        from ._change_feed import replay
+
+        replay(self, records)
+
+    @final
+    def set_observer_executor(self, executor):
+        # type: (Any) -> None
+        """
+        Dispatch actions to observers through an executor (such as a
+        :class:`concurrent.futures.ThreadPoolExecutor`) instead of calling them
+        one after another while the application is locked.
+
+        Every observer gets a serial lane, so it observes actions in order, while
+        different observers run concurrently. Token dependencies are honored across
+        lanes. Observers read the application's current state, not the state at the
+        time of the action. Asynchronous action observers and digest observers are not
+        affected.
+
+        Actions already dispatched are drained before switching executors.
+
+        .. code:: python
+
+            >>> from concurrent.futures import ThreadPoolExecutor
+            >>> from objetto import Application, Object, attribute
+            >>> from objetto.constants import POST
+            >>> from objetto.observers import ActionObserver
+
+            >>> class Person(Object):
+            ...     name = attribute(str, default="Albert")
+            ...
+            >>> class PersonObserver(ActionObserver):
+            ...     def __observe__(self, action, phase):
+            ...         if phase is POST:
+            ...             print(action.change.new_values["name"])
+            ...
+            >>> app = Application()
+            >>> person = Person(app)
+            >>> observer = PersonObserver()
+            >>> token = observer.start_observing(person)
+            >>> executor = ThreadPoolExecutor(4)
+            >>> app.set_observer_executor(executor)
+            >>> person.name = "Einstein"
+            >>> app.drain_observers()
+            Einstein
+            >>> app.set_observer_executor(None)
+            >>> executor.shutdown()
+
+        :param executor: Executor (or `None` to dispatch synchronously).
+        :type executor: concurrent.futures.Executor or None
+
+        :raises ActionObserversFailedError: External observers raised exceptions.
+        """
+        self.__.set_observer_executor(executor)
+
+    @final
+    def drain_observers(self, timeout=None):
+        # type: (Optional[float]) -> None
+        """
+        Wait until observers received all actions dispatched through the executor
+        (see :meth:`set_observer_executor`).
+
+        :param timeout: Timeout in seconds (None to wait indefinitely).
+        :type timeout: float or None
+
+        :raises ActionObserversFailedError: External observers raised exceptions \
+(since the last drain).
+        :raises RuntimeError: Timed out or called from an observer.
+        """
+        self.__.drain_observers(timeout)
+
+    @final
+    def enable_stats(self):
+        # type: () -> None
+        """
+        Start accumulating performance counters (they are disabled by default).
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute
+
+            >>> class Person(Object):
+            ...     name = attribute(str)
+            ...
+            >>> app = Application()
+            >>> app.enable_stats()
+            >>> obj = Person(app, name="Albert")
+            >>> obj.name = "Einstein"
+            >>> stats = app.stats()
+            >>> stats.commits, stats.changes, stats.objects
+            (3, 2, 1)
+            >>> app.reset_stats()
+            >>> app.stats().commits
+            0
+        """
+        self.__.set_stats_enabled(True)
+
+    @final
+    def disable_stats(self):
+        # type: () -> None
+        """Stop accumulating performance counters and discard them."""
+        self.__.set_stats_enabled(False)
+
+    @final
+    def reset_stats(self):
+        # type: () -> None
+        """Reset performance counters (if enabled), for per-request measurement."""
+        self.__.reset_stats()
+
+    @final
+    def stats(self):
+        # type: () -> ApplicationStats
+        """
+        Get performance counters (zeros if not enabled), along with the number of live
+        objects and stores.
+
+        :return: Application stats.
+        :rtype: objetto.applications.ApplicationStats
+        """
+        return self.__.stats()
+
+    @property
+    def stats_enabled(self):
+        # type: () -> bool
+        """
+        Whether performance counters are enabled.
+
+        :rtype: bool
+        """
+        return self.__.stats_enabled
+
+    @property
+    def is_sharded(self):
+        # type: () -> bool
+        """
+        Whether root subtrees have their own locks.
+
+        :rtype: bool
+        """
+        return self.__.is_sharded
+
     @property
     def is_writing(self):
         # type: () -> bool
@@ -1808,6 +4247,172 @@ class Application(with_metaclass(ApplicationMeta, Base)):
         """
         return self.__.is_reading
 
+    @property
+    def is_forked(self):
+        # type: () -> bool
+        """
+        Whether the current thread is inside a fork context.
+
+        :rtype: bool
+        """
+        return self.__.is_forked
+
+
+@final
+class ApplicationAsyncContext(Base):
+    """
+    Asynchronous context manager that enters an application context on behalf of an
+    asyncio task.
+
+      - Polls the lock without blocking the event loop.
+      - While a task is inside an asynchronous context, other tasks running in the
+        same thread wait to enter asynchronous contexts and can't enter 'write'
+        contexts.
+      - Awaits awaitables returned by observers when exiting the topmost asynchronous
+        context.
+
+    .. note::
+        This class can't be instantiated directly. Use
+        :meth:`objetto.applications.Application.async_read_context` or
+        :meth:`objetto.applications.Application.async_write_context` instead.
+
+    :param app: Application.
+    :type app: objetto.applications.Application
+
+    :param context: Context manager.
+    :type context: contextlib.AbstractContextManager
+
+    :param lock: Whether the context acquires locks.
+    :type lock: bool
+
+    :param subtrees: Objects whose subtrees should be locked (sharded only).
+    :type subtrees: tuple[objetto.bases.BaseObject] or None
+    """
+
+    __slots__ = ("__app", "__context", "__lock", "__subtrees", "__topmost")
+
+    __min_delay = 0.001
+    __max_delay = 0.05
+
+    def __init__(
+        self,
+        app,  # type: Application
+        context,  # type: ContextManager
+        lock=True,  # type: bool
+        subtrees=None,  # type: Optional[Tuple[BaseObject, ...]]
+    ):
+        # type: (...) -> None
+        self.__app = app
+        self.__context = context
+        self.__lock = lock
+        self.__subtrees = subtrees
+        self.__topmost = None  # type: Optional[bool]
+
+    def __aenter__(self):
+        # type: () -> Any
+        """
+        Enter context.
+
+        :return: Awaitable.
+        """
+        from types import coroutine
+
+        return coroutine(self.__enter)()
+
+    def __enter(self):
+        # type: () -> Iterator
+        """
+        Keep trying to enter the context, sleeping in between attempts.
+
+        :return: Generator-based coroutine.
+        """
+        from asyncio import sleep
+
+        if self.__topmost is not None:
+            error = "asynchronous context was already entered"
+            raise RuntimeError(error)
+
+        task = _current_task()
+        delay = 0.0
+        while True:
+            topmost = self.__app.__.async_enter(
+                task, self.__context, lock=self.__lock, subtrees=self.__subtrees
+            )
+            if topmost is not None:
+                self.__topmost = topmost
+                break
+            delay = min(max(delay * 2, self.__min_delay), self.__max_delay)
+            for item in sleep(delay).__await__():
+                yield item
+
+    def __aexit__(self, exc_type, exc_value, exc_tb):
+        # type: (Optional[Type[BaseException]], Any, Any) -> Any
+        """
+        Exit context.
+
+        :param exc_type: Exception type.
+        :param exc_value: Exception.
+        :param exc_tb: Traceback.
+        :return: Awaitable (resolves to whether to suppress the exception).
+        :raises ActionObserversFailedError: External observers raised exceptions.
+        """
+        from asyncio import gather, get_event_loop
+
+        topmost = self.__topmost
+        assert topmost is not None
+        suppress, awaitables = self.__app.__.async_exit(
+            self.__context, topmost, exc_type, exc_value, exc_tb
+        )
+
+        future = get_event_loop().create_future()
+        if not awaitables:
+            future.set_result(suppress)
+            return future
+
+        gathered = gather(*(a for _, _, _, a in awaitables), return_exceptions=True)
+
+        def gathered_done(_):
+            """Set future's result or exception."""
+            if future.cancelled():
+                return
+            if gathered.cancelled():
+                future.cancel()
+                return
+            from ._observers import ActionObserverExceptionData
+
+            exception_infos = []  # type: List[ActionObserverExceptionData]
+            for (observer, action, phase, _), result in zip(
+                awaitables, gathered.result()
+            ):
+                if isinstance(result, BaseException):
+                    exception_info = ActionObserverExceptionData(
+                        observer=observer,
+                        action=action.to_action(),
+                        phase=phase,
+                        exception_type=type(result),
+                        exception=result,
+                        traceback=getattr(result, "__traceback__", None),
+                    )
+                    exception_infos.append(exception_info)
+            if exception_infos:
+                future.set_exception(
+                    ActionObserversFailedError(
+                        "external observers raised exceptions (see tracebacks below)",
+                        tuple(exception_infos),
+                    )
+                )
+            else:
+                future.set_result(suppress)
+
+        def future_done(_):
+            """Cancel gathering if future was cancelled."""
+            if future.cancelled():
+                gathered.cancel()
+
+        gathered.add_done_callback(gathered_done)
+        future.add_done_callback(future_done)
+        return future
+
 
 @final
 class ApplicationSnapshot(Base):
@@ -1852,16 +4457,192 @@ class ApplicationSnapshot(Base):
     __slots__ = ("__app", "__storage")
 
     def __init__(self, app, storage):
-        # type: (Application, Storage) -> None
+        # type: (Application, SlotStorage[BaseObject, Store]) -> None
+        self.__app = app
+        self.__storage = storage
+
+    @property
+    def _storage(self):
+        # type: () -> SlotStorage[BaseObject, Store]
+        """Internal storage."""
+        return self.__storage
+
+    def diff(self, other):
+        # type: (ApplicationSnapshot) -> ApplicationSnapshotDiff
+        """
+        Get which objects changed between this snapshot and another one.
+
+        Snapshots share structure with the snapshots taken before them, so the cost of
+        comparing them is usually proportional to the changes made in between, not to
+        the size of the application.
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute
+
+            >>> class Person(Object):
+            ...     name = attribute(str)
+            ...
+            >>> app = Application()
+            >>> obj = Person(app, name="Albert")
+            >>> snapshot = app.take_snapshot()
+            >>> obj.name = "Einstein"
+            >>> diff = snapshot.diff(app.take_snapshot())
+            >>> diff.modified[obj]
+            {'name': ('Albert', 'Einstein')}
+
+        :param other: Snapshot taken before or after this one.
+        :type other: objetto.applications.ApplicationSnapshot
+
+        :return: Added, removed, and modified objects (from this snapshot to the other).
+        :rtype: objetto.applications.ApplicationSnapshotDiff
+
+        :raises ValueError: Application mismatch.
+        """
+        with ReraiseContext((TypeError, ValueError), "'other' parameter"):
+            assert_is_instance(other, ApplicationSnapshot)
+            if other.app is not self.__app:
+                error = "application mismatch"
+                raise ValueError(error)
+
+        added = set()  # type: Set[BaseObject]
+        removed = set()  # type: Set[BaseObject]
+        modified = {}  # type: Dict[BaseObject, Dict[Any, Tuple[Any, Any]]]
+        for entry, other_entry in itervalues(self.__storage.diff(other._storage)):
+            if entry is not None and other_entry is not None:
+                if entry[0] is other_entry[0]:
+                    delta = _diff_states(entry[1].state, other_entry[1].state)
+                    if delta:
+                        modified[entry[0]] = delta
+                    continue
+            if entry is not None:
+                removed.add(entry[0])
+            if other_entry is not None:
+                added.add(other_entry[0])
+        return ApplicationSnapshotDiff(frozenset(added), frozenset(removed), modified)
+
+    @property
+    def app(self):
+        # type: () -> Application
+        """
+        Application.
+
+        :rtype: objetto.applications.Application
+        """
+        return self.__app
+
+
+def _diff_states(old_state, new_state):
+    # type: (BaseState, BaseState) -> Dict[Any, Tuple[Any, Any]]
+    """
+    Compare two states of the same object.
+
+    :param old_state: Old state.
+    :param new_state: New state.
+    :return: Old and new values mapped by location (missing values are `DELETED`).
+    """
+    from ._objects import DELETED
+
+    delta = {}  # type: Dict[Any, Tuple[Any, Any]]
+    if old_state is new_state:
+        return delta
+
+    # Sets have their values as locations.
+    if isinstance(old_state, SetState) and isinstance(new_state, SetState):
+        for value in old_state.difference(new_state):
+            delta[value] = (value, DELETED)
+        for value in new_state.difference(old_state):
+            delta[value] = (DELETED, value)
+        return delta
+
+    # Lists have indexes as locations, dictionaries have keys.
+    if isinstance(old_state, ListState) and isinstance(new_state, ListState):
+        old_items = dict(enumerate(old_state))  # type: Mapping[Any, Any]
+        new_items = dict(enumerate(new_state))  # type: Mapping[Any, Any]
+    else:
+        old_items = cast("DictState[Any, Any]", old_state)
+        new_items = cast("DictState[Any, Any]", new_state)
+    for location in set(old_items).union(new_items):
+        old_value = old_items.get(location, DELETED)
+        new_value = new_items.get(location, DELETED)
+        if old_value is not new_value and old_value != new_value:
+            delta[location] = (old_value, new_value)
+    return delta
+
+
+# noinspection PyUnresolvedReferences
+class ApplicationSnapshotDiff(
+    NamedTuple(
+        "ApplicationSnapshotDiff",
+        (
+            ("added", "FrozenSet[BaseObject]"),
+            ("removed", "FrozenSet[BaseObject]"),
+            ("modified", "Dict[BaseObject, Dict[Any, Tuple[Any, Any]]]"),
+        ),
+    )
+):
+    """
+    Objects that changed between two
+    :class:`objetto.applications.ApplicationSnapshot` (see
+    :meth:`objetto.applications.ApplicationSnapshot.diff`).
+
+    Modified objects are mapped to their state deltas: old and new values mapped by
+    attribute name (or dictionary key, list index, or set value), with
+    :data:`objetto.constants.DELETED` standing for missing values.
+
+    :param added: Objects only in the other snapshot.
+    :param removed: Objects only in this snapshot.
+    :param modified: State deltas of objects in both snapshots whose state changed.
+    """
+
+    __slots__ = ()
+
+
+@final
+class ApplicationFork(Base):
+    """
+    Application fork.
+
+    Inherits from:
+      - :class:`objetto.bases.Base`
+
+    Features:
+      - Branches off the application state at a moment in time.
+      - Can be used with an application's fork context to make changes that are never
+        seen by the application (for "what if" evaluations, for example).
+
+    You can acquire a fork by calling the :meth:`objetto.applications.Application.fork`
+    method. You can then pass it to a
+    :meth:`objetto.applications.Application.fork_context` in order to read and write to
+    it. Objects are the same in the application and in its forks, only their state
+    differs. Objects created inside a fork context are only valid in that fork.
+    """
+
+    __slots__ = ("__app", "__lock", "__storage")
+
+    def __init__(self, app, storage):
+        # type: (Application, SlotStorage[BaseObject, Store]) -> None
         self.__app = app
+        self.__lock = ApplicationLock()
         self.__storage = storage
 
+    @property
+    def _lock(self):
+        # type: () -> ApplicationLock
+        """Internal lock."""
+        return self.__lock
+
     @property
     def _storage(self):
-        # type: () -> Storage
+        # type: () -> SlotStorage[BaseObject, Store]
         """Internal storage."""
         return self.__storage
 
+    @_storage.setter
+    def _storage(self, storage):
+        # type: (SlotStorage[BaseObject, Store]) -> None
+        self.__storage = storage
+
     @property
     def app(self):
         # type: () -> Application
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""Feed of committed changes and their replay."""
+
+import pickle
+from io import BytesIO
+from threading import Lock
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple, Union
+from weakref import WeakKeyDictionary, ref
+
+from six import iteritems
+from six.moves import collections_abc
+
+from ._applications import Application
+from ._bases import Base, final
+from ._changes import (
+    DictUpdate,
+    ListDelete,
+    ListInsert,
+    ListMove,
+    ListUpdate,
+    SetRemove,
+    SetUpdate,
+    Update,
+)
+from ._objects import DELETED, BaseObject
+from ._snapshot_log import _get_type_ref, _resolve_type_ref
+from .utils.reraise_context import ReraiseContext
+from .utils.type_checking import assert_is_callable, assert_is_instance
+
+if TYPE_CHECKING:
+    from typing import (
+        IO,
+        Any,
+        Callable,
+        Dict,
+        Iterable,
+        Iterator,
+        List,
+        Mapping,
+        MutableMapping,
+        Type,
+    )
+
+    from ._changes import BaseAtomicChange
+    from ._snapshot_log import TypeRef
+
+__all__ = ["ChangeRecord", "ApplicationChangeFeed"]
+
+
+_RELEASE = "Release"
+
+_CHANGE_FIELDS = {
+    Update: ("new_values", "old_values"),
+    DictUpdate: ("new_values", "old_values"),
+    ListInsert: ("index", "stop", "new_values"),
+    ListDelete: ("index", "stop"),
+    ListUpdate: ("index", "stop", "new_values"),
+    ListMove: ("index", "stop", "target_index"),
+    SetUpdate: ("new_values",),
+    SetRemove: ("old_values",),
+}  # type: Dict[Type[BaseAtomicChange], Tuple[str, ...]]
+
+
+# noinspection PyUnresolvedReferences
+class ChangeRecord(
+    NamedTuple(
+        "ChangeRecord",
+        (
+            ("obj_id", Union[int, Tuple]),
+            ("obj_type", Optional[Tuple]),
+            ("change_type", str),
+            ("payload", bytes),
+        ),
+    )
+):
+    """
+    Record of a committed atomic change, sent by change feeds.
+
+    Records are plain tuples of primitives and can be pickled.
+
+    :param obj_id: Object id in the feed (or path from a root, starting with the root \
+name, for objects that existed before the feed started).
+    :type obj_id: int or tuple
+
+    :param obj_type: Reference to the object's type (the first time it's recorded).
+    :type obj_type: tuple or None
+
+    :param change_type: Change type name (or 'Release' if object is gone).
+    :type change_type: str
+
+    :param payload: Pickled change values.
+    :type payload: bytes
+    """
+
+    __slots__ = ()
+
+
+class _ChangePickler(pickle.Pickler):
+    """
+    Pickles objects as references to them.
+
+    :param file: File.
+    :param feed: Change feed.
+    """
+
+    def __init__(self, file, feed):
+        # type: (IO[bytes], ApplicationChangeFeed) -> None
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        self.__feed = feed
+
+    def persistent_id(self, obj):
+        # type: (Any) -> Optional[Tuple[Any, ...]]
+        if isinstance(obj, BaseObject):
+            return self.__feed._get_ids(obj)
+        if obj is DELETED:
+            return ("x",)
+        return None
+
+
+class _ChangeUnpickler(pickle.Unpickler):
+    """
+    Unpickles references to objects.
+
+    :param file: File.
+    :param app: Application.
+    """
+
+    def __init__(self, file, app):
+        # type: (IO[bytes], Application) -> None
+        pickle.Unpickler.__init__(self, file)
+        self.__app = app
+
+    def persistent_load(self, pid):
+        # type: (Tuple[Any, ...]) -> Any
+        if pid[0] == "x":
+            return DELETED
+        return _get_replayed_obj(self.__app, *pid[1:])
+
+
+@final
+class ApplicationChangeFeed(Base):
+    """
+    Sends every committed atomic change of an application to a sink.
+
+    Inherits from:
+      - :class:`objetto.bases.Base`
+
+    Objects created after the feed started get an id the first time they're recorded,
+    along with a reference to their type. Objects that existed before are identified by
+    their path from a root at the time the feed started (except for children of set
+    objects, which can't be referenced). When an object that was recorded is gone, a
+    'Release' record is sent, so replicas can let go of it too.
+
+    :param app: Application.
+    :type app: objetto.applications.Application
+
+    :param sink: Function that takes the change records of a commit.
+    :type sink: function
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "__app",
+        "__sink",
+        "__lock",
+        "__ids",
+        "__refs",
+        "__next_oid",
+        "__released",
+    )
+
+    def __init__(self, app, sink):
+        # type: (Application, Callable[[Tuple[ChangeRecord, ...]], Any]) -> None
+        with ReraiseContext(TypeError, "'app' parameter"):
+            assert_is_instance(app, Application)
+        with ReraiseContext(TypeError, "'sink' parameter"):
+            assert_is_callable(sink)
+        self.__app = app
+        self.__sink = sink
+        self.__lock = Lock()
+        self.__ids = WeakKeyDictionary()  # type: MutableMapping[BaseObject, Any]
+        self.__refs = {}  # type: Dict[Any, ref]
+        self.__next_oid = 0
+        self.__released = []  # type: List[Any]
+        with app.read_context():
+            for path, obj in _walk(app):
+                self.__add_id(obj, path)
+            app.__.replication.add_feed(self)
+
+    def __enter__(self):
+        # type: () -> ApplicationChangeFeed
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __send__(self, changes):
+        # type: (Tuple[BaseAtomicChange, ...]) -> None
+        """
+        Send changes merged by the application to the sink.
+
+        :param changes: Atomic changes.
+        """
+        with self.__lock:
+            records = []  # type: List[ChangeRecord]
+            for change in changes:
+                obj_ids = self._get_ids(change.obj)
+                file = BytesIO()
+                _ChangePickler(file, self).dump(
+                    tuple(
+                        _plain(getattr(change, n)) for n in _CHANGE_FIELDS[type(change)]
+                    )
+                )
+                records.append(
+                    ChangeRecord(
+                        obj_ids[1],
+                        obj_ids[2],
+                        type(change).__name__,
+                        file.getvalue(),
+                    )
+                )
+
+            # Objects that are gone.
+            released = self.__released
+            while released:
+                oid = released.pop()
+                del self.__refs[oid]
+                records.append(ChangeRecord(oid, None, _RELEASE, b""))
+
+            self.__sink(tuple(records))
+
+    def __add_id(self, obj, obj_id):
+        # type: (BaseObject, Any) -> None
+        """
+        Add id for an object and get notified when it's gone.
+
+        :param obj: Object.
+        :param obj_id: Object id (or path).
+        """
+        self.__ids[obj] = obj_id
+        self.__refs[obj_id] = ref(obj, lambda _, i=obj_id: self.__released.append(i))
+
+    def _get_ids(self, obj):
+        # type: (BaseObject) -> Tuple[str, Any, Optional[TypeRef]]
+        """
+        Get ids for an object (along with its type reference if it's new to the feed).
+
+        :param obj: Object.
+        :return: Kind ('p' for path or 'o' for id), id, and type reference (if new).
+        :raises ValueError: Object is from another application.
+        """
+        try:
+            obj_id = self.__ids[obj]
+        except KeyError:
+            pass
+        else:
+            return "p" if type(obj_id) is tuple else "o", obj_id, None
+        if obj.app is not self.__app:
+            error = "can't record {}, which is from another application".format(obj)
+            raise ValueError(error)
+        obj_id = self.__next_oid
+        self.__next_oid += 1
+        self.__add_id(obj, obj_id)
+        return "o", obj_id, self.__get_type_ref(obj)
+
+    def __get_type_ref(self, obj):
+        # type: (BaseObject) -> TypeRef
+        """
+        Get reference to an object's type.
+
+        :param obj: Object.
+        :return: Type reference.
+        """
+        try:
+            return _get_type_ref(type(obj))
+        except ValueError:
+            parent = obj._parent
+            if parent is None:
+                raise
+            return _get_type_ref(
+                type(obj), self.__get_type_ref(parent), parent._locate(obj)
+            )
+
+    def close(self):
+        # type: () -> None
+        """Stop sending changes."""
+        self.__app.__.replication.remove_feed(self)
+
+    @property
+    def app(self):
+        # type: () -> Application
+        """
+        Application.
+
+        :rtype: objetto.applications.Application
+        """
+        return self.__app
+
+
+def _plain(value):
+    # type: (Any) -> Any
+    """
+    Convert data containers of change values into plain ones.
+
+    :param value: Value.
+    :return: Plain value.
+    """
+    if isinstance(value, collections_abc.Mapping):
+        return dict(iteritems(value))
+    if isinstance(value, (collections_abc.Sequence, collections_abc.Set)):
+        return tuple(value)
+    return value
+
+
+def _walk(app):
+    # type: (Application) -> Iterator[Tuple[Tuple, BaseObject]]
+    """
+    Walk the hierarchy of the root objects (needs a read context).
+
+    :param app: Application.
+    :return: Paths (starting with the root name) and objects.
+    """
+    for root_name, root in iteritems(type(app)._roots):
+        stack = [((root_name,), app.__.get_root_obj(root))]
+        while stack:
+            path, obj = stack.pop()
+            yield path, obj
+            for child in app.__.read(obj).children:
+                location = obj._locate(child)
+                if not isinstance(location, BaseObject):
+                    stack.append((path + (location,), child))
+
+
+def _get_replayed_obj(app, obj_id, type_ref=None):
+    # type: (Application, Any, Optional[TypeRef]) -> BaseObject
+    """
+    Get object being replayed, create it if it's new.
+
+    :param app: Application.
+    :param obj_id: Object id in the feed (or path).
+    :param type_ref: Type reference (if new).
+    :return: Object.
+    :raises ValueError: Unknown object.
+    """
+    objects = app.__.replication.objects
+    try:
+        return objects[obj_id]
+    except KeyError:
+        if type_ref is None:
+            error = "object {} is not known by the application".format(obj_id)
+            raise ValueError(error)
+    cls = _resolve_type_ref(type_ref)  # type: Type[BaseObject]
+    obj = objects[obj_id] = app.__.make_object(cls)
+    return obj
+
+
+def _replay_update(obj, new_values, old_values):
+    # type: (Any, Mapping[str, Any], Mapping[str, Any]) -> None
+    type(obj).__functions__.raw_update(obj, new_values, old_values)
+
+
+def _replay_dict_update(obj, new_values, _):
+    # type: (Any, Mapping[Any, Any], Any) -> None
+    type(obj).__functions__.update(obj, new_values, factory=False)
+
+
+def _replay_list_insert(obj, index, _, new_values):
+    # type: (Any, int, int, Iterable[Any]) -> None
+    type(obj).__functions__.insert(obj, index, new_values, factory=False)
+
+
+def _replay_list_delete(obj, index, stop):
+    # type: (Any, int, int) -> None
+    type(obj).__functions__.delete(obj, slice(index, stop))
+
+
+def _replay_list_update(obj, index, stop, new_values):
+    # type: (Any, int, int, Iterable[Any]) -> None
+    type(obj).__functions__.update(obj, slice(index, stop), new_values, factory=False)
+
+
+def _replay_list_move(obj, index, stop, target_index):
+    # type: (Any, int, int, int) -> None
+    type(obj).__functions__.move(obj, slice(index, stop), target_index)
+
+
+def _replay_set_update(obj, new_values):
+    # type: (Any, Iterable[Any]) -> None
+    type(obj).__functions__.update(obj, new_values, factory=False)
+
+
+def _replay_set_remove(obj, old_values):
+    # type: (Any, Iterable[Any]) -> None
+    type(obj).__functions__.remove(obj, old_values)
+
+
+_REPLAYERS = {
+    Update.__name__: _replay_update,
+    DictUpdate.__name__: _replay_dict_update,
+    ListInsert.__name__: _replay_list_insert,
+    ListDelete.__name__: _replay_list_delete,
+    ListUpdate.__name__: _replay_list_update,
+    ListMove.__name__: _replay_list_move,
+    SetUpdate.__name__: _replay_set_update,
+    SetRemove.__name__: _replay_set_remove,
+}  # type: Dict[str, Callable[..., None]]
+
+
+def replay(app, records):
+    # type: (Application, Iterable[ChangeRecord]) -> None
+    """
+    Apply change records to an application in bulk.
+
+    :param app: Application.
+    :param records: Change records.
+    :raises ValueError: Can't replay record.
+    """
+    replication = app.__.replication
+    objects = replication.objects
+    with app.__.replay_context():
+
+        # Objects that existed when the feed started are found by their paths.
+        if not replication.replaying:
+            replication.replaying = True
+            objects.update(_walk(app))
+
+        for record in records:
+            if record.change_type == _RELEASE:
+                objects.pop(record.obj_id, None)
+                continue
+            try:
+                replayer = _REPLAYERS[record.change_type]
+            except KeyError:
+                error = "can't replay '{}' change".format(record.change_type)
+                raise ValueError(error)
+            obj = _get_replayed_obj(app, record.obj_id, record.obj_type)
+            args = _ChangeUnpickler(BytesIO(record.payload), app).load()
+            replayer(obj, *args)
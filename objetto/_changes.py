@@ -26,6 +26,7 @@ __all__ = [
     "BaseChange",
     "BaseAtomicChange",
     "Batch",
+    "BulkLoad",
     "Update",
     "DictUpdate",
     "ListInsert",
@@ -47,6 +48,7 @@ class BaseChange(Data):
     Inherited By:
       - :class:`objetto.bases.BaseAtomicChange`
       - :class:`objetto.changes.Batch`
+      - :class:`objetto.changes.BulkLoad`
     """
 
     name = data_attribute(STRING_TYPES, checked=False, abstracted=True)  # type: str
@@ -209,6 +211,41 @@ class Batch(BaseChange):
     """
 
 
+@final
+class BulkLoad(BaseChange):
+    """
+    Objects have been loaded in bulk.
+
+    Inherits from:
+      - :class:`objetto.bases.BaseChange`
+    """
+
+    name = data_attribute(STRING_TYPES, checked=False, default="Bulk Load")  # type: str
+    """
+    Name describing the change.
+
+    :type: str
+    """
+
+    objects = data_protected_set_attribute(
+        ".._objects|BaseObject",
+        subtypes=True,
+        checked=False,
+    )  # type: SetData[BaseObject]
+    """
+    Objects changed while loading (in the hierarchy of the object being changed).
+
+    :type: objetto.data.SetData[objetto.bases.BaseObject]
+    """
+
+    is_atomic = data_constant_attribute(False, finalized=True)  # type: bool
+    """
+    Whether change is atomic or not.
+
+    :type: bool
+    """
+
+
 @final
 class Update(BaseAtomicChange):
     """
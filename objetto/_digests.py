@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""Coalesced digests of the actions committed in a write context."""
+
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+from ._changes import (
+    DictUpdate,
+    ListDelete,
+    ListInsert,
+    ListMove,
+    ListUpdate,
+    SetRemove,
+    SetUpdate,
+    Update,
+)
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, List, Mapping, Type
+
+    from ._applications import ActionRecord
+    from ._changes import BaseAtomicChange
+    from ._objects import BaseObject
+
+__all__ = ["ListRange", "ObjectDigest", "ActionDigest"]
+
+
+# noinspection PyUnresolvedReferences
+class ListRange(
+    NamedTuple(
+        "ListRange",
+        (
+            ("change_type", "Type[BaseAtomicChange]"),
+            ("index", int),
+            ("stop", int),
+            ("target_index", Optional[int]),
+        ),
+    )
+):
+    """
+    Range of a list affected by consecutive list changes of the same type.
+
+    Inserted ranges are where the values ended up, deleted ranges are where the
+    values were before the first of the merged deletions.
+
+    :param change_type: :class:`objetto.changes.ListInsert`, \
+:class:`objetto.changes.ListDelete`, :class:`objetto.changes.ListUpdate` or \
+:class:`objetto.changes.ListMove`.
+    :param index: First index.
+    :param stop: Stop index.
+    :param target_index: Target index (moves only).
+    """
+
+    __slots__ = ()
+
+
+# noinspection PyUnresolvedReferences
+class ObjectDigest(
+    NamedTuple(
+        "ObjectDigest",
+        (
+            ("sender", "BaseObject"),
+            ("locations", "Tuple[Any, ...]"),
+            ("changes", int),
+            ("old_values", "Mapping[Any, Any]"),
+            ("new_values", "Mapping[Any, Any]"),
+            ("list_ranges", Tuple[ListRange, ...]),
+            ("added_values", "Tuple[Any, ...]"),
+            ("removed_values", "Tuple[Any, ...]"),
+            ("added_children", "Tuple[BaseObject, ...]"),
+            ("removed_children", "Tuple[BaseObject, ...]"),
+        ),
+    )
+):
+    """
+    Net changes that happened in a single object during a commit.
+
+    :param sender: Object where the changes happened.
+    :param locations: Relative locations from the receiver to the sender.
+    :param changes: Number of changes coalesced into this digest.
+    :param old_values: Attribute/key values before the first update.
+    :param new_values: Attribute/key values after the last update (last write wins).
+    :param list_ranges: Merged list ranges, in order.
+    :param added_values: Values added to a set (net).
+    :param removed_values: Values removed from a set (net).
+    :param added_children: Children adopted by the object (net).
+    :param removed_children: Children released by the object (net).
+    """
+
+    __slots__ = ()
+
+
+# noinspection PyUnresolvedReferences
+class ActionDigest(
+    NamedTuple(
+        "ActionDigest",
+        (
+            ("receiver", "BaseObject"),
+            ("objects", Tuple[ObjectDigest, ...]),
+        ),
+    )
+):
+    """
+    Coalesced actions received by an object during an outermost commit.
+
+    :param receiver: Object that received the actions.
+    :param objects: Digests, one per sender.
+    """
+
+    __slots__ = ()
+
+    @property
+    def changes(self):
+        # type: () -> int
+        """
+        Total number of changes coalesced into this digest.
+
+        :rtype: int
+        """
+        return sum(o.changes for o in self.objects)
+
+
+class _NetValues(object):
+    """Values added/removed so far, where removing an added value cancels it out."""
+
+    __slots__ = ("added", "removed")
+
+    def __init__(self):
+        # type: () -> None
+        self.added = {}  # type: Dict[Any, None]
+        self.removed = {}  # type: Dict[Any, None]
+
+    def add(self, values):
+        # type: (Iterable[Any]) -> None
+        """
+        Add values (cancelling out removed ones).
+
+        :param values: Values.
+        """
+        for value in values:
+            if value in self.removed:
+                del self.removed[value]
+            else:
+                self.added[value] = None
+
+    def remove(self, values):
+        # type: (Iterable[Any]) -> None
+        """
+        Remove values (cancelling out added ones).
+
+        :param values: Values.
+        """
+        for value in values:
+            if value in self.added:
+                del self.added[value]
+            else:
+                self.removed[value] = None
+
+
+class _ObjectDigestBuilder(object):
+    """Accumulates changes from a single sender."""
+
+    __slots__ = (
+        "locations",
+        "changes",
+        "old_values",
+        "new_values",
+        "list_ranges",
+        "values",
+        "children",
+    )
+
+    def __init__(self, locations):
+        # type: (Tuple[Any, ...]) -> None
+        self.locations = locations
+        self.changes = 0
+        self.old_values = {}  # type: Dict[Any, Any]
+        self.new_values = {}  # type: Dict[Any, Any]
+        self.list_ranges = []  # type: List[ListRange]
+        self.values = _NetValues()
+        self.children = _NetValues()
+
+    def add(self, change):
+        # type: (BaseAtomicChange) -> None
+        """
+        Add a change.
+
+        :param change: Atomic change sent by this builder's sender.
+        """
+        self.changes += 1
+        change_type = type(change)
+
+        if change_type is Update or change_type is DictUpdate:
+            old_values = self.old_values
+            for key, value in change.old_values.items():
+                if key not in old_values:
+                    old_values[key] = value
+            self.new_values.update(change.new_values)
+        elif change_type is SetUpdate:
+            self.values.add(change.new_values)
+        elif change_type is SetRemove:
+            self.values.remove(change.old_values)
+        elif change_type is ListMove:
+            self.list_ranges.append(
+                ListRange(ListMove, change.index, change.stop, change.target_index)
+            )
+        elif change_type in (ListInsert, ListDelete, ListUpdate):
+            self.__add_list_range(change_type, change.index, change.stop)
+
+        self.children.remove(change.old_children)
+        self.children.add(change.new_children)
+
+    def __add_list_range(self, change_type, index, stop):
+        # type: (Type[BaseAtomicChange], int, int) -> None
+        """
+        Add a list range, merging it into the last one when they are contiguous.
+
+        :param change_type: List change type (insert, delete, or update).
+        :param index: First index.
+        :param stop: Stop index.
+        """
+        list_ranges = self.list_ranges
+        if list_ranges and list_ranges[-1].change_type is change_type:
+            last = list_ranges[-1]
+            merged = None  # type: Optional[ListRange]
+            if change_type is ListInsert:
+                # Inserting inside (or right next to) the previous insertion.
+                if last.index <= index <= last.stop:
+                    merged = last._replace(stop=last.stop + stop - index)
+            elif change_type is ListDelete:
+                # Deleting around the spot of the previous deletion.
+                if index <= last.index <= stop:
+                    merged = ListRange(
+                        ListDelete, index, stop + last.stop - last.index, None
+                    )
+            elif index <= last.stop and stop >= last.index:
+                # Updating overlapping/adjacent indexes.
+                merged = ListRange(
+                    ListUpdate, min(index, last.index), max(stop, last.stop), None
+                )
+            if merged is not None:
+                list_ranges[-1] = merged
+                return
+        list_ranges.append(ListRange(change_type, index, stop, None))
+
+    def build(self, sender):
+        # type: (BaseObject) -> ObjectDigest
+        """
+        Build an object digest.
+
+        :param sender: Sender.
+        :return: Object digest.
+        """
+        return ObjectDigest(
+            sender=sender,
+            locations=self.locations,
+            changes=self.changes,
+            old_values=self.old_values,
+            new_values=self.new_values,
+            list_ranges=tuple(self.list_ranges),
+            added_values=tuple(self.values.added),
+            removed_values=tuple(self.values.removed),
+            added_children=tuple(self.children.added),
+            removed_children=tuple(self.children.removed),
+        )
+
+
+class ActionDigestBuilder(object):
+    """Builds digests from actions, grouped per receiver and then per sender."""
+
+    __slots__ = ("__receivers",)
+
+    def __init__(self):
+        # type: () -> None
+        self.__receivers = (
+            {}
+        )  # type: Dict[BaseObject, Dict[BaseObject, _ObjectDigestBuilder]]
+
+    def __bool__(self):
+        # type: () -> bool
+        """
+        Get whether any actions were added.
+
+        :return: True if not empty.
+        """
+        return bool(self.__receivers)
+
+    __nonzero__ = __bool__
+
+    def add(self, action):
+        # type: (ActionRecord) -> None
+        """
+        Add an action.
+
+        :param action: Action record (with an atomic change).
+        """
+        try:
+            senders = self.__receivers[action.receiver]
+        except KeyError:
+            senders = self.__receivers[action.receiver] = {}
+        try:
+            builder = senders[action.sender]
+        except KeyError:
+            builder = senders[action.sender] = _ObjectDigestBuilder(action.locations)
+        builder.add(action.change)
+
+    def build(self):
+        # type: () -> List[ActionDigest]
+        """
+        Build digests.
+
+        :return: Digests, one per receiver.
+        """
+        return [
+            ActionDigest(
+                receiver=receiver,
+                objects=tuple(b.build(s) for s, b in senders.items()),
+            )
+            for receiver, senders in self.__receivers.items()
+        ]
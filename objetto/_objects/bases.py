@@ -52,12 +52,17 @@ if TYPE_CHECKING:
         Union,
     )
 
-    from .._applications import Action, Phase, Store
+    from weakref import ReferenceType
+
+    from .._applications import ActionRecord, Phase, Store
     from .._history import HistoryObject
     from .._states import SetState
     from ..utils.factoring import LazyFactory
     from ..utils.type_checking import LazyTypes
 
+    # Parent versions and weak references to ancestors.
+    CachedHierarchy = Tuple[Tuple[int, ...], Tuple["ReferenceType[BaseObject]", ...]]
+
 __all__ = [
     "DELETED",
     "UNIQUE_ATTRIBUTES_METADATA_KEY",
@@ -345,8 +350,8 @@ class BaseReaction(Base):
         :param obj: Object.
         :type obj: objetto.bases.BaseObject
 
-        :param action: Action.
-        :type action: objetto.objects.Action
+        :param action: Action record.
+        :type action: objetto.objects.ActionRecord
 
         :param phase: Phase.
         :type phase: :data:`objetto.constants.PRE` or :data:`objetto.constants.POST`
@@ -360,7 +365,7 @@ class BaseReaction(Base):
 
     @overload
     def __get__(self, instance, owner):
-        # type: (BaseObject, Type[BaseObject]) -> Callable[[Action, Phase], None]
+        # type: (BaseObject, Type[BaseObject]) -> Callable[[ActionRecord, Phase], None]
         pass
 
     @overload
@@ -385,11 +390,11 @@ class BaseReaction(Base):
         if instance is not None:
 
             def reaction(action, phase):
-                # type: (Action, Phase) -> None
+                # type: (ActionRecord, Phase) -> None
                 """
                 Bound reaction method.
 
-                :param action: Action.
+                :param action: Action record.
                 :param phase: Phase.
                 """
                 self(instance, action, phase)
@@ -673,7 +678,16 @@ class BaseObjectInternals(Base):
     :param app: Application.
     """
 
-    __slots__ = ("__obj_ref", "__is_root", "__app", "__subject")
+    __slots__ = (
+        "__obj_ref",
+        "__is_root",
+        "__app",
+        "__subject",
+        "__digest_subject",
+        "__slot",
+        "__parent_version",
+        "__hierarchy",
+    )
 
     def __init__(self, obj, app):
         # type: (BaseObject, Application) -> None
@@ -681,12 +695,40 @@ class BaseObjectInternals(Base):
         self.__is_root = False
         self.__app = app
         self.__subject = Subject()
+        self.__digest_subject = None  # type: Optional[Subject]
+        self.__slot = None  # type: Optional[int]
+        self.__parent_version = 0
+        self.__hierarchy = None  # type: Optional[CachedHierarchy]
 
     def set_root(self):
         # type: () -> None
         """Set object as root."""
         self.__is_root = True
 
+    def set_slot(self, slot):
+        # type: (int) -> None
+        """
+        Set slot allocated by the application.
+
+        :param slot: Slot.
+        """
+        self.__slot = slot
+
+    def bump_parent_version(self):
+        # type: () -> None
+        """Invalidate cached hierarchies going through this object."""
+        self.__parent_version += 1
+
+    def set_hierarchy(self, versions, ancestors):
+        # type: (Tuple[int, ...], Tuple[ReferenceType[BaseObject], ...]) -> None
+        """
+        Cache upper hierarchy.
+
+        :param versions: Parent versions of this object and of its ancestors.
+        :param ancestors: Weak references to ancestors (starting with the parent).
+        """
+        self.__hierarchy = (versions, ancestors)
+
     @property
     def obj_ref(self):
         # type: () -> WeakReference[BaseObject]
@@ -711,6 +753,38 @@ class BaseObjectInternals(Base):
         """Subject."""
         return self.__subject
 
+    @property
+    def digest_subject(self):
+        # type: () -> Subject
+        """Subject for digest observers (created on demand)."""
+        if self.__digest_subject is None:
+            self.__digest_subject = Subject()
+        return self.__digest_subject
+
+    @property
+    def has_digest_observers(self):
+        # type: () -> bool
+        """Whether there are registered digest observers."""
+        return self.__digest_subject is not None and self.__digest_subject.has_observers
+
+    @property
+    def slot(self):
+        # type: () -> Optional[int]
+        """Slot allocated by the application (or `None` if not initialized)."""
+        return self.__slot
+
+    @property
+    def parent_version(self):
+        # type: () -> int
+        """How many times the object's parent changed."""
+        return self.__parent_version
+
+    @property
+    def hierarchy(self):
+        # type: () -> Optional[CachedHierarchy]
+        """Cached weak ancestors along with the parent versions (or `None`)."""
+        return self.__hierarchy
+
 
 class BaseObjectMeta(BaseStructureMeta):
     """
@@ -1061,8 +1135,7 @@ collections.abc.Iterator[objetto.changes.Batch]]
 
         :rtype: objetto.states.BaseState
         """
-        with self.app.__.read_context(self) as read:
-            return read().state
+        return self.app.__.read(self).state
 
     @property
     @final
@@ -1073,8 +1146,7 @@ collections.abc.Iterator[objetto.changes.Batch]]
 
         :rtype: objetto.bases.BaseObject or None
         """
-        with self.app.__.read_context(self) as read:
-            return read().parent_ref()
+        return self.app.__.read(self).parent_ref()
 
     @property
     @final
@@ -1096,8 +1168,7 @@ collections.abc.Iterator[objetto.changes.Batch]]
 
         :rtype: objetto.states.SetState[objetto.bases.BaseObject]
         """
-        with self.app.__.read_context(self) as read:
-            return read().children
+        return self.app.__.read(self).children
 
     @property
     @final
@@ -1137,8 +1208,7 @@ collections.abc.Iterator[objetto.changes.Batch]]
 
         :rtype: objetto.bases.BaseData or None
         """
-        with self.app.__.read_context(self) as read:
-            return read().data
+        return self.app.__.read_data(self)
 
 
 # noinspection PyAbstractClass
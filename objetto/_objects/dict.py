@@ -392,7 +392,7 @@ tuple[collections.abc.Hashable, Any]]
 
         :raises AttributeError: No deletable attributes.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             self._update((k, DELETED) for k in self._state)
         return self
 
@@ -452,7 +452,7 @@ tuple[collections.abc.Hashable, Any]]
         :return: Transformed.
         :rtype: objetto.objects.DictObject
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             if key in self._state:
                 self.__functions__.update(self, {key: DELETED})
         return self
@@ -488,15 +488,14 @@ tuple[collections.abc.Hashable, Any]]
 
         :raises ValueError: Could not locate child.
         """
-        with self.app.__.read_context(self) as read:
-            metadata = read().metadata
-            try:
-                return metadata["locations"][child]
-            except KeyError:
-                error = "could not locate child {} in {}".format(child, self)
-                exc = ValueError(error)
-                raise_from(exc, None)
-                raise exc
+        metadata = self.app.__.read(self).metadata
+        try:
+            return metadata["locations"][child]
+        except KeyError:
+            error = "could not locate child {} in {}".format(child, self)
+            exc = ValueError(error)
+            raise_from(exc, None)
+            raise exc
 
     @final
     def _locate_data(self, child):
@@ -635,7 +634,7 @@ class MutableDictObject(
 
         :raises KeyError: Key is not present and fallback value not provided.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             try:
                 value = self[key]
             except KeyError:
@@ -657,7 +656,7 @@ class MutableDictObject(
 
         :raises KeyError: Dictionary is empty.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             if not self:
                 error = "dictionary is empty"
                 raise KeyError(error)
@@ -677,7 +676,7 @@ class MutableDictObject(
 
         :return: Existing or default value.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             try:
                 return self[key]
             except KeyError:
@@ -858,7 +857,7 @@ class ProxyDictObject(BaseProxyObject[KT], BaseMutableDict[KT, VT]):
 
         :raises KeyError: Key is not present and fallback value not provided.
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             try:
                 value = self[key]
             except KeyError:
@@ -879,7 +878,7 @@ class ProxyDictObject(BaseProxyObject[KT], BaseMutableDict[KT, VT]):
 
         :raises KeyError: Dictionary is empty.
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             if not self:
                 error = "dictionary is empty"
                 raise KeyError(error)
@@ -898,7 +897,7 @@ class ProxyDictObject(BaseProxyObject[KT], BaseMutableDict[KT, VT]):
 
         :return: Existing or default value.
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             try:
                 return self[key]
             except KeyError:
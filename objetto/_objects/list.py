@@ -713,7 +713,7 @@ class ListObject(
         :return: Transformed.
         :rtype: objetto.objects.ListObject
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             state_length = len(self._state)
             if state_length:
                 self._delete(slice(0, state_length))
@@ -786,7 +786,7 @@ class ListObject(
 
         :raises ValueError: Value is not present.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             index = self.index(value)
             self.__functions__.delete(self, index)
             return self
@@ -800,7 +800,7 @@ class ListObject(
         :return: Transformed.
         :rtype: objetto.objects.ListObject
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             if self._state:
                 reversed_values = self._state.reverse()
                 self.__functions__.update(
@@ -861,7 +861,7 @@ class ListObject(
             error = "no values provided"
             raise ValueError(error)
         if len(values) > 1:
-            with self.app.write_context():
+            with self.app.write_context(self):
                 values_len = len(values)
                 index, stop = self.resolve_continuous_slice(
                     slice(index, index + values_len)
@@ -1095,7 +1095,7 @@ class MutableListObject(
         :raises ValueError: Values length does not fit in slice.
         """
         if isinstance(item, slice):
-            with self.app.write_context():
+            with self.app.write_context(self):
                 values = tuple(cast("Iterable[T]", value))
                 index, _ = self.resolve_continuous_slice(item)
                 self._update(index, *values)
@@ -1136,7 +1136,7 @@ class MutableListObject(
 
         :return: Value.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             value = self[index]
             self._delete(index)
         return value
@@ -1183,7 +1183,7 @@ class ProxyListObject(BaseProxyObject[T], BaseMutableList[T]):
         :raises ValueError: Values length does not fit in slice.
         """
         if isinstance(item, slice):
-            with self.app.write_context():
+            with self.app.write_context(self._obj):
                 values = tuple(cast("Iterable[T]", value))
                 index, stop = self.resolve_continuous_slice(item)
                 if len(values) != stop - index:
@@ -1379,7 +1379,7 @@ class ProxyListObject(BaseProxyObject[T], BaseMutableList[T]):
 
         :return: Value.
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             value = self[index]
             self._delete(index)
         return value
@@ -1159,7 +1159,7 @@ class Object(
         # type: (Application, Any) -> None
         super(Object, self).__init__(app=app)
         cls = type(self)
-        with self.app.write_context():
+        with self.app.write_context(self):
             self.__functions__.update(
                 self,
                 self.__functions__.get_initial(self, initial),
@@ -1212,7 +1212,7 @@ class Object(
 
         :raises AttributeError: No deletable attributes.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             cls = type(self)
             update = {}
             for name in self._state:
@@ -1321,15 +1321,14 @@ class Object(
 
         :raises ValueError: Could not locate child.
         """
-        with self.app.__.read_context(self) as read:
-            metadata = read().metadata
-            try:
-                return metadata["locations"][child]
-            except KeyError:
-                error = "could not locate child {} in {}".format(child, self)
-                exc = ValueError(error)
-                raise_from(exc, None)
-                raise exc
+        metadata = self.app.__.read(self).metadata
+        try:
+            return metadata["locations"][child]
+        except KeyError:
+            error = "could not locate child {} in {}".format(child, self)
+            exc = ValueError(error)
+            raise_from(exc, None)
+            raise exc
 
     @final
     def _locate_data(self, child):
@@ -483,7 +483,7 @@ class SetObject(
 
         :raises ValueError: No values provided.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             removes = self._state.intersection(values)
             if not removes:
                 return self
@@ -711,7 +711,7 @@ class MutableSetObject(
 
         :raises KeyError: Empty set.
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             state = self._state
             if not state:
                 error = "empty set"
@@ -729,7 +729,7 @@ class MutableSetObject(
         :param iterable: Iterable.
         :type iterable: collections.abc.Iterable
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             difference = self.difference(iterable)
             if difference:
                 self._remove(*difference)
@@ -743,7 +743,7 @@ class MutableSetObject(
         :param iterable: Iterable.
         :type iterable: collections.abc.Iterable
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             inverse_difference = self.inverse_difference(iterable)
             intersection = self.intersection(iterable)
             self._update(inverse_difference)
@@ -758,7 +758,7 @@ class MutableSetObject(
         :param iterable: Iterable.
         :type iterable: collections.abc.Iterable
         """
-        with self.app.write_context():
+        with self.app.write_context(self):
             intersection = self.intersection(iterable)
             if intersection:
                 self._remove(*intersection)
@@ -790,7 +790,7 @@ class ProxySetObject(BaseProxyObject[T], BaseMutableSet[T]):
 
         :raises KeyError: Empty set.
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             state = self._state
             if not state:
                 error = "empty set"
@@ -807,7 +807,7 @@ class ProxySetObject(BaseProxyObject[T], BaseMutableSet[T]):
         :param iterable: Iterable.
         :type iterable: collections.abc.Iterable
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             difference = self.difference(iterable)
             if difference:
                 self._remove(*difference)
@@ -820,7 +820,7 @@ class ProxySetObject(BaseProxyObject[T], BaseMutableSet[T]):
         :param iterable: Iterable.
         :type iterable: collections.abc.Iterable
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             inverse_difference = self.inverse_difference(iterable)
             intersection = self.intersection(iterable)
             self._update(inverse_difference)
@@ -834,7 +834,7 @@ class ProxySetObject(BaseProxyObject[T], BaseMutableSet[T]):
         :param iterable: Iterable.
         :type iterable: collections.abc.Iterable
         """
-        with self.app.write_context():
+        with self.app.write_context(self._obj):
             intersection = self.intersection(iterable)
             if intersection:
                 self._remove(*intersection)
@@ -1,24 +1,53 @@
 # -*- coding: utf-8 -*-
 """Observer mixin class."""
 
+import sys
 from abc import abstractmethod
+from collections import deque
+from functools import partial
+from itertools import product
+from threading import Condition, RLock, Timer
 from types import TracebackType
-from typing import TYPE_CHECKING, Optional, Type, cast
+from typing import TYPE_CHECKING, Optional, Type, Union, cast
 from weakref import ref
 
-from ._applications import Action, Phase
+from six import integer_types
+
+from ._applications import Action, ActionRecord, Phase, _running_loop
 from ._bases import final
+from ._changes import BaseChange, DictUpdate, Update
+from ._digests import ActionDigest
 from ._objects import BaseObject
 from .data import Data, data_attribute
 from .utils.reraise_context import ReraiseContext
 from .utils.subject_observer import Observer, ObserverToken
-from .utils.type_checking import assert_is_instance
+from .utils.type_checking import assert_is_instance, assert_is_subclass
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import (
+        Any,
+        Callable,
+        Deque,
+        Dict,
+        FrozenSet,
+        Hashable,
+        Iterable,
+        List,
+        Tuple,
+    )
 
 
-__all__ = ["ActionObserver", "ActionObserverToken", "ActionObserverExceptionData"]
+__all__ = [
+    "ActionObserver",
+    "AsyncActionObserver",
+    "AsyncActionObserverQueue",
+    "DebouncedActionObserver",
+    "ThrottledActionObserver",
+    "ActionObserverTimer",
+    "ActionDigestObserver",
+    "ActionObserverToken",
+    "ActionObserverExceptionData",
+]
 
 
 class InternalObserver(Observer):
@@ -42,7 +71,61 @@ class InternalObserver(Observer):
         action_observer = self.action_observer_ref()
         if action_observer is not None:
             action, phase = payload
-            action_observer.__observe__(action, phase)
+            result = action_observer.__observe__(action, phase)
+            if result is not None and hasattr(result, "__await__"):
+                action.receiver.app.__.add_awaitable(
+                    action_observer, action, phase, result
+                )
+
+
+class InternalDigestObserver(Observer):
+    """
+    Internal digest observer.
+
+    :param action_observer: Digest observer.
+    """
+
+    def __init__(self, action_observer):
+        # type: (ActionDigestObserver) -> None
+        self.action_observer_ref = ref(action_observer)
+
+    def __observe__(self, *payload):
+        # type: (Any) -> None
+        """
+        Receive payload, unpack it, and relay it to the digest observer.
+
+        :param payload: Payload.
+        """
+        action_observer = self.action_observer_ref()
+        if action_observer is not None:
+            (digest,) = payload
+            action_observer.__observe__(digest)
+
+
+class InternalAsyncObserver(InternalObserver):
+    """
+    Internal asynchronous observer.
+
+    :param action_observer: Asynchronous action observer.
+    """
+
+    _inline_dispatch = True
+
+    def __observe__(self, *payload):
+        # type: (Any) -> None
+        """
+        Receive payload and defer it to the asynchronous action observer's queue.
+
+        :param payload: Payload.
+        """
+        action_observer = cast(
+            "Optional[AsyncActionObserver]", self.action_observer_ref()
+        )
+        if action_observer is not None:
+            queue = action_observer._async_queue
+            if queue is not None:
+                action, _ = payload
+                action.receiver.app.__.defer_delivery(queue, payload)
 
 
 # noinspection PyAbstractClass
@@ -72,16 +155,21 @@ class ActionObserver(object):
         ('Update Attributes', 'POST')
     """
 
+    _internal_observer_type = InternalObserver  # type: Type[InternalObserver]
     __internal_observer = None  # type: Optional[InternalObserver]
 
     @abstractmethod
     def __observe__(self, action, phase):
-        # type: (Action, Phase) -> None
+        # type: (ActionRecord, Phase) -> None
         """
         Observe an action (and its execution phase) from an object.
 
-        :param action: Action.
-        :type action: objetto.objects.Action
+        Might return an awaitable (when implemented as a coroutine function), as long
+        as changes are made within an
+        :meth:`objetto.applications.Application.async_write_context`.
+
+        :param action: Action record.
+        :type action: objetto.objects.ActionRecord
 
         :param phase: Phase.
         :type phase: :data:`objetto.constants.PRE` or :data:`objetto.constants.POST`
@@ -94,18 +182,69 @@ class ActionObserver(object):
         ).format(type(self).__name__, action, phase)
         raise NotImplementedError(error)
 
-    def start_observing(self, obj):
-        # type: (BaseObject) -> ActionObserverToken
+    def start_observing(
+        self,
+        obj,  # type: BaseObject
+        change_types=None,  # type: Optional[Iterable[Type[BaseChange]]]
+        attributes=None,  # type: Optional[Iterable[Hashable]]
+        phases=None,  # type: Optional[Iterable[Phase]]
+        max_depth=None,  # type: Optional[int]
+    ):
+        # type: (...) -> ActionObserverToken
         """
         Start observing an object for actions.
 
+        Filters are evaluated before the observer gets called, so actions that don't
+        match them never reach it. Observing an object again replaces its filters.
+
+        .. code:: python
+
+            >>> from objetto import Application, Object, attribute
+            >>> from objetto.constants import POST
+            >>> from objetto.observers import ActionObserver
+
+            >>> class Person(Object):
+            ...     name = attribute(str, default="Albert")
+            ...     age = attribute(int, default=0)
+            ...
+            >>> class PersonObserver(ActionObserver):
+            ...
+            ...     def __observe__(self, action, phase):
+            ...         print(dict(action.change.new_values))
+            ...
+            >>> app = Application()
+            >>> person = Person(app)
+            >>> observer = PersonObserver()
+            >>> token = observer.start_observing(
+            ...     person, attributes=("name",), phases=(POST,)
+            ... )
+            >>> person.age = 76
+            >>> person.name = "Einstein"
+            {'name': 'Einstein'}
+
         :param obj: Object.
         :type obj: objetto.objects.Object
 
+        :param change_types: Only observe these change types (or subclasses).
+        :type change_types: tuple[type[objetto.bases.BaseChange]] or None
+
+        :param attributes: Only observe actions that came through these attributes
+            (locations) or, for the object's own changes, that updated them.
+        :type attributes: tuple[collections.abc.Hashable] or None
+
+        :param phases: Only observe these phases.
+        :type phases: tuple[objetto.constants.Phase] or None
+
+        :param max_depth: Only observe actions from up to this many levels below the
+            object (0 for the object's own changes only).
+        :type max_depth: int or None
+
         :return: Observer token.
         :rtype: objetto.observers.ActionObserverToken
 
         :raises TypeError: Invalid 'obj' parameter type.
+        :raises TypeError: Invalid filter parameter type.
+        :raises ValueError: Invalid 'max_depth' parameter value.
         :raises RuntimeError: Can't start observing while object is initializing.
         """
         with ReraiseContext(TypeError, "'obj' parameter"):
@@ -113,7 +252,8 @@ class ActionObserver(object):
         if obj._initializing:
             error = "can't start observing object {} during its initialization"
             raise RuntimeError(error)
-        obj.__.subject.register_observer(self.__observer)
+        keys = _get_filter_keys(change_types, attributes, phases, max_depth)
+        obj.__.subject.register_observer(self.__observer, keys=keys)
         action_observer_token = cast(
             "ActionObserverToken",
             ActionObserverToken.__make__(obj.__.subject, self.__observer),
@@ -139,10 +279,69 @@ class ActionObserver(object):
         # type: () -> InternalObserver
         """Internal observer."""
         if self.__internal_observer is None:
-            self.__internal_observer = InternalObserver(self)
+            self.__internal_observer = self._internal_observer_type(self)
         return self.__internal_observer
 
 
+def _get_filter_keys(
+    change_types,  # type: Optional[Iterable[Type[BaseChange]]]
+    attributes,  # type: Optional[Iterable[Hashable]]
+    phases,  # type: Optional[Iterable[Phase]]
+    max_depth,  # type: Optional[int]
+):
+    # type: (...) -> Optional[FrozenSet[Tuple[Any, Any, Any, Any]]]
+    """
+    Get the subject keys matching observer filters.
+
+    Keys are `(phase, change type, attribute, depth)` tuples, where `None` matches
+    any value (mirrors the keys actions are sent with).
+
+    :param change_types: Change types.
+    :param attributes: Attributes/locations.
+    :param phases: Phases.
+    :param max_depth: Maximum depth.
+    :return: Keys or None (no filters).
+    :raises TypeError: Invalid parameter type.
+    :raises ValueError: Invalid 'max_depth' parameter value.
+    """
+    if (
+        change_types is None
+        and attributes is None
+        and phases is None
+        and max_depth is None
+    ):
+        return None
+
+    change_type_keys = (None,)  # type: Tuple[Any, ...]
+    if change_types is not None:
+        change_type_keys = tuple(change_types)
+        with ReraiseContext(TypeError, "'change_types' parameter"):
+            for change_type in change_type_keys:
+                assert_is_subclass(change_type, BaseChange)
+
+    attribute_keys = (None,)  # type: Tuple[Any, ...]
+    if attributes is not None:
+        attribute_keys = tuple(attributes)
+
+    phase_keys = (None,)  # type: Tuple[Any, ...]
+    if phases is not None:
+        phase_keys = tuple(phases)
+        with ReraiseContext(TypeError, "'phases' parameter"):
+            for phase in phase_keys:
+                assert_is_instance(phase, Phase)
+
+    depth_keys = (None,)  # type: Tuple[Any, ...]
+    if max_depth is not None:
+        with ReraiseContext(TypeError, "'max_depth' parameter"):
+            assert_is_instance(max_depth, integer_types)
+        if max_depth < 0:
+            error = "'max_depth' can't be negative, got {}".format(max_depth)
+            raise ValueError(error)
+        depth_keys = tuple(range(max_depth + 1))
+
+    return frozenset(product(phase_keys, change_type_keys, attribute_keys, depth_keys))
+
+
 # noinspection PyAbstractClass
 class ActionObserverToken(ObserverToken):
     """
@@ -210,6 +409,876 @@ class ActionObserverToken(ObserverToken):
             return cast("InternalObserver", internal_observer).action_observer_ref()
 
 
+# noinspection PyAbstractClass
+class ActionDigestObserver(object):
+    """
+    Mixin/abstract class for observing an object for one digest per commit.
+
+    Instead of receiving every action (twice, in both phases), a digest observer
+    receives a single :class:`objetto.observers.ActionDigest` once the outermost write
+    context exits, coalescing the atomic changes that happened in the object and in
+    its descendants.
+
+    .. code:: python
+
+        >>> from objetto import Application, Object, list_attribute
+        >>> from objetto.observers import ActionDigestObserver
+
+        >>> class Table(Object):
+        ...     rows = list_attribute(int)
+        ...
+        >>> class TableObserver(ActionDigestObserver):
+        ...
+        ...     def __observe__(self, digest):
+        ...         for obj_digest in digest.objects:
+        ...             print(obj_digest.changes, obj_digest.list_ranges[0][1:3])
+        ...
+        >>> app = Application()
+        >>> table = Table(app)
+        >>> observer = TableObserver()
+        >>> token = observer.start_observing(table)
+        >>> with app.write_context():
+        ...     for i in range(1000):
+        ...         table.rows.append(i)
+        ...
+        1000 (0, 1000)
+    """
+
+    __internal_observer = None  # type: Optional[InternalDigestObserver]
+
+    @abstractmethod
+    def __observe__(self, digest):
+        # type: (ActionDigest) -> None
+        """
+        Observe a digest of the actions received by an object during a commit.
+
+        :param digest: Digest.
+        :type digest: objetto.observers.ActionDigest
+
+        :raises NotImplementedError: Abstract method not implemented.
+        """
+        error = (
+            "digest observer class '{}' did not implement abstract method "
+            "'__observe__'; can't observe digest {}"
+        ).format(type(self).__name__, digest)
+        raise NotImplementedError(error)
+
+    def start_observing(self, obj):
+        # type: (BaseObject) -> ActionObserverToken
+        """
+        Start observing an object for digests.
+
+        :param obj: Object.
+        :type obj: objetto.objects.Object
+
+        :return: Observer token.
+        :rtype: objetto.observers.ActionObserverToken
+
+        :raises TypeError: Invalid 'obj' parameter type.
+        :raises RuntimeError: Can't start observing while object is initializing.
+        """
+        with ReraiseContext(TypeError, "'obj' parameter"):
+            assert_is_instance(obj, BaseObject)
+        if obj._initializing:
+            error = "can't start observing object {} during its initialization"
+            raise RuntimeError(error)
+        obj.__.digest_subject.register_observer(self.__observer)
+        action_observer_token = cast(
+            "ActionObserverToken",
+            ActionObserverToken.__make__(obj.__.digest_subject, self.__observer),
+        )
+        return action_observer_token
+
+    def stop_observing(self, obj):
+        # type: (BaseObject) -> None
+        """
+        Stop observing an object for digests.
+
+        :param obj: Object.
+        :type obj: objetto.objects.Object
+
+        :raises TypeError: Invalid 'obj' parameter type.
+        """
+        with ReraiseContext(TypeError, "'obj' parameter"):
+            assert_is_instance(obj, BaseObject)
+        if obj.__.has_digest_observers:
+            obj.__.digest_subject.deregister_observer(self.__observer)
+
+    @property
+    def __observer(self):
+        # type: () -> InternalDigestObserver
+        """Internal observer."""
+        if self.__internal_observer is None:
+            self.__internal_observer = InternalDigestObserver(self)
+        return self.__internal_observer
+
+
+class AsyncActionObserverQueue(object):
+    """
+    Bounded queue of actions drained on an asyncio event loop.
+
+    Batches get put by writers while their transactions are merged, so they are in
+    commit order. Once writers release the application's locks, they wait until
+    there's room if the queue is full (unless they are running in the loop's thread
+    or the loop is not running, in which case a :class:`RuntimeError` is raised).
+
+    :param observer: Asynchronous action observer.
+    :param loop: Event loop.
+    :param maxsize: Maximum number of pending actions (0 for unbounded).
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "__observer_ref",
+        "__loop",
+        "__maxsize",
+        "__condition",
+        "__pending",
+        "__draining",
+        "__waiters",
+    )
+
+    def __init__(self, observer, loop, maxsize=0):
+        # type: (AsyncActionObserver, Any, int) -> None
+        self.__observer_ref = ref(observer)
+        self.__loop = loop
+        self.__maxsize = maxsize
+        self.__condition = Condition()
+        self.__pending = deque()  # type: Deque[Tuple[ActionRecord, Phase]]
+        self.__draining = False
+        self.__waiters = []  # type: List[Any]
+
+    def __len__(self):
+        # type: () -> int
+        """
+        Get number of pending actions.
+
+        :return: Number of pending actions.
+        """
+        return len(self.__pending)
+
+    def put(self, items):
+        # type: (List[Tuple[ActionRecord, Phase]]) -> None
+        """
+        Put a batch of actions in the queue without waiting for room.
+
+        :param items: Actions and phases.
+        """
+        with self.__condition:
+            self.__pending.extend(items)
+            start = not self.__draining
+            self.__draining = True
+        if start:
+            self.__loop.call_soon_threadsafe(self.__next)
+
+    def wait(self):
+        # type: () -> None
+        """
+        Wait until the number of pending actions is within the maximum size.
+
+        :raises RuntimeError: Queue is full and can't wait in the loop's thread.
+        """
+        maxsize = self.__maxsize
+        if not maxsize:
+            return
+        with self.__condition:
+            while len(self.__pending) > maxsize:
+                loop = self.__loop
+                if not loop.is_running() or _running_loop() is loop:
+                    error = (
+                        "queue of {} is full, can't wait for it to drain in the "
+                        "event loop's thread or while the loop is not running"
+                    ).format(self.__observer_ref())
+                    raise RuntimeError(error)
+                self.__condition.wait()
+
+    def join(self):
+        # type: () -> Any
+        """
+        Get a future that resolves once all pending actions were observed.
+        Should be called from the loop's thread.
+
+        :return: Future.
+        """
+        future = self.__loop.create_future()
+        with self.__condition:
+            if self.__draining:
+                self.__waiters.append(future)
+                return future
+        future.set_result(None)
+        return future
+
+    def __next(self, future=None, action=None, phase=None):
+        # type: (Any, Optional[ActionRecord], Optional[Phase]) -> None
+        """
+        Observe pending actions in order, waiting for coroutines to finish.
+
+        :param future: Future of the previous coroutine.
+        :param action: Previous action.
+        :param phase: Previous phase.
+        """
+        from asyncio import ensure_future
+
+        if future is not None and not future.cancelled():
+            exception = future.exception()
+            if exception is not None:
+                self.__fail(action, phase, exception)
+
+        while True:
+            with self.__condition:
+                if not self.__pending:
+                    self.__draining = False
+                    waiters, self.__waiters = self.__waiters, []
+                    break
+                action, phase = self.__pending.popleft()
+                self.__condition.notify_all()
+            observer = self.__observer_ref()
+            if observer is None:
+                continue
+            try:
+                result = observer.__observe__(action, phase)
+            except Exception as e:
+                self.__fail(action, phase, e)
+                continue
+            if result is not None and hasattr(result, "__await__"):
+                future = ensure_future(result, loop=self.__loop)
+                future.add_done_callback(
+                    partial(self.__next, action=action, phase=phase)
+                )
+                return
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def __fail(self, action, phase, exception):
+        # type: (Any, Any, BaseException) -> None
+        """
+        Report an exception raised by the observer.
+
+        :param action: Action.
+        :param phase: Phase.
+        :param exception: Exception.
+        """
+        observer = self.__observer_ref()
+        if observer is None:
+            return
+        exception_info = ActionObserverExceptionData(
+            observer=observer,
+            action=action.to_action(),
+            phase=phase,
+            exception_type=type(exception),
+            exception=exception,
+            traceback=getattr(exception, "__traceback__", None),
+        )
+        observer.__observe_exception__(exception_info)
+
+    @property
+    def loop(self):
+        # type: () -> Any
+        """
+        Event loop.
+
+        :rtype: asyncio.AbstractEventLoop
+        """
+        return self.__loop
+
+    @property
+    def maxsize(self):
+        # type: () -> int
+        """
+        Maximum number of pending actions (0 for unbounded).
+
+        :rtype: int
+        """
+        return self.__maxsize
+
+
+# noinspection PyAbstractClass
+class AsyncActionObserver(ActionObserver):
+    """
+    Mixin/abstract class for observing an object for actions asynchronously.
+
+    Inherits from:
+      - :class:`objetto.observers.ActionObserver`
+
+    Instead of being called while the application is locked, actions are put in a
+    bounded queue as the writer's transaction is merged (writers wait for room once
+    they release their locks), and observed on an asyncio event loop in commit order
+    (`__observe__` can be a coroutine function, each call is awaited before observing
+    the next action). Observers read the application's current state, not the state
+    at the time of the action.
+
+    .. code:: python
+
+        >>> import asyncio
+        >>> from objetto import Application, Object, attribute
+        >>> from objetto.observers import AsyncActionObserver
+
+        >>> class Person(Object):
+        ...     name = attribute(str, default="Albert")
+        ...
+        >>> class PersonObserver(AsyncActionObserver):
+        ...
+        ...     def __observe__(self, action, phase):  # or a coroutine function
+        ...         print((action.change.new_values["name"], phase.value))
+        ...
+        >>> loop = asyncio.new_event_loop()
+        >>> app = Application()
+        >>> person = Person(app)
+        >>> observer = PersonObserver()
+        >>> token = observer.start_observing(person, loop=loop)
+        >>> person.name = "Einstein"
+        >>> loop.run_until_complete(observer.join())
+        ('Einstein', 'PRE')
+        ('Einstein', 'POST')
+        >>> loop.close()
+    """
+
+    _internal_observer_type = InternalAsyncObserver  # type: Type[InternalObserver]
+    _async_queue = None  # type: Optional[AsyncActionObserverQueue]
+
+    def __observe_exception__(self, exception_info):
+        # type: (ActionObserverExceptionData) -> None
+        """
+        Handle an exception raised while observing an action (in the loop's thread).
+
+        By default, an :class:`objetto.exceptions.ActionObserversFailedError` gets
+        passed to the loop's exception handler.
+
+        :param exception_info: Exception information.
+        :type exception_info: objetto.observers.ActionObserverExceptionData
+        """
+        from ._applications import ActionObserversFailedError
+
+        loop = self.loop
+        assert loop is not None
+        loop.call_exception_handler(
+            {
+                "message": "asynchronous action observer {} failed".format(self),
+                "exception": ActionObserversFailedError(
+                    "external observers raised exceptions (see tracebacks below)",
+                    (exception_info,),
+                ),
+                "observer": self,
+            }
+        )
+
+    def start_observing(
+        self,
+        obj,  # type: BaseObject
+        change_types=None,  # type: Optional[Iterable[Type[BaseChange]]]
+        attributes=None,  # type: Optional[Iterable[Hashable]]
+        phases=None,  # type: Optional[Iterable[Phase]]
+        max_depth=None,  # type: Optional[int]
+        loop=None,  # type: Any
+        maxsize=0,  # type: int
+    ):
+        # type: (...) -> ActionObserverToken
+        """
+        Start observing an object for actions.
+
+        The event loop and the queue size are set the first time the observer starts
+        observing and can't be changed afterwards.
+
+        :param obj: Object.
+        :type obj: objetto.objects.Object
+
+        :param change_types: Only observe these change types (or subclasses).
+        :type change_types: tuple[type[objetto.bases.BaseChange]] or None
+
+        :param attributes: Only observe actions that came through these attributes
+            (locations) or, for the object's own changes, that updated them.
+        :type attributes: tuple[collections.abc.Hashable] or None
+
+        :param phases: Only observe these phases.
+        :type phases: tuple[objetto.constants.Phase] or None
+
+        :param max_depth: Only observe actions from up to this many levels below the
+            object (0 for the object's own changes only).
+        :type max_depth: int or None
+
+        :param loop: Event loop (defaults to the running event loop).
+        :type loop: asyncio.AbstractEventLoop or None
+
+        :param maxsize: Maximum number of pending actions (0 for unbounded).
+        :type maxsize: int
+
+        :return: Observer token.
+        :rtype: objetto.observers.ActionObserverToken
+
+        :raises TypeError: Invalid parameter type.
+        :raises ValueError: Invalid 'max_depth' or 'maxsize' parameter value.
+        :raises ValueError: No loop provided and no event loop is running.
+        :raises ValueError: Already observing on a different loop/with a different \
+queue size.
+        :raises RuntimeError: Can't start observing while object is initializing.
+        """
+        with ReraiseContext(TypeError, "'maxsize' parameter"):
+            assert_is_instance(maxsize, integer_types)
+        if maxsize < 0:
+            error = "'maxsize' can't be negative, got {}".format(maxsize)
+            raise ValueError(error)
+        queue = self._async_queue
+        if queue is None:
+            if loop is None:
+                loop = _running_loop()
+                if loop is None:
+                    error = "no running event loop, 'loop' parameter is required"
+                    raise ValueError(error)
+            queue = AsyncActionObserverQueue(self, loop, maxsize)
+        elif (loop is not None and loop is not queue.loop) or maxsize != queue.maxsize:
+            error = (
+                "{} is already observing on loop {} with a queue size of {}"
+            ).format(self, queue.loop, queue.maxsize)
+            raise ValueError(error)
+        token = super(AsyncActionObserver, self).start_observing(
+            obj,
+            change_types=change_types,
+            attributes=attributes,
+            phases=phases,
+            max_depth=max_depth,
+        )
+        self._async_queue = queue
+        return token
+
+    def join(self):
+        # type: () -> Any
+        """
+        Get a future that resolves once all pending actions were observed.
+        Should be called from the loop's thread.
+
+        :return: Future.
+        :rtype: asyncio.Future
+
+        :raises RuntimeError: Not observing.
+        """
+        queue = self._async_queue
+        if queue is None:
+            error = "{} is not observing".format(self)
+            raise RuntimeError(error)
+        return queue.join()
+
+    @property
+    def loop(self):
+        # type: () -> Any
+        """
+        Event loop (or `None` if never started observing).
+
+        :rtype: asyncio.AbstractEventLoop or None
+        """
+        queue = self._async_queue
+        return queue.loop if queue is not None else None
+
+
+class ActionObserverTimer(object):
+    """
+    Schedules callbacks for rate-limited action observers.
+
+    The default implementation runs callbacks in daemon :class:`threading.Timer`
+    threads. Subclass it and override :meth:`call_later` to plug in a different clock
+    (an event loop, a GUI toolkit's timers, or a fake clock in tests).
+    """
+
+    __slots__ = ()
+
+    def call_later(self, delay, callback):
+        # type: (float, Callable[[], None]) -> Any
+        """
+        Schedule a callback.
+
+        :param delay: Delay in seconds.
+        :type delay: float
+
+        :param callback: Callback.
+        :type callback: collections.abc.Callable
+
+        :return: Handle with a `cancel()` method.
+        """
+        timer = Timer(delay, callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+
+class _PendingUpdates(object):
+    """Updates to a single object held back during a window."""
+
+    __slots__ = ("actions", "keys", "old_values", "new_values", "token", "handle")
+
+    def __init__(self):
+        # type: () -> None
+        self.actions = []  # type: List[ActionRecord]
+        self.keys = {}  # type: Dict[Any, ActionRecord]
+        self.old_values = {}  # type: Dict[Any, Any]
+        self.new_values = {}  # type: Dict[Any, Any]
+        self.token = None  # type: Optional[object]
+        self.handle = None  # type: Any
+
+    def add(self, action):
+        # type: (ActionRecord) -> None
+        """
+        Add an update.
+
+        :param action: Action record (with an update change).
+        """
+        change = action.change
+        old_values = self.old_values
+        for key, value in change.old_values.items():
+            if key not in old_values:
+                old_values[key] = value
+        self.new_values.update(change.new_values)
+        for key in change.new_values:
+            self.keys[key] = action
+        self.actions.append(action)
+
+    def pop(self, merge):
+        # type: (bool) -> List[ActionRecord]
+        """
+        Pop the actions to relay.
+
+        :param merge: Whether to merge the updates into one delta.
+        :return: A single merged action or, if not merging, the last action that \
+updated each attribute/key (each action only once, in order).
+        """
+        actions = self.actions
+        if not actions:
+            return []
+        if merge:
+            last_action = actions[-1]
+            change = last_action.change._update(
+                old_values=self.old_values, new_values=self.new_values
+            )
+            popped = [last_action._replace(change=change)]
+        else:
+            latest = set(id(a) for a in self.keys.values())
+            popped = [a for a in actions if id(a) in latest]
+        self.actions = []
+        self.keys = {}
+        self.old_values = {}
+        self.new_values = {}
+        return popped
+
+
+class _RateLimitedActionObserver(ActionObserver):
+    """
+    Relays actions to another observer, rate-limiting updates.
+
+    :param observer: Observer to relay actions to.
+    :param window: Window in seconds.
+    :param merge: Whether to merge the updates in a window into one delta.
+    :param timer: Timer (defaults to a threading timer).
+    """
+
+    _leading = False  # type: bool
+    _restart = True  # type: bool
+
+    def __init__(
+        self,
+        observer,  # type: ActionObserver
+        window,  # type: float
+        merge=True,  # type: bool
+        timer=None,  # type: Optional[ActionObserverTimer]
+    ):
+        # type: (...) -> None
+        with ReraiseContext(TypeError, "'observer' parameter"):
+            assert_is_instance(observer, ActionObserver)
+        with ReraiseContext(TypeError, "'window' parameter"):
+            assert_is_instance(window, integer_types + (float,))
+        if window <= 0:
+            error = "'window' needs to be positive, got {}".format(window)
+            raise ValueError(error)
+        if timer is None:
+            timer = ActionObserverTimer()
+        else:
+            with ReraiseContext(TypeError, "'timer' parameter"):
+                assert_is_instance(timer, ActionObserverTimer)
+        self.__observer = observer
+        self.__window = window
+        self.__merge = bool(merge)
+        self.__timer = timer
+        self.__lock = RLock()
+        self.__pending = {}  # type: Dict[Tuple[Any, Any], _PendingUpdates]
+
+    def __observe__(self, action, phase):
+        # type: (ActionRecord, Phase) -> Any
+        """
+        Observe an action, relaying it or holding it back until its window closes.
+
+        Attribute and dictionary updates are rate-limited per object: only their
+        :data:`objetto.constants.POST` phase gets relayed, once the window closes.
+        Other actions are relayed as they happen.
+
+        :param action: Action record.
+        :type action: objetto.objects.ActionRecord
+
+        :param phase: Phase.
+        :type phase: :data:`objetto.constants.PRE` or :data:`objetto.constants.POST`
+        """
+        if type(action.change) not in (Update, DictUpdate):
+            return self.__observer.__observe__(action, phase)
+        if phase is not Phase.POST:
+            return None
+
+        pending_key = (action.receiver, action.sender)
+        with self.__lock:
+            pending = self.__pending.get(pending_key)
+            if pending is None:
+                pending = self.__pending[pending_key] = _PendingUpdates()
+                self.__schedule(pending_key, pending)
+                if self._leading:
+                    leading = True
+                else:
+                    pending.add(action)
+                    leading = False
+            else:
+                pending.add(action)
+                leading = False
+                if self._restart:
+                    pending.handle.cancel()
+                    self.__schedule(pending_key, pending)
+
+        if leading:
+            return self.__observer.__observe__(action, phase)
+        return None
+
+    def __observe_exception__(self, exception_info):
+        # type: (ActionObserverExceptionData) -> None
+        """
+        Handle an exception raised by the observer while observing an action that
+        got relayed after its window closed (in the timer's thread).
+
+        By default, an :class:`objetto.exceptions.ActionObserversFailedError` gets
+        raised.
+
+        :param exception_info: Exception information.
+        :type exception_info: objetto.observers.ActionObserverExceptionData
+
+        :raises objetto.exceptions.ActionObserversFailedError: Observer failed.
+        """
+        from ._applications import ActionObserversFailedError
+
+        raise ActionObserversFailedError(
+            "rate-limited observer {} failed".format(self.__observer),
+            (exception_info,),
+        )
+
+    def flush(self):
+        # type: () -> None
+        """
+        Relay all pending updates now, closing their windows.
+        """
+        with self.__lock:
+            actions = []  # type: List[ActionRecord]
+            for pending in self.__pending.values():
+                pending.handle.cancel()
+                actions.extend(pending.pop(self.__merge))
+            self.__pending.clear()
+        for action in actions:
+            self.__relay(action)
+
+    def __schedule(self, pending_key, pending):
+        # type: (Tuple[Any, Any], _PendingUpdates) -> None
+        """
+        Schedule the end of a window.
+
+        :param pending_key: Receiver and sender.
+        :param pending: Pending updates.
+        """
+        token = pending.token = object()
+        pending.handle = self.__timer.call_later(
+            self.__window, partial(self.__expire, pending_key, token)
+        )
+
+    def __expire(self, pending_key, token):
+        # type: (Tuple[Any, Any], object) -> None
+        """
+        Close a window, relaying its pending updates.
+
+        :param pending_key: Receiver and sender.
+        :param token: Token of the schedule (stale schedules are ignored).
+        """
+        with self.__lock:
+            pending = self.__pending.get(pending_key)
+            if pending is None or pending.token is not token:
+                return
+            actions = pending.pop(self.__merge)
+            if actions and self._leading:
+                # Keep the window going, so relayed updates are spaced out.
+                self.__schedule(pending_key, pending)
+            else:
+                del self.__pending[pending_key]
+        for action in actions:
+            self.__relay(action)
+
+    def __relay(self, action):
+        # type: (ActionRecord) -> None
+        """
+        Relay an action that was held back to the observer.
+
+        :param action: Action record.
+        """
+        try:
+            self.__observer.__observe__(action, Phase.POST)
+        except Exception as e:
+            exception_info = ActionObserverExceptionData(
+                observer=self.__observer,
+                action=action.to_action(),
+                phase=Phase.POST,
+                exception_type=type(e),
+                exception=e,
+                traceback=sys.exc_info()[2],
+            )
+            self.__observe_exception__(exception_info)
+
+    @property
+    def observer(self):
+        # type: () -> ActionObserver
+        """
+        Observer actions get relayed to.
+
+        :rtype: objetto.observers.ActionObserver
+        """
+        return self.__observer
+
+    @property
+    def window(self):
+        # type: () -> float
+        """
+        Window in seconds.
+
+        :rtype: float
+        """
+        return self.__window
+
+    @property
+    def merge(self):
+        # type: () -> bool
+        """
+        Whether updates in a window are merged into one delta.
+
+        :rtype: bool
+        """
+        return self.__merge
+
+    @property
+    def timer(self):
+        # type: () -> ActionObserverTimer
+        """
+        Timer.
+
+        :rtype: objetto.observers.ActionObserverTimer
+        """
+        return self.__timer
+
+
+class DebouncedActionObserver(_RateLimitedActionObserver):
+    """
+    Relays actions to another observer, debouncing attribute and dictionary updates.
+
+    Inherits from:
+      - :class:`objetto.observers.ActionObserver`
+
+    Updates are held back per object until no new updates to it arrive for a whole
+    window, then relayed in their :data:`objetto.constants.POST` phase only. When
+    merging, a single action gets relayed per object: the last one, with a change
+    holding the old values from the first update to each attribute/key and the new
+    values from the last one (the change's state and children are still the last
+    change's). Otherwise, the last action that updated each attribute/key gets
+    relayed (each action only once, in order).
+
+    .. code:: python
+
+        >>> from objetto import Application, Object, attribute
+        >>> from objetto.observers import (
+        ...     ActionObserver,
+        ...     ActionObserverTimer,
+        ...     DebouncedActionObserver,
+        ... )
+
+        >>> class Slider(Object):
+        ...     value = attribute(int, default=0)
+        ...
+        >>> class SliderObserver(ActionObserver):
+        ...
+        ...     def __observe__(self, action, phase):
+        ...         change = action.change
+        ...         print(change.old_values["value"], change.new_values["value"])
+        ...
+        >>> class ManualTimer(ActionObserverTimer):
+        ...     callbacks = []
+        ...
+        ...     def call_later(self, delay, callback):
+        ...         self.callbacks.append(callback)
+        ...         return self
+        ...
+        ...     def cancel(self):
+        ...         del self.callbacks[:]
+        ...
+        >>> app = Application()
+        >>> slider = Slider(app)
+        >>> timer = ManualTimer()
+        >>> observer = DebouncedActionObserver(SliderObserver(), 0.1, timer=timer)
+        >>> token = observer.start_observing(slider)
+        >>> for i in range(1, 101):
+        ...     slider.value = i
+        ...
+        >>> timer.callbacks.pop()()
+        0 100
+
+    :param observer: Observer to relay actions to.
+    :type observer: objetto.observers.ActionObserver
+
+    :param window: Quiet period in seconds.
+    :type window: float
+
+    :param merge: Whether to merge the updates in a window into one delta (otherwise \
+relay the last action that updated each attribute/key as-is).
+    :type merge: bool
+
+    :param timer: Timer (defaults to a threading timer).
+    :type timer: objetto.observers.ActionObserverTimer or None
+
+    :raises TypeError: Invalid parameter type.
+    :raises ValueError: Invalid 'window' parameter value.
+    """
+
+
+class ThrottledActionObserver(_RateLimitedActionObserver):
+    """
+    Relays actions to another observer, throttling attribute and dictionary updates.
+
+    Inherits from:
+      - :class:`objetto.observers.ActionObserver`
+
+    Per object, the first update is relayed right away and a window opens. Updates
+    arriving during the window are held back and relayed once it closes (opening a
+    new window), so at most one merged update per object and window is relayed.
+    Only the :data:`objetto.constants.POST` phase of updates is relayed. Held back
+    updates are merged/relayed like in
+    :class:`objetto.observers.DebouncedActionObserver`.
+
+    :param observer: Observer to relay actions to.
+    :type observer: objetto.observers.ActionObserver
+
+    :param window: Minimum interval between relayed updates in seconds.
+    :type window: float
+
+    :param merge: Whether to merge the updates in a window into one delta (otherwise \
+relay the last action that updated each attribute/key as-is).
+    :type merge: bool
+
+    :param timer: Timer (defaults to a threading timer).
+    :type timer: objetto.observers.ActionObserverTimer or None
+
+    :raises TypeError: Invalid parameter type.
+    :raises ValueError: Invalid 'window' parameter value.
+    """
+
+    _leading = True
+    _restart = False
+
+
 @final
 class ActionObserverExceptionData(Data):
     """
@@ -219,25 +1288,37 @@ class ActionObserverExceptionData(Data):
       - :class:`objetto.data.Data`
     """
 
-    observer = data_attribute(ActionObserver, checked=False)  # type: ActionObserver
+    observer = data_attribute(
+        (ActionObserver, ActionDigestObserver), checked=False
+    )  # type: Union[ActionObserver, ActionDigestObserver]
+    """
+    Action observer (or digest observer).
+
+    :type: objetto.observers.ActionObserver or \
+objetto.observers.ActionDigestObserver
+    """
+
+    action = data_attribute((Action, None), checked=False)  # type: Optional[Action]
     """
-    Action observer.
+    Action (or `None` for digests).
 
-    :type: objetto.observers.ActionObserver
+    :type: objetto.objects.Action or None
     """
 
-    action = data_attribute(Action, checked=False)  # type: Action
+    phase = data_attribute((Phase, None), checked=False)  # type: Optional[Phase]
     """
-    Action.
+    Phase (or `None` for digests).
 
-    :type: objetto.objects.Action
+    :type: :data:`objetto.constants.PRE` or :data:`objetto.constants.POST` or None
     """
 
-    phase = data_attribute(Phase, checked=False)  # type: Phase
+    digest = data_attribute(
+        (ActionDigest, None), checked=False, default=None
+    )  # type: Optional[ActionDigest]
     """
-    Phase.
+    Digest (or `None` for actions).
 
-    :type: :data:`objetto.constants.PRE` or :data:`objetto.constants.POST`
+    :type: objetto.observers.ActionDigest or None
     """
 
     exception_type = data_attribute(
@@ -9,7 +9,7 @@ from six import iteritems
 
 from ._applications import Phase, RejectChangeException
 from ._bases import MISSING, final
-from ._changes import BaseAtomicChange, Update
+from ._changes import BaseAtomicChange, BulkLoad, Update
 from ._constants import BASE_STRING_TYPES, INTEGER_TYPES
 from ._data import InteractiveDictData
 from ._objects import UNIQUE_ATTRIBUTES_METADATA_KEY, BaseReaction, Object
@@ -18,16 +18,26 @@ from .utils.reraise_context import ReraiseContext
 from .utils.type_checking import assert_is_callable, assert_is_instance
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Counter, Dict, FrozenSet, Mapping, Optional, Union
-
-    from ._applications import Action
+    from typing import (
+        Any,
+        Callable,
+        Counter,
+        Dict,
+        FrozenSet,
+        Iterable,
+        Mapping,
+        Optional,
+        Union,
+    )
+
+    from ._applications import ActionRecord
     from ._objects import BaseObject
 
     if False and BaseObject:  # for PyCharm
         pass
 
     ReactionDecorator = Callable[
-        [Callable[["_BO", Action, Phase], None]], "CustomReaction"
+        [Callable[["_BO", ActionRecord, Phase], None]], "CustomReaction"
     ]
 
 __all__ = [
@@ -43,7 +53,7 @@ _BO = TypeVar("_BO", bound="BaseObject")
 
 
 def reaction(
-    func=None,  # type: Optional[Callable[[_BO, Action, Phase], None]]
+    func=None,  # type: Optional[Callable[[_BO, ActionRecord, Phase], None]]
     priority=None,  # type: Optional[int]
 ):
     # type: (...) -> Union[CustomReaction, ReactionDecorator]
@@ -90,7 +100,7 @@ def reaction(
     """
 
     def _reaction(func_):
-        # type: (Callable[[_BO, Action, Phase], None]) -> CustomReaction
+        # type: (Callable[[_BO, ActionRecord, Phase], None]) -> CustomReaction
         """
         Reaction method decorator.
 
@@ -127,7 +137,7 @@ class CustomReaction(BaseReaction):
     __slots__ = ("__func", "__priority")
 
     def __init__(self, func, priority=None):
-        # type: (Callable[[_BO, Action, Phase], None], Optional[int]) -> None
+        # type: (Callable[[_BO, ActionRecord, Phase], None], Optional[int]) -> None
         super(CustomReaction, self).__init__()
 
         # 'func'
@@ -149,8 +159,8 @@ class CustomReaction(BaseReaction):
         :param obj: Object.
         :type obj: objetto.bases.BaseObject
 
-        :param action: Action.
-        :type action: objetto.objects.Action
+        :param action: Action record.
+        :type action: objetto.objects.ActionRecord
 
         :param phase: Phase.
         :type phase: `objetto.constants.PRE` or :data:`objetto.constants.POST`
@@ -175,7 +185,7 @@ class CustomReaction(BaseReaction):
 
     @property
     def func(self):
-        # type: () -> Callable[[_BO, Action, Phase], None]
+        # type: () -> Callable[[_BO, ActionRecord, Phase], None]
         """
         Function.
 
@@ -230,20 +240,37 @@ class UniqueAttributes(BaseReaction):
         self.__incrementers = all_incrementers
 
     def __call__(self, obj, action, phase):
-        # type: (_BO, Action, Phase) -> None
+        # type: (_BO, ActionRecord, Phase) -> None
         """
         React to new children or children's attribute changes.
 
         :param obj: Object.
         :type obj: objetto.bases.BaseObject
 
-        :param action: Action.
-        :type action: objetto.objects.Action
+        :param action: Action record.
+        :type action: objetto.objects.ActionRecord
 
         :param phase: Phase.
         :type phase: `objetto.constants.PRE` or :data:`objetto.constants.POST`
         """
 
+        # Children were bulk loaded, validate all of them and rebuild the cache.
+        if isinstance(action.change, BulkLoad):
+            if not action.locations:
+                if phase is Phase.PRE:
+                    loaded = frozenset(action.change.objects)
+                    children = frozenset(c for c in obj._children if c in loaded)
+                    all_new_values = self.__react(obj, children)
+                    for child, new_values in iteritems(all_new_values):
+                        child.update(new_values)
+                elif phase is Phase.POST:
+                    with obj.app.__.update_metadata_context(obj) as (read, update):
+                        cache = self.__add_to_cache(
+                            InteractiveDictData(), obj._children
+                        )
+                        update({UNIQUE_ATTRIBUTES_METADATA_KEY: cache})
+            return
+
         # Ignore non-atomic changes.
         if not isinstance(action.change, BaseAtomicChange):
             return
@@ -312,25 +339,7 @@ class UniqueAttributes(BaseReaction):
                             cache = metadata[UNIQUE_ATTRIBUTES_METADATA_KEY]
 
                         # For every new child, add values to cache.
-                        for child in action.change.new_children:
-                            if not isinstance(child, Object):
-                                continue
-                            for name in self.__names:
-                                if hasattr(child, name):
-                                    value = getattr(child, name)
-                                    try:
-                                        hash(value)
-                                    except TypeError:
-                                        continue
-                                    if name not in cache:
-                                        cache = cache.set(
-                                            name,
-                                            InteractiveDictData({value: child}),
-                                        )
-                                    else:
-                                        cache = cache.set(
-                                            name, cache[name].set(value, child)
-                                        )
+                        cache = self.__add_to_cache(cache, action.change.new_children)
 
                         # Update metadata.
                         update({UNIQUE_ATTRIBUTES_METADATA_KEY: cache})
@@ -394,6 +403,35 @@ class UniqueAttributes(BaseReaction):
                             # Update metadata.
                             update({UNIQUE_ATTRIBUTES_METADATA_KEY: cache})
 
+    def __add_to_cache(
+        self,
+        cache,  # type: InteractiveDictData[str, Any]
+        children,  # type: Iterable[BaseObject]
+    ):
+        # type: (...) -> InteractiveDictData[str, Any]
+        """
+        Add the hashable attribute values of children to a cache.
+
+        :param cache: Cache (children mapped by value, mapped by attribute name).
+        :param children: Children (only objects are added).
+        :return: Updated cache.
+        """
+        for child in children:
+            if not isinstance(child, Object):
+                continue
+            for name in self.__names:
+                if hasattr(child, name):
+                    value = getattr(child, name)
+                    try:
+                        hash(value)
+                    except TypeError:
+                        continue
+                    if name not in cache:
+                        cache = cache.set(name, InteractiveDictData({value: child}))
+                    else:
+                        cache = cache.set(name, cache[name].set(value, child))
+        return cache
+
     def __react(
         self,
         obj,  # type: _BO
@@ -553,20 +591,36 @@ class LimitChildren(BaseReaction):
         self.__maximum = maximum
 
     def __call__(self, obj, action, phase):
-        # type: (_BO, Action, Phase) -> None
+        # type: (_BO, ActionRecord, Phase) -> None
         """
         React to atomic changes.
 
         :param obj: Object.
         :type obj: objetto.bases.BaseObject
 
-        :param action: Action.
-        :type action: objetto.objects.Action
+        :param action: Action record.
+        :type action: objetto.objects.ActionRecord
 
         :param phase: Phase.
         :type phase: `objetto.constants.PRE` or :data:`objetto.constants.POST`
         """
 
+        # Children were bulk loaded, validate their number.
+        if isinstance(action.change, BulkLoad):
+            if len(action.locations) == 0 and phase is Phase.PRE:
+                current_len = len(obj._children)
+                if self.maximum is not None and current_len > self.maximum:
+                    error_msg = ("loaded too many children (maximum is {})").format(
+                        self.maximum
+                    )
+                    raise ValueError(error_msg)
+                elif self.minimum is not None and current_len < self.minimum:
+                    error_msg = ("loaded too few children (minimum is {})").format(
+                        self.minimum
+                    )
+                    raise ValueError(error_msg)
+            return
+
         # Ignore non-atomic changes.
         if not isinstance(action.change, BaseAtomicChange):
             return
@@ -667,15 +721,31 @@ class Limit(BaseReaction):
         self.__maximum = maximum
 
     def __call__(self, obj, action, phase):
-        # type: (_BO, Action, Phase) -> None
+        # type: (_BO, ActionRecord, Phase) -> None
         """
         React to atomic changes.
 
         :param obj: Object.
-        :param action: Action.
+        :param action: Action record.
         :param phase: Phase.
         """
 
+        # Values were bulk loaded, validate their number.
+        if isinstance(action.change, BulkLoad):
+            if len(action.locations) == 0 and phase is Phase.PRE:
+                current_len = len(obj._state)
+                if self.maximum is not None and current_len > self.maximum:
+                    error_msg = ("loaded too many values (maximum is {})").format(
+                        self.maximum
+                    )
+                    raise ValueError(error_msg)
+                elif self.minimum is not None and current_len < self.minimum:
+                    error_msg = ("loaded too few values (minimum is {})").format(
+                        self.minimum
+                    )
+                    raise ValueError(error_msg)
+            return
+
         # Ignore non-atomic changes.
         if not isinstance(action.change, BaseAtomicChange):
             return
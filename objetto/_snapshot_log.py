@@ -0,0 +1,602 @@
+# -*- coding: utf-8 -*-
+"""Append-only on-disk log of application snapshots."""
+
+import pickle
+from functools import partial
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from os import fstat
+from struct import Struct
+from threading import RLock
+from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary, ref
+
+from six import iteritems, itervalues
+
+from ._applications import Application, ApplicationSnapshot, Store
+from ._bases import Base, final
+from ._data import InteractiveSetData
+from ._objects import BaseObject
+from .utils.lazy_import import get_path, import_path
+from .utils.reraise_context import ReraiseContext
+from .utils.storage import LazyValue
+from .utils.type_checking import assert_is_instance
+from .utils.weak_reference import WeakReference
+
+if TYPE_CHECKING:
+    from typing import (
+        IO,
+        Any,
+        Dict,
+        List,
+        Mapping,
+        MutableMapping,
+        Optional,
+        Set,
+        Tuple,
+        Type,
+    )
+
+    from ._data import BaseData
+    from .utils.storage import SlotStorage
+
+    TypeRef = Tuple[Any, ...]  # Import path or location in parent type.
+    IndexEntry = Tuple[int, int, TypeRef, Tuple[int, ...]]  # Offset, size, type, refs.
+    Location = Tuple[int, int]  # Offset and size.
+    Segment = Dict[str, Any]  # Index segment.
+
+__all__ = ["ApplicationSnapshotLog"]
+
+
+_MAGIC = b"OBJETTO\x01"
+_TRAILER = Struct(">QQ8s")  # Index offset, index size, and magic.
+
+
+class _RecordPickler(pickle.Pickler):
+    """
+    Pickles objects and the data of children as references.
+
+    :param file: File.
+    :param oids: Object ids mapped by object.
+    :param data_oids: Object ids mapped by the id of their data.
+    """
+
+    def __init__(self, file, oids, data_oids):
+        # type: (IO[bytes], Mapping[BaseObject, int], Mapping[int, int]) -> None
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        self.__oids = oids
+        self.__data_oids = data_oids
+        self.refs = set()  # type: Set[int]
+
+    def persistent_id(self, obj):
+        # type: (Any) -> Optional[Tuple[str, int]]
+        if isinstance(obj, BaseObject):
+            try:
+                oid = self.__oids[obj]
+            except KeyError:
+                error = "can't log {}, which is not in the snapshot".format(obj)
+                raise ValueError(error)
+            self.refs.add(oid)
+            return "o", oid
+        oid = self.__data_oids.get(id(obj))
+        if oid is not None:
+            return "d", oid
+        return None
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    """
+    Unpickles object and data references.
+
+    :param file: File.
+    :param loader: Snapshot loader.
+    """
+
+    def __init__(self, file, loader):
+        # type: (IO[bytes], _SnapshotLoader) -> None
+        pickle.Unpickler.__init__(self, file)
+        self.__loader = loader
+
+    def persistent_load(self, pid):
+        # type: (Tuple[str, int]) -> Any
+        kind, oid = pid
+        if kind == "o":
+            return self.__loader.get_object(oid)
+        return self.__loader.get_store(oid).data
+
+
+@final
+class _SnapshotLoader(object):
+    """
+    Loads stores from a memory-mapped log on demand.
+
+    :param buffer: Memory-mapped log.
+    :param index: Index entries mapped by object id.
+    """
+
+    __slots__ = ("__buffer", "__index", "__objects", "__stores")
+
+    def __init__(self, buffer, index):
+        # type: (mmap, Mapping[int, IndexEntry]) -> None
+        self.__buffer = buffer
+        self.__index = index
+        self.__objects = {}  # type: Dict[int, ref]
+        self.__stores = {}  # type: Dict[int, LazyValue[Store]]
+
+    def add(self, oid, obj, refs):
+        # type: (int, BaseObject, Tuple[BaseObject, ...]) -> LazyValue[Store]
+        """
+        Add an object and get its lazy store.
+
+        :param oid: Object id.
+        :param obj: Object.
+        :param refs: Objects referred to by the store, kept alive until it's loaded.
+        :return: Lazy store.
+        """
+        self.__objects[oid] = ref(obj)
+        store = self.__stores[oid] = LazyValue(partial(self.__load, oid, obj, refs))
+        return store
+
+    def get_object(self, oid):
+        # type: (int) -> Optional[BaseObject]
+        """
+        Get object.
+
+        :param oid: Object id.
+        :return: Object (or None if it's dead).
+        """
+        return self.__objects[oid]()
+
+    def get_store(self, oid):
+        # type: (int) -> Store
+        """
+        Get store (as it was logged).
+
+        :param oid: Object id.
+        :return: Store.
+        """
+        return self.__stores[oid].get()
+
+    def close(self):
+        # type: () -> None
+        """Load the stores that were not loaded yet and close the memory-mapped log."""
+        for store in itervalues(self.__stores):
+            store.get()
+        self.__buffer.close()
+
+    def __load(self, oid, obj, _refs=()):
+        # type: (int, BaseObject, Tuple[BaseObject, ...]) -> Store
+        """
+        Load store.
+
+        :param oid: Object id.
+        :param obj: Object.
+        :param _refs: Objects kept alive until the store is loaded.
+        :return: Store.
+        """
+        offset, size = self.__index[oid][:2]
+        file = BytesIO(self.__buffer[offset : offset + size])
+        state, data_state, metadata, parent_oid, children_oids = _RecordUnpickler(
+            file, self
+        ).load()
+        data_type = type(obj).Data
+        if data_type is not None and data_state is not None:
+            data = data_type.__make__(data_state)  # type: Optional[BaseData]
+        else:
+            data = None
+        if parent_oid is None:
+            parent_ref = WeakReference()  # type: WeakReference[BaseObject]
+        else:
+            parent_ref = WeakReference(self.get_object(parent_oid))
+        children = InteractiveSetData(self.get_object(c) for c in children_oids)
+        return Store(
+            state=state,
+            data=data,
+            metadata=metadata,
+            parent_ref=parent_ref,
+            children=children,
+        )
+
+
+def _get_type_ref(cls, parent_type_ref=None, location=None):
+    # type: (Type[BaseObject], Optional[TypeRef], Any) -> TypeRef
+    """
+    Get a reference to an object type that can be resolved in another process.
+
+    Types that can't be imported (like auxiliary types generated for attributes) are
+    referred to by their location in their parent's type.
+
+    :param cls: Object type.
+    :param parent_type_ref: Parent type reference.
+    :param location: Location in the parent.
+    :return: Type reference.
+    :raises ValueError: Can't get a reference to type.
+    """
+    try:
+        return ("path", get_path(cls))
+    except ValueError:
+        if parent_type_ref is not None:
+            parent_cls = _resolve_type_ref(parent_type_ref)
+            types = parent_cls._get_relationship(location).types
+            for i, typ in enumerate(types):
+                if typ is cls:
+                    return "child", parent_type_ref, location, i
+        raise
+
+
+def _resolve_type_ref(type_ref):
+    # type: (TypeRef) -> Type[BaseObject]
+    """
+    Resolve a type reference.
+
+    :param type_ref: Type reference.
+    :return: Object type.
+    """
+    if type_ref[0] == "path":
+        return import_path(type_ref[1])
+    _, parent_type_ref, location, i = type_ref
+    parent_cls = _resolve_type_ref(parent_type_ref)
+    return parent_cls._get_relationship(location).types[i]
+
+
+@final
+class ApplicationSnapshotLog(Base):
+    """
+    Append-only on-disk log of application snapshots.
+
+    Inherits from:
+      - :class:`objetto.bases.Base`
+
+    Features:
+      - Only stores that changed since the last appended snapshot get logged.
+      - Loading memory-maps the log and only unpickles an object's state the first time
+        it gets read (or when the log gets closed).
+
+    Every append writes the changed stores (state, data, metadata, and hierarchy of
+    every object) at the end of the file, followed by an index segment with the
+    entries that changed, chained to the previous segment. Once a chain gets longer
+    than the index itself, a full index is written instead (starting a new chain).
+    Objects and their children's data are logged as references, so nothing gets
+    logged twice. The type of every object has to be importable (or be an auxiliary
+    type generated for an attribute of an importable type). History is not logged.
+
+    .. warning::
+        Records and index segments are pickled, and loading a log can run arbitrary
+        code. Never load logs from untrusted sources.
+
+    :param path: Path to the log file (created if it doesn't exist).
+    :type path: str
+    """
+
+    __slots__ = (
+        "__lock",
+        "__file",
+        "__oids",
+        "__next_oid",
+        "__app_ref",
+        "__storage",
+        "__index",
+        "__segment",
+        "__chain",
+        "__loader",
+    )
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self.__lock = RLock()
+        self.__file = open(path, "a+b")  # type: IO[bytes]
+        self.__oids = WeakKeyDictionary()  # type: MutableMapping[BaseObject, int]
+        self.__next_oid = 0
+        self.__app_ref = WeakReference()  # type: WeakReference[Application]
+        self.__storage = None  # type: Optional[SlotStorage[BaseObject, Store]]
+        self.__index = {}  # type: Dict[int, IndexEntry]
+        self.__segment = None  # type: Optional[Location]
+        self.__chain = 0
+        self.__loader = None  # type: Optional[_SnapshotLoader]
+
+        # Write header or get next object id from the last index segment.
+        self.__file.seek(0, 2)
+        if not self.__file.tell():
+            self.__file.write(_MAGIC)
+            self.__file.flush()
+        else:
+            self.__next_oid = self.__read_index()[0]["next_oid"]
+
+    def __enter__(self):
+        # type: () -> ApplicationSnapshotLog
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __read_index(self, buffer=None):
+        # type: (Optional[mmap]) -> Tuple[Segment, Location, Dict[int, IndexEntry]]
+        """
+        Read the index.
+
+        :param buffer: Memory-mapped log (if not provided, only the trailer and the \
+last index segment are read from the file, and no entries are returned).
+        :return: Last index segment, its offset and size, and entries mapped by \
+object id.
+        :raises ValueError: Not a valid log.
+        """
+        if buffer is None:
+            file = self.__file
+            file.seek(0, 2)
+            file_size = file.tell()
+
+            def read(offset, size):
+                # type: (int, int) -> bytes
+                """Read bytes from the file."""
+                file.seek(offset)
+                return file.read(size)
+
+        else:
+            file_size = len(buffer)
+
+            def read(offset, size):
+                # type: (int, int) -> bytes
+                """Read bytes from the buffer."""
+                return buffer[offset : offset + size]
+
+        if file_size < len(_MAGIC) + _TRAILER.size or read(0, len(_MAGIC)) != _MAGIC:
+            error = "not a valid snapshot log"
+            raise ValueError(error)
+        offset, size, magic = _TRAILER.unpack(
+            read(file_size - _TRAILER.size, _TRAILER.size)
+        )
+        if magic != _MAGIC:
+            error = "snapshot log is incomplete or corrupted"
+            raise ValueError(error)
+        last_segment = segment = pickle.loads(read(offset, size))
+        entries = {}  # type: Dict[int, IndexEntry]
+        if buffer is None:
+            return last_segment, (offset, size), entries
+
+        # Follow the chain back to the last full index, newer entries win.
+        # Object ids are never reused, so removed ones don't show up again.
+        removed = set()  # type: Set[int]
+        while True:
+            for oid, entry in iteritems(segment["objects"]):
+                if oid not in entries and oid not in removed:
+                    entries[oid] = entry
+            removed.update(segment.get("removed", ()))
+            previous = segment.get("previous")
+            if previous is None:
+                break
+            segment = pickle.loads(read(*previous))
+        return last_segment, (offset, size), entries
+
+    def __write_record(
+        self,
+        snapshot,  # type: ApplicationSnapshot
+        obj,  # type: BaseObject
+        store,  # type: Store
+        type_refs,  # type: Dict[BaseObject, TypeRef]
+    ):
+        # type: (...) -> IndexEntry
+        """
+        Write an object's store to the end of the log.
+
+        :param snapshot: Snapshot being appended.
+        :param obj: Object.
+        :param store: Store.
+        :param type_refs: Type references cache.
+        :return: Index entry.
+        """
+        storage = snapshot._storage
+        data_oids = {}  # type: Dict[int, int]
+        for child in store.children:
+            child_data = storage.query(child).data
+            if child_data is not None:
+                data_oids[id(child_data)] = self.__oids[child]
+        parent = store.parent_ref()
+        payload = (
+            store.state,
+            None if store.data is None else store.data._state,
+            store.metadata,
+            None if parent is None else self.__oids[parent],
+            tuple(self.__oids[c] for c in store.children),
+        )
+        file = BytesIO()
+        pickler = _RecordPickler(file, self.__oids, data_oids)
+        pickler.dump(payload)
+        record = file.getvalue()
+
+        self.__file.seek(0, 2)
+        offset = self.__file.tell()
+        self.__file.write(record)
+        type_ref = self.__get_type_ref(snapshot, obj, type_refs)
+        return offset, len(record), type_ref, tuple(sorted(pickler.refs))
+
+    def __get_type_ref(self, snapshot, obj, type_refs):
+        # type: (ApplicationSnapshot, BaseObject, Dict[BaseObject, TypeRef]) -> TypeRef
+        """
+        Get reference to an object's type.
+
+        :param snapshot: Snapshot being appended.
+        :param obj: Object.
+        :param type_refs: Type references cache.
+        :return: Type reference.
+        """
+        try:
+            return type_refs[obj]
+        except KeyError:
+            pass
+        parent = snapshot._storage.query(obj).parent_ref()
+        if parent is None:
+            type_ref = _get_type_ref(type(obj))
+        else:
+            type_ref = _get_type_ref(
+                type(obj),
+                self.__get_type_ref(snapshot, parent, type_refs),
+                parent._locate(obj),
+            )
+        type_refs[obj] = type_ref
+        return type_ref
+
+    def append(self, snapshot):
+        # type: (ApplicationSnapshot) -> None
+        """
+        Append a snapshot to the log.
+
+        Only the stores that changed since the last snapshot appended (or loaded) by
+        this log get written.
+
+        :param snapshot: Application snapshot.
+        :type snapshot: objetto.applications.ApplicationSnapshot
+
+        :raises ValueError: Can't log a reference or a type.
+        """
+        with ReraiseContext(TypeError, "'snapshot' parameter"):
+            assert_is_instance(snapshot, ApplicationSnapshot)
+        app = snapshot.app
+
+        with self.__lock, app.read_context(snapshot):
+            storage = snapshot._storage
+
+            # Get changed entries since the last snapshot, or all of them.
+            previous = self.__storage
+            incremental = self.__app_ref() is app and previous is not None
+            if incremental:
+                entries = list(itervalues(previous.diff(storage)))
+            else:
+                entries = [(None, e) for e in itervalues(storage.to_slots())]
+                self.__oids.clear()
+
+            # Assign ids to new objects, drop entries of removed ones.
+            removed = []  # type: List[int]
+            for entry, new_entry in entries:
+                if entry is not None and (
+                    new_entry is None or new_entry[0] is not entry[0]
+                ):
+                    oid = self.__oids.pop(entry[0], None)
+                    if oid is not None:
+                        removed.append(oid)
+                if new_entry is not None and new_entry[0] not in self.__oids:
+                    self.__oids[new_entry[0]] = self.__next_oid
+                    self.__next_oid += 1
+
+            # Write records.
+            type_refs = {}  # type: Dict[BaseObject, TypeRef]
+            changed = {}  # type: Dict[int, IndexEntry]
+            for _, new_entry in entries:
+                if new_entry is not None:
+                    obj, store = new_entry
+                    oid = self.__oids[obj]
+                    changed[oid] = self.__write_record(snapshot, obj, store, type_refs)
+
+            # Update the index.
+            if incremental:
+                index = self.__index
+                for oid in removed:
+                    index.pop(oid, None)
+                index.update(changed)
+            else:
+                index = changed
+
+            # Write an index segment (or a full index if the chain got too long).
+            roots = {}  # type: Dict[str, int]
+            for name, root in iteritems(type(app)._roots):
+                roots[name] = self.__oids[app.__.get_root_obj(root)]
+            chain = self.__chain + len(changed) + len(removed)
+            if incremental and self.__segment is not None and chain <= len(index):
+                segment = {
+                    "objects": changed,
+                    "removed": tuple(removed),
+                    "previous": self.__segment,
+                }  # type: Segment
+            else:
+                segment = {"objects": index, "removed": (), "previous": None}
+                chain = 0
+            segment.update(roots=roots, next_oid=self.__next_oid, chain=chain)
+            data = pickle.dumps(segment, pickle.HIGHEST_PROTOCOL)
+            self.__file.seek(0, 2)
+            offset = self.__file.tell()
+            self.__file.write(data)
+            self.__file.write(_TRAILER.pack(offset, len(data), _MAGIC))
+            self.__file.flush()
+
+            self.__app_ref = WeakReference(app)
+            self.__storage = storage
+            self.__index = index
+            self.__segment = (offset, len(data))
+            self.__chain = chain
+
+    def load(self, app):
+        # type: (Application) -> None
+        """
+        Load the last snapshot in the log into a newly created application.
+
+        The log gets memory-mapped and object states only get unpickled the first time
+        they are read, or when the log gets closed. Root objects are matched by name.
+        Only load logs from trusted sources, since they get unpickled.
+
+        :param app: Application (with no objects other than its roots).
+        :type app: objetto.applications.Application
+
+        :raises ValueError: Not a valid log or roots mismatch.
+        """
+        with ReraiseContext(TypeError, "'app' parameter"):
+            assert_is_instance(app, Application)
+
+        with self.__lock:
+            self.__file.flush()
+            if not fstat(self.__file.fileno()).st_size:
+                error = "snapshot log is empty"
+                raise ValueError(error)
+            buffer = mmap(self.__file.fileno(), 0, access=ACCESS_READ)
+            try:
+                last_segment, location, entries = self.__read_index(buffer)
+
+                # Match roots.
+                roots = type(app)._roots
+                if set(roots) != set(last_segment["roots"]):
+                    error = "roots mismatch"
+                    raise ValueError(error)
+                objects = {}  # type: Dict[int, BaseObject]
+                for name, oid in iteritems(last_segment["roots"]):
+                    objects[oid] = app.__.get_root_obj(roots[name])
+
+                # Make the other objects, their contents get restored below.
+                with app.write_context():
+                    for oid, entry in iteritems(entries):
+                        if oid not in objects:
+                            cls = _resolve_type_ref(entry[2])
+                            objects[oid] = app.__.make_object(cls)
+            except BaseException:
+                buffer.close()
+                raise
+
+            # Restore a snapshot with lazy stores.
+            loader = _SnapshotLoader(buffer, entries)
+            stores = {}  # type: Dict[BaseObject, LazyValue[Store]]
+            for oid, obj in iteritems(objects):
+                refs = tuple(objects[r] for r in entries[oid][3])
+                stores[obj] = loader.add(oid, obj, refs)
+            storage = app.take_snapshot()._storage.update(stores)
+            app.__.restore_snapshot(ApplicationSnapshot(app, storage))
+
+            if self.__loader is not None:
+                self.__loader.close()
+            self.__loader = loader
+            self.__oids.clear()
+            self.__oids.update((o, i) for i, o in iteritems(objects))
+            self.__next_oid = last_segment["next_oid"]
+            self.__app_ref = WeakReference(app)
+            self.__storage = storage
+            self.__index = entries
+            self.__segment = location
+            self.__chain = last_segment.get("chain", 0)
+
+    def close(self):
+        # type: () -> None
+        """
+        Close the log file and its memory map (stores that were not loaded yet get
+        loaded first).
+        """
+        with self.__lock:
+            if self.__loader is not None:
+                self.__loader.close()
+                self.__loader = None
+            self.__file.close()
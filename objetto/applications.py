@@ -17,11 +17,17 @@ from typing import TYPE_CHECKING
 from ._applications import (
     BO,
     Application,
+    ApplicationAsyncContext,
+    ApplicationFork,
     ApplicationMeta,
     ApplicationProperty,
     ApplicationRoot,
     ApplicationSnapshot,
+    ApplicationSnapshotDiff,
+    ApplicationStats,
 )
+from ._change_feed import ApplicationChangeFeed, ChangeRecord
+from ._snapshot_log import ApplicationSnapshotLog
 
 if TYPE_CHECKING:
     from typing import Any, Optional, Type
@@ -31,6 +37,13 @@ __all__ = [
     "Application",
     "ApplicationProperty",
     "ApplicationSnapshot",
+    "ApplicationSnapshotDiff",
+    "ApplicationSnapshotLog",
+    "ApplicationChangeFeed",
+    "ChangeRecord",
+    "ApplicationStats",
+    "ApplicationFork",
+    "ApplicationAsyncContext",
     "root",
 ]
 
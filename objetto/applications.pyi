@@ -2,8 +2,15 @@ from typing import Any, Optional, Type
 
 from ._applications import BO
 from ._applications import Application as Application
+from ._applications import ApplicationAsyncContext as ApplicationAsyncContext
+from ._applications import ApplicationFork as ApplicationFork
 from ._applications import ApplicationMeta as ApplicationMeta
 from ._applications import ApplicationProperty as ApplicationProperty
 from ._applications import ApplicationSnapshot as ApplicationSnapshot
+from ._applications import ApplicationSnapshotDiff as ApplicationSnapshotDiff
+from ._applications import ApplicationStats as ApplicationStats
+from ._change_feed import ApplicationChangeFeed as ApplicationChangeFeed
+from ._change_feed import ChangeRecord as ChangeRecord
+from ._snapshot_log import ApplicationSnapshotLog as ApplicationSnapshotLog
 
 def root(obj_type: Type[BO], priority: Optional[int] = ..., **kwargs: Any) -> BO: ...
@@ -3,6 +3,7 @@
 
 from ._changes import (
     Batch,
+    BulkLoad,
     DictUpdate,
     ListDelete,
     ListInsert,
@@ -15,6 +16,7 @@ from ._changes import (
 
 __all__ = [
     "Batch",
+    "BulkLoad",
     "Update",
     "DictUpdate",
     "ListInsert",
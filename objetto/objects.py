@@ -8,7 +8,7 @@ try:
 except ImportError:
     import collections as collections_abc  # type: ignore
 
-from ._applications import Action
+from ._applications import Action, ActionRecord
 from ._bases import MISSING
 from ._constants import BASE_STRING_TYPES
 from ._data import DataRelationship
@@ -68,6 +68,7 @@ __all__ = [
     "KeyRelationship",
     "UniqueDescriptor",
     "Action",
+    "ActionRecord",
     "data_method",
     "data_relationship",
     "unique_descriptor",
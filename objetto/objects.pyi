@@ -1,6 +1,7 @@
 from typing import Any, Callable, Iterable, Optional, Tuple, Type, TypeVar, Union
 
 from ._applications import Action as Action
+from ._applications import ActionRecord as ActionRecord
 from ._data import DataRelationship
 from ._history import HistoryObject
 from ._objects import Attribute as Attribute
@@ -1,6 +1,30 @@
 # -*- coding: utf-8 -*-
 """Observer mixin class."""
 
-from ._observers import ActionObserver, ActionObserverExceptionData, ActionObserverToken
+from ._digests import ActionDigest, ListRange, ObjectDigest
+from ._observers import (
+    ActionDigestObserver,
+    ActionObserver,
+    ActionObserverExceptionData,
+    ActionObserverTimer,
+    ActionObserverToken,
+    AsyncActionObserver,
+    AsyncActionObserverQueue,
+    DebouncedActionObserver,
+    ThrottledActionObserver,
+)
 
-__all__ = ["ActionObserver", "ActionObserverToken", "ActionObserverExceptionData"]
+__all__ = [
+    "ActionObserver",
+    "AsyncActionObserver",
+    "AsyncActionObserverQueue",
+    "DebouncedActionObserver",
+    "ThrottledActionObserver",
+    "ActionObserverTimer",
+    "ActionDigestObserver",
+    "ActionObserverToken",
+    "ActionObserverExceptionData",
+    "ActionDigest",
+    "ObjectDigest",
+    "ListRange",
+]
@@ -127,7 +127,7 @@ def get_path(obj):
 
     try:
         imported_obj = import_path(path)
-    except (ValueError, ImportError):
+    except (ValueError, ImportError, AttributeError):
         imported_obj = None
 
     if imported_obj is not obj:
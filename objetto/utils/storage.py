@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
-"""Immutable weak key/strong value storage and mutable evolver."""
+"""
+Immutable weak key/strong value storages, mutable evolver, slot allocator, and lazy
+values.
+"""
 
 from abc import abstractmethod
 from copy import deepcopy
 from functools import partial
+from threading import RLock
 from typing import TYPE_CHECKING, Generic, TypeVar, cast
 from weakref import WeakSet, ref
 
@@ -12,13 +16,26 @@ try:
 except ImportError:
     final = lambda f: f  # type: ignore
 
-from pyrsistent import pmap
-from six import iteritems
+from pyrsistent import pmap, pvector
+from six import iteritems, itervalues
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Dict, Mapping, MutableSet, Optional, Tuple, Type
-
-    from pyrsistent.typing import PMap, PMapEvolver
+    from typing import (
+        Any,
+        Callable,
+        Dict,
+        FrozenSet,
+        Iterable,
+        List,
+        Mapping,
+        MutableSet,
+        Optional,
+        Set,
+        Tuple,
+        Type,
+    )
+
+    from pyrsistent.typing import PMap, PMapEvolver, PVector
 
     # Typevars.
     T = TypeVar("T")  # Any type.
@@ -27,8 +44,17 @@ if TYPE_CHECKING:
 
     # Type aliases.
     WeakReference = Callable[[], Optional[T]]  # Weak reference-like callable type.
-
-__all__ = ["AbstractStorage", "Storage", "StorageEvolver"]
+    SlotDelta = Tuple[Optional[Any], FrozenSet[int], int]  # Previous, slots, and total.
+    SlotEntry = Optional[Tuple[Any, Any]]  # Key and value (or None).
+
+__all__ = [
+    "AbstractStorage",
+    "Storage",
+    "StorageEvolver",
+    "SlotAllocator",
+    "SlotStorage",
+    "LazyValue",
+]
 
 # Runtime typevars.
 KT = TypeVar("KT")  # Key type.
@@ -346,3 +372,514 @@ class StorageEvolver(AbstractStorage[KT, VT]):
         :rtype: pyrsistent.PMap[collections.abc.Hashable, Any]
         """
         return self.__updates
+
+
+def _unpickle_slot_allocator(keys):
+    # type: (List[Optional[KT]]) -> SlotAllocator[KT]
+    allocator = SlotAllocator()  # type: SlotAllocator[KT]
+    allocator.__setstate__(keys)
+    return allocator
+
+
+@final
+class SlotAllocator(Generic[KT]):
+    """
+    Allocates dense integer slots for keys.
+
+    The slot of a key is released when it dies and gets recycled for new keys.
+    Released slots are also kept until they are popped, so storages can discard the
+    values of dead keys (see :meth:`objetto.utils.storage.SlotStorage.discard`).
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "__lock",
+        "__refs",
+        "__free",
+        "__released",
+        "__count",
+    )
+
+    def __init__(self):
+        # type: () -> None
+        self.__lock = RLock()
+        self.__refs = []  # type: List[Optional[WeakReference[KT]]]
+        self.__free = []  # type: List[int]
+        self.__released = []  # type: List[int]
+        self.__count = 0
+
+    def __reduce__(self):
+        # type: () -> Tuple[Callable, Tuple[List[Optional[KT]]]]
+        return _unpickle_slot_allocator, (self.__getstate__(),)
+
+    def __deepcopy__(self, memo=None):
+        # type: (Optional[Dict[int, Any]]) -> SlotAllocator[KT]
+        if memo is None:
+            memo = {}
+        try:
+            deep_copy = memo[id(self)]
+        except KeyError:
+            deep_copy = memo[id(self)] = SlotAllocator()
+            args = (self.__getstate__(), memo)
+            deep_copy.__setstate__(deepcopy(*args))
+        return deep_copy
+
+    def __copy__(self):
+        return self
+
+    def __getstate__(self):
+        # type: () -> List[Optional[KT]]
+        with self.__lock:
+            return [None if r is None else r() for r in self.__refs]
+
+    def __setstate__(self, keys):
+        # type: (List[Optional[KT]]) -> None
+        with self.__lock:
+            refs = self.__refs = []  # type: List[Optional[WeakReference[KT]]]
+            free = self.__free = []  # type: List[int]
+            self.__released = []
+            for slot, key in enumerate(keys):
+                if key is None:
+                    refs.append(None)
+                    free.append(slot)
+                else:
+                    refs.append(ref(key, self.__releaser(slot)))
+            free.reverse()
+            self.__count = len(refs) - len(free)
+
+    def __releaser(self, slot):
+        # type: (int) -> Callable[[WeakReference[KT]], None]
+        """
+        Make a weak reference callback that releases a slot.
+
+        :param slot: Slot.
+        :return: Weak reference callback.
+        """
+        weak_self = ref(self)
+
+        def release(_):
+            allocator = weak_self()
+            if allocator is not None:
+                allocator.__release(slot)
+
+        return release
+
+    def __release(self, slot):
+        # type: (int) -> None
+        """
+        Release a slot so it can be recycled.
+
+        :param slot: Slot.
+        """
+        with self.__lock:
+            self.__refs[slot] = None
+            self.__free.append(slot)
+            self.__released.append(slot)
+            self.__count -= 1
+
+    def allocate(self, key):
+        # type: (KT) -> int
+        """
+        Allocate a slot for a key, recycling released ones first.
+
+        :param key: Key.
+        :return: Slot.
+        :rtype: int
+        """
+        with self.__lock:
+            refs = self.__refs
+            if self.__free:
+                slot = self.__free.pop()
+                refs[slot] = ref(key, self.__releaser(slot))
+            else:
+                slot = len(refs)
+                refs.append(ref(key, self.__releaser(slot)))
+            self.__count += 1
+            return slot
+
+    def get(self, slot):
+        # type: (int) -> Optional[KT]
+        """
+        Get the key currently allocated in a slot.
+
+        :param slot: Slot.
+        :return: Key or None (if slot is free).
+        """
+        weak_key = self.__refs[slot]
+        if weak_key is None:
+            return None
+        return weak_key()
+
+    def pop_released(self):
+        # type: () -> List[int]
+        """
+        Get and forget the slots released since the last call.
+
+        :return: Released slots.
+        :rtype: list[int]
+        """
+        with self.__lock:
+            released = self.__released
+            if released:
+                self.__released = []
+            return released
+
+    @property
+    def size(self):
+        # type: () -> int
+        """
+        Number of slots (used or free).
+
+        :rtype: int
+        """
+        return len(self.__refs)
+
+    @property
+    def count(self):
+        # type: () -> int
+        """
+        Number of slots in use.
+
+        :rtype: int
+        """
+        return self.__count
+
+
+@final
+class LazyValue(Generic[VT]):
+    """
+    Value that gets loaded the first time it's needed.
+
+    Slot storages hold lazy values as-is and load them when queried (see
+    :class:`objetto.utils.storage.SlotStorage`).
+
+    :param loader: Function that loads the value.
+    :type loader: function
+    """
+
+    __slots__ = ("__lock", "__loader", "__value")
+
+    def __init__(self, loader):
+        # type: (Callable[[], VT]) -> None
+        self.__lock = RLock()
+        self.__loader = loader  # type: Optional[Callable[[], VT]]
+        self.__value = None  # type: Optional[VT]
+
+    def get(self):
+        # type: () -> VT
+        """
+        Get value, load it if not loaded yet.
+
+        :return: Value.
+        """
+        if self.__loader is not None:
+            with self.__lock:
+                loader = self.__loader
+                if loader is not None:
+                    self.__value = loader()
+                    self.__loader = None
+        return self.__value  # type: ignore
+
+    @property
+    def loaded(self):
+        # type: () -> bool
+        """
+        Whether the value was loaded already.
+
+        :rtype: bool
+        """
+        return self.__loader is None
+
+
+def _unpickle_slot_storage(get_slot, slots):
+    # type: (Callable[[KT], int], Mapping[int, Tuple[KT, VT]]) -> SlotStorage[KT, VT]
+    storage = SlotStorage(get_slot)  # type: SlotStorage[KT, VT]
+    return storage.update_slots(slots)
+
+
+@final
+class SlotStorage(AbstractStorage[KT, VT]):
+    """
+    Immutable weak key/strong value storage for keys with dense integer slots.
+
+    Values are kept in a persistent vector indexed by the slot of the key, so queries
+    are a single index lookup (plus an identity check against the key, since slots are
+    recycled). Values of dead keys stay in the vector until their slots are recycled or
+    discarded. Values can be :class:`objetto.utils.storage.LazyValue`, which get
+    loaded when queried.
+
+    Every storage also remembers which slots were set since the storages it was
+    derived from (up to a limit), so storages of the same lineage can be compared
+    without scanning all of their slots (see
+    :meth:`objetto.utils.storage.SlotStorage.diff`).
+
+    :param get_slot: Function that gets the slot of a key.
+    :type get_slot: function
+
+    :param initial: Initial values.
+    :type initial: collections.abc.Mapping[collections.abc.Hashable, Any]
+    """
+
+    __slots__ = ("__weakref__", "__get_slot", "__data", "__delta", "__count")
+
+    max_delta_slots = 4096
+    """Number of slots remembered as set since the storages this one derives from."""
+
+    def __init__(self, get_slot, initial=None):
+        # type: (Callable[[KT], int], Optional[Mapping[KT, VT]]) -> None
+        self.__get_slot = get_slot
+        self.__data = pvector()  # type: PVector[Optional[Tuple[WeakReference[KT], VT]]]
+        self.__delta = (None, frozenset(), 0)  # type: SlotDelta
+        self.__count = 0
+        if initial is not None:
+            storage = self.update(initial)
+            self.__data, self.__delta = storage.__data, storage.__delta
+            self.__count = storage.__count
+
+    def __reduce__(self):
+        # type: () -> Tuple[Callable, Tuple[Callable, Dict[int, Tuple[KT, VT]]]]
+        return _unpickle_slot_storage, (self.__get_slot, self.to_slots())
+
+    def __deepcopy__(self, memo=None):
+        # type: (Optional[Dict[int, Any]]) -> SlotStorage[KT, VT]
+        if memo is None:
+            memo = {}
+        try:
+            deep_copy = memo[id(self)]
+        except KeyError:
+            deep_copy = memo[id(self)] = SlotStorage(self.__get_slot)
+            args = (self.to_slots(), memo)
+            storage = deep_copy.update_slots(deepcopy(*args))
+            deep_copy.__data, deep_copy.__delta = storage.__data, storage.__delta
+            deep_copy.__count = storage.__count
+        return deep_copy
+
+    def __copy__(self):
+        return self
+
+    def __evolve(self, entries):
+        # type: (Iterable[Tuple[int, Optional[Tuple[Callable, VT]]]]) -> SlotStorage
+
+        """
+        Get new storage with entries set at slots.
+
+        :param entries: Slots and entries.
+        :return: Updated storage.
+        """
+        evolver = self.__data.evolver()
+        size = len(evolver)
+        count = self.__count
+        slots = set()
+        for slot, entry in entries:
+            if slot >= size:
+                evolver.extend((None,) * (slot + 1 - size))
+                size = slot + 1
+            count += (entry is not None) - (evolver[slot] is not None)
+            evolver[slot] = entry
+            slots.add(slot)
+        if not evolver.is_dirty():
+            return self
+
+        # Remember the slots that were set, forget older ones if there are too many.
+        total = self.__delta[2] + len(slots)
+        if total > self.max_delta_slots:
+            delta = (None, frozenset(slots), len(slots))  # type: SlotDelta
+        else:
+            delta = (self.__delta, frozenset(slots), total)
+
+        storage = SlotStorage.__new__(SlotStorage)
+        storage.__get_slot = self.__get_slot
+        storage.__data = evolver.persistent()
+        storage.__delta = delta
+        storage.__count = count
+        return storage
+
+    @staticmethod
+    def __gather_slots(delta, ancestor):
+        # type: (SlotDelta, SlotDelta) -> Optional[Set[int]]
+        """
+        Gather slots set since an ancestor delta.
+
+        :param delta: Delta.
+        :param ancestor: Ancestor delta.
+        :return: Slots or None (if ancestor delta is not remembered).
+        """
+        slots = set()  # type: Set[int]
+        current = delta  # type: Optional[SlotDelta]
+        while current is not None:
+            if current is ancestor:
+                return slots
+            slots.update(current[1])
+            current = current[0]
+        return None
+
+    def diff(self, other):
+        # type: (SlotStorage[KT, VT]) -> Dict[int, Tuple[SlotEntry, SlotEntry]]
+        """
+        Compare entries with another storage.
+
+        If one of the storages was derived from the other one recently enough, only
+        the slots set in between are compared. Otherwise, all slots are compared (by
+        identity).
+
+        :param other: Other storage.
+        :type other: objetto.utils.storage.SlotStorage
+
+        :return: Differing entries (key and value, or None) in this and in the other \
+storage, mapped by their slots.
+        :rtype: dict[int, tuple[tuple or None, tuple or None]]
+        """
+        data = self.__data
+        other_data = other.__data
+        if data is other_data:
+            return {}
+
+        slots = self.__gather_slots(other.__delta, self.__delta)
+        if slots is None:
+            slots = self.__gather_slots(self.__delta, other.__delta)
+        if slots is None:
+            slots = range(max(len(data), len(other_data)))
+
+        def get_entry(data_, slot_):
+            # type: (PVector[Optional[Tuple[WeakReference[KT], VT]]], int) -> SlotEntry
+            """Get key and value at a slot (or None)."""
+            if slot_ >= len(data_):
+                return None
+            entry_ = data_[slot_]
+            if entry_ is None:
+                return None
+            key_ = entry_[0]()
+            if key_ is None:
+                return None
+            return key_, entry_[1]
+
+        def load(entry_):
+            # type: (SlotEntry) -> SlotEntry
+            """Load lazy value of an entry."""
+            if entry_ is not None and type(entry_[1]) is LazyValue:
+                return entry_[0], entry_[1].get()
+            return entry_
+
+        diff = {}
+        for slot in slots:
+            entry = get_entry(data, slot)
+            other_entry = get_entry(other_data, slot)
+            if entry is None and other_entry is None:
+                continue
+            if (
+                entry is not None
+                and other_entry is not None
+                and entry[0] is other_entry[0]
+                and entry[1] is other_entry[1]
+            ):
+                continue
+            diff[slot] = (load(entry), load(other_entry))
+        return diff
+
+    def to_dict(self):
+        # type: () -> Dict[KT, VT]
+        """
+        Convert to dictionary.
+
+        :return: Dictionary.
+        :rtype: dict[collections.abc.Hashable, Any]
+        """
+        return dict(itervalues(self.to_slots()))
+
+    def to_slots(self):
+        # type: () -> Dict[int, Tuple[KT, VT]]
+        """
+        Convert to dictionary of keys and values mapped by their slots.
+
+        :return: Dictionary.
+        :rtype: dict[int, tuple[collections.abc.Hashable, Any]]
+        """
+        slots = {}
+        for slot, entry in enumerate(self.__data):
+            if entry is not None:
+                key = entry[0]()
+                if key is not None:
+                    value = entry[1]
+                    if type(value) is LazyValue:
+                        value = value.get()
+                    slots[slot] = (key, value)
+        return slots
+
+    def update(self, updates):
+        # type: (Mapping[KT, VT]) -> SlotStorage[KT, VT]
+        """
+        Get new storage with update keys and values.
+
+        :param updates: Updates.
+        :type updates: collections.abc.Mapping[collections.abc.Hashable, Any]
+
+        :return: Updated storage.
+        :rtype: SlotStorage
+        """
+        get_slot = self.__get_slot
+        return self.__evolve((get_slot(k), (ref(k), v)) for k, v in iteritems(updates))
+
+    def update_slots(self, updates):
+        # type: (Mapping[int, Tuple[KT, VT]]) -> SlotStorage[KT, VT]
+        """
+        Get new storage with update keys and values, already mapped by their slots.
+
+        :param updates: Keys and values mapped by slot.
+        :type updates: collections.abc.Mapping[int, tuple]
+
+        :return: Updated storage.
+        :rtype: SlotStorage
+        """
+        return self.__evolve((s, (ref(k), v)) for s, (k, v) in iteritems(updates))
+
+    def discard(self, slots):
+        # type: (Iterable[int]) -> SlotStorage[KT, VT]
+        """
+        Get new storage without the values of dead keys at slots.
+
+        :param slots: Slots.
+        :type slots: collections.abc.Iterable[int]
+
+        :return: Updated storage.
+        :rtype: SlotStorage
+        """
+        data = self.__data
+        size = len(data)
+        return self.__evolve(
+            (s, None)
+            for s in slots
+            if s < size and data[s] is not None and data[s][0]() is None
+        )
+
+    def query(self, key):
+        # type: (KT) -> VT
+        """
+        Query value for key.
+
+        :param key: Key.
+        :type key: collections.abc.Hashable
+
+        :return: Value.
+
+        :raises KeyError: Key is not in storage.
+        """
+        try:
+            entry = self.__data[self.__get_slot(key)]
+        except (IndexError, TypeError):
+            raise KeyError(key)
+        if entry is None or entry[0]() is not key:
+            raise KeyError(key)
+        value = entry[1]
+        if type(value) is LazyValue:
+            return value.get()
+        return value
+
+    @property
+    def count(self):
+        # type: () -> int
+        """
+        Number of values stored, including the ones of dead keys not discarded yet.
+
+        :rtype: int
+        """
+        return self.__count
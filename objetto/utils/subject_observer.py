@@ -5,23 +5,81 @@ Implementation of the `Subject-Observer Pattern
 """
 
 from abc import abstractmethod
+from collections import deque
 from sys import exc_info
+from threading import Condition, local
+from timeit import default_timer
 from types import TracebackType
 from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple, Type
-from weakref import WeakKeyDictionary, ref
+from weakref import WeakKeyDictionary, WeakSet, ref
+
+try:
+    from threading import get_ident
+except ImportError:
+    from thread import get_ident  # type: ignore
 
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, MutableMapping, Set
+    from typing import (
+        AbstractSet,
+        Any,
+        Callable,
+        Deque,
+        Dict,
+        Hashable,
+        Iterable,
+        List,
+        MutableMapping,
+        MutableSet,
+        Set,
+    )
+
+__all__ = [
+    "Subject",
+    "Observer",
+    "ObserverToken",
+    "ObserverExceptionInfo",
+    "ObserverLanes",
+]
 
-__all__ = ["Subject", "Observer", "ObserverToken", "ObserverExceptionInfo"]
+
+_lane_local = local()
 
 
 class Subject(object):
-    """Sends payloads to observers."""
+    """
+    Sends payloads to observers.
+
+    Observers can be registered with a set of hashable keys, in which case they only
+    receive payloads sent with :meth:`send_filtered` whose keys intersect with
+    theirs. Filtered observers are indexed by key, so the cost of sending a payload
+    scales with the number of matching observers, not with the registered ones.
+
+    .. code:: python
+
+        >>> from objetto.utils.subject_observer import Subject, Observer
+
+        >>> class MyObserver(Observer):
+        ...     def __init__(self, name):
+        ...         self.name = name
+        ...
+        ...     def __observe__(self, *payload):
+        ...         print("{} received payload {}".format(self.name, payload))
+        ...
+        >>> subject = Subject()
+        >>> observer_a = MyObserver("A")
+        >>> token_a = subject.register_observer(observer_a, keys=("a",))
+        >>> observer_b = MyObserver("B")
+        >>> token_b = subject.register_observer(observer_b, keys=("b",))
+        >>> exception_infos = subject.send_filtered(lambda *_: ("a", "c"), 1, 2, 3)
+        A received payload (1, 2, 3)
+    """
 
     __slots__ = (
         "__weakref__",
         "__observers",
+        "__unfiltered",
+        "__keys",
+        "__index",
         "__observing",
         "__receiving",
         "__failed",
@@ -34,6 +92,11 @@ class Subject(object):
         self.__observers = WeakKeyDictionary(
             {}
         )  # type: MutableMapping[Observer, ObserverToken]
+        self.__unfiltered = WeakSet()  # type: MutableSet[Observer]
+        self.__keys = WeakKeyDictionary(
+            {}
+        )  # type: MutableMapping[Observer, AbstractSet[Hashable]]
+        self.__index = {}  # type: Dict[Hashable, MutableSet[Observer]]
         self.__observing = set()  # type: Set[Observer]
         self.__receiving = set()  # type: Set[Observer]
         self.__failed = set()  # type: Set[Observer]
@@ -88,7 +151,20 @@ class Subject(object):
         :raises RuntimeError: Token cycle detected.
         :raises RuntimeError: Can't wait for failed observer.
         """
-        if self.__payload is not None:
+        context = getattr(_lane_local, "context", None)
+        if context is not None and context[1].subject is self:
+            subject = token._subject_ref()
+            if subject is None:
+                return
+            if subject is not self:
+                error = "token does not belong to this subject"
+                raise ValueError(error)
+            observer = token._observer_ref()
+            if observer is None:
+                return
+            lanes, delivery, waiter = context
+            lanes.__wait__(delivery, waiter, observer)
+        elif self.__payload is not None:
             subject = token._subject_ref()
             if subject is None:
                 return
@@ -134,13 +210,99 @@ class Subject(object):
         :return: Exception infos (for exceptions raised during observers' responses).
         :rtype: tuple[objetto.utils.subject_observer.ObserverExceptionInfo]
 
+        :raises RuntimeError: Already sending.
+        """
+        return self.__send(set(self.__observers), payload)
+
+    def send_filtered(
+        self,
+        get_keys,  # type: Callable[..., Iterable[Hashable]]
+        *payload  # type: Any
+    ):
+        # type: (...) -> Tuple[ObserverExceptionInfo, ...]
+        """
+        Send payload to unfiltered observers and to filtered observers registered
+        with at least one of the payload's keys.
+
+        :param get_keys: Called with the payload to get its keys (only when there are
+            filtered observers).
+        :type get_keys: function
+
+        :param payload: Payload.
+
+        :return: Exception infos (for exceptions raised during observers' responses).
+        :rtype: tuple[objetto.utils.subject_observer.ObserverExceptionInfo]
+
+        :raises RuntimeError: Already sending.
+        """
+        return self.__send(self.__get_recipients(get_keys, payload), payload)
+
+    def dispatch(
+        self,
+        lanes,  # type: ObserverLanes
+        get_keys,  # type: Callable[..., Iterable[Hashable]]
+        *payload  # type: Any
+    ):
+        # type: (...) -> Tuple[ObserverExceptionInfo, ...]
+        """
+        Like :meth:`send_filtered`, but dispatch payload to observers through lanes.
+        Observers that require inline dispatch still receive the payload right away.
+
+        :param lanes: Observer lanes.
+        :type lanes: objetto.utils.subject_observer.ObserverLanes
+
+        :param get_keys: Called with the payload to get its keys (only when there are
+            filtered observers).
+        :type get_keys: function
+
+        :param payload: Payload.
+
+        :return: Exception infos (for exceptions raised by inline observers).
+        :rtype: tuple[objetto.utils.subject_observer.ObserverExceptionInfo]
+
+        :raises RuntimeError: Already sending.
+        """
+        observers = self.__get_recipients(get_keys, payload)
+        inline = set(o for o in observers if o._inline_dispatch)
+        if len(inline) < len(observers):
+            lanes.dispatch(self, observers.difference(inline), payload)
+        if inline:
+            return self.__send(inline, payload)
+        return ()
+
+    def __get_recipients(self, get_keys, payload):
+        # type: (Callable[..., Iterable[Hashable]], Tuple[Any, ...]) -> Set[Observer]
+        """
+        Get observers that should receive a payload.
+
+        :param get_keys: Called with the payload to get its keys.
+        :param payload: Payload.
+        :return: Observers.
+        """
+        observers = set(self.__unfiltered)
+        if self.__index:
+            index = self.__index
+            for key in get_keys(*payload):
+                key_observers = index.get(key)
+                if key_observers:
+                    observers.update(key_observers)
+        return observers
+
+    def __send(self, observers, payload):
+        # type: (Set[Observer], Tuple[Any, ...]) -> Tuple[ObserverExceptionInfo, ...]
+        """
+        Send payload to observers.
+
+        :param observers: Observers.
+        :param payload: Payload.
+        :return: Exception infos.
         :raises RuntimeError: Already sending.
         """
         if self.__payload is not None:
             error = "already sending {}, can't send {}".format(self.__payload, payload)
             raise RuntimeError(error)
 
-        self.__observing = set(self.__observers)
+        self.__observing = observers
         self.__payload = payload
 
         while self.__observing:
@@ -172,14 +334,18 @@ class Subject(object):
 
         return exception_infos
 
-    def register_observer(self, observer):
-        # type: (Observer) -> ObserverToken
+    def register_observer(self, observer, keys=None):
+        # type: (Observer, Optional[Iterable[Hashable]]) -> ObserverToken
         """
         Register an observer and get its token.
+        Registering an already registered observer replaces its keys.
 
         :param observer: Observer.
         :type observer: objetto.utils.subject_observer.Observer
 
+        :param keys: Keys to filter payloads by (None to receive all payloads).
+        :type keys: collections.abc.Iterable[collections.abc.Hashable] or None
+
         :return: Observer token.
         :rtype: objetto.utils.subject_observer.ObserverToken
         """
@@ -187,6 +353,18 @@ class Subject(object):
             token = self.__observers[observer]
         except KeyError:
             token = self.__observers[observer] = ObserverToken.__make__(self, observer)
+        else:
+            self.__unindex(observer)
+        if keys is None:
+            self.__unfiltered.add(observer)
+        else:
+            keys = self.__keys[observer] = frozenset(keys)
+            for key in keys:
+                try:
+                    key_observers = self.__index[key]
+                except KeyError:
+                    key_observers = self.__index[key] = WeakSet()
+                key_observers.add(observer)
         return token
 
     def deregister_observer(self, observer):
@@ -197,7 +375,23 @@ class Subject(object):
         :param observer: Observer.
         :type observer: objetto.utils.subject_observer.Observer
         """
-        self.__observers.pop(observer, None)
+        if self.__observers.pop(observer, None) is not None:
+            self.__unindex(observer)
+
+    def __unindex(self, observer):
+        # type: (Observer) -> None
+        """
+        Remove observer from the unfiltered observers and from the keys index.
+
+        :param observer: Observer.
+        """
+        self.__unfiltered.discard(observer)
+        for key in self.__keys.pop(observer, ()):
+            key_observers = self.__index.get(key)
+            if key_observers is not None:
+                key_observers.discard(observer)
+                if not key_observers:
+                    del self.__index[key]
 
     def get_token(self, observer):
         # type: (Observer) -> ObserverToken
@@ -219,6 +413,16 @@ class Subject(object):
         error = "observer is not registered"
         raise ValueError(error)
 
+    @property
+    def has_observers(self):
+        # type: () -> bool
+        """
+        Whether there are registered observers.
+
+        :rtype: bool
+        """
+        return bool(self.__observers)
+
 
 class Observer(object):
     """
@@ -240,6 +444,9 @@ class Observer(object):
         received payload (1, 2, 3)
     """
 
+    _inline_dispatch = False
+    """Whether to receive payloads right away instead of through lanes."""
+
     @abstractmethod
     def __observe__(self, *payload):
         # type: (Any) -> None
@@ -397,3 +604,257 @@ class ObserverExceptionInfo(
     """
 
     __slots__ = ()
+
+
+class _LaneDelivery(object):
+    """Payload being delivered to observers through lanes."""
+
+    __slots__ = ("subject", "payload", "observers", "finished", "failed", "waiting")
+
+    def __init__(self, subject, payload, observers):
+        # type: (Subject, Tuple[Any, ...], AbstractSet[Observer]) -> None
+        self.subject = subject
+        self.payload = payload
+        self.observers = observers
+        self.finished = set()  # type: Set[Observer]
+        self.failed = set()  # type: Set[Observer]
+        self.waiting = {}  # type: Dict[Observer, Observer]
+
+
+class _Lane(object):
+    """Serial lane of an observer."""
+
+    __slots__ = ("deliveries", "owner")
+
+    def __init__(self):
+        # type: () -> None
+        self.deliveries = deque()  # type: Deque[_LaneDelivery]
+        self.owner = None  # type: Optional[int]
+
+
+class ObserverLanes(object):
+    """
+    Dispatches payloads to observers concurrently, using an executor.
+
+    Every observer gets a serial lane, so it receives payloads in the order they were
+    dispatched, while different observers run concurrently. Waiting for tokens is
+    honored across lanes: if the awaited observer's lane is not running, its pending
+    payloads get delivered by the waiting thread instead, so lanes can't starve the
+    executor.
+
+    .. code:: python
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> from objetto.utils.subject_observer import ObserverLanes, Subject, Observer
+
+        >>> class MyObserver(Observer):
+        ...     def __init__(self, name, received, dependency=None):
+        ...         self.name = name
+        ...         self.received = received
+        ...         self.dependency = dependency
+        ...
+        ...     def __observe__(self, *payload):
+        ...         if self.dependency:
+        ...             self.dependency.wait()
+        ...         self.received.append((self.name, payload))
+        ...
+        >>> subject = Subject()
+        >>> received = []
+        >>> observer_a = MyObserver("A", received)
+        >>> token_a = observer_a.start_observing(subject)
+        >>> observer_b = MyObserver("B", received, dependency=token_a)
+        >>> token_b = observer_b.start_observing(subject)
+        >>> with ThreadPoolExecutor(4) as executor:
+        ...     lanes = ObserverLanes(executor)
+        ...     for i in range(3):
+        ...         _ = subject.dispatch(lanes, lambda *_: (), i)
+        ...     lanes.drain()
+        ...
+        ()
+        >>> [p for n, p in received if n == "B"]
+        [(0,), (1,), (2,)]
+        >>> received.index(("A", (2,))) < received.index(("B", (2,)))
+        True
+
+    :param executor: Executor (such as a thread pool executor).
+    :type executor: concurrent.futures.Executor
+    """
+
+    __slots__ = ("__executor", "__condition", "__lanes", "__exception_infos")
+
+    def __init__(self, executor):
+        # type: (Any) -> None
+        self.__executor = executor
+        self.__condition = Condition()
+        self.__lanes = {}  # type: Dict[Observer, _Lane]
+        self.__exception_infos = []  # type: List[ObserverExceptionInfo]
+
+    def dispatch(self, subject, observers, payload):
+        # type: (Subject, Iterable[Observer], Tuple[Any, ...]) -> None
+        """
+        Add payload to the lanes of observers.
+
+        :param subject: Subject.
+        :type subject: objetto.utils.subject_observer.Subject
+
+        :param observers: Observers.
+        :type observers: collections.abc.Iterable[\
+objetto.utils.subject_observer.Observer]
+
+        :param payload: Payload.
+        :type payload: tuple
+        """
+        observers = frozenset(observers)
+        delivery = _LaneDelivery(subject, payload, observers)
+        new_observers = []
+        with self.__condition:
+            for observer in observers:
+                lane = self.__lanes.get(observer)
+                if lane is None:
+                    lane = self.__lanes[observer] = _Lane()
+                    new_observers.append(observer)
+                lane.deliveries.append(delivery)
+        for i, observer in enumerate(new_observers):
+            try:
+                self.__executor.submit(self.__run, observer)
+            except BaseException:
+                with self.__condition:
+                    for observer_ in new_observers[i:]:
+                        del self.__lanes[observer_]
+                    self.__condition.notify_all()
+                raise
+
+    def drain(self, timeout=None):
+        # type: (Optional[float]) -> Tuple[ObserverExceptionInfo, ...]
+        """
+        Wait until all dispatched payloads were delivered.
+
+        :param timeout: Timeout in seconds (None to wait indefinitely).
+        :type timeout: float or None
+
+        :return: Exception infos (for exceptions raised since the last drain).
+        :rtype: tuple[objetto.utils.subject_observer.ObserverExceptionInfo]
+
+        :raises RuntimeError: Can't drain from a lane.
+        :raises RuntimeError: Timed out.
+        """
+        if getattr(_lane_local, "context", None) is not None:
+            error = "can't drain observer lanes from an observer lane"
+            raise RuntimeError(error)
+        end = None if timeout is None else default_timer() + timeout
+        with self.__condition:
+            while self.__lanes:
+                if end is None:
+                    self.__condition.wait()
+                else:
+                    remaining = end - default_timer()
+                    if remaining <= 0:
+                        error = "timed out draining observer lanes"
+                        raise RuntimeError(error)
+                    self.__condition.wait(remaining)
+            exception_infos = tuple(self.__exception_infos)
+            del self.__exception_infos[:]
+        return exception_infos
+
+    def __wait__(self, delivery, waiter, observer):
+        # type: (_LaneDelivery, Observer, Observer) -> None
+        """
+        Wait for an observer to receive a payload being delivered through lanes.
+
+        :param delivery: Delivery.
+        :param waiter: Observer that is waiting.
+        :param observer: Observer to wait for.
+        :raises RuntimeError: Token cycle detected.
+        :raises RuntimeError: Can't wait for failed observer.
+        """
+        if observer is waiter:
+            error = "token wait cycle detected in {}".format(observer)
+            raise RuntimeError(error)
+        condition = self.__condition
+        with condition:
+            if observer not in delivery.observers:
+                return
+        while True:
+            with condition:
+                while True:
+                    if observer in delivery.failed:
+                        error = "can't wait for failed observer {}".format(observer)
+                        raise RuntimeError(error)
+                    if observer in delivery.finished:
+                        return
+                    waited = observer
+                    while waited in delivery.waiting:
+                        waited = delivery.waiting[waited]
+                        if waited is waiter:
+                            error = "token wait cycle detected in {}".format(observer)
+                            raise RuntimeError(error)
+                    delivery.waiting[waiter] = observer
+                    lane = self.__lanes.get(observer)
+                    if lane is not None and lane.owner is None and lane.deliveries:
+                        lane.owner = get_ident()
+                        break
+                    try:
+                        condition.wait()
+                    finally:
+                        del delivery.waiting[waiter]
+
+            # Deliver the awaited observer's pending payloads in this thread.
+            try:
+                self.__deliver(observer, lane)
+            finally:
+                with condition:
+                    del delivery.waiting[waiter]
+
+    def __run(self, observer):
+        # type: (Observer) -> None
+        """
+        Run an observer's lane until it's empty.
+
+        :param observer: Observer.
+        """
+        condition = self.__condition
+        while True:
+            with condition:
+                lane = self.__lanes[observer]
+                while lane.owner is not None:
+                    condition.wait()
+                if not lane.deliveries:
+                    del self.__lanes[observer]
+                    condition.notify_all()
+                    return
+                lane.owner = get_ident()
+            self.__deliver(observer, lane)
+
+    def __deliver(self, observer, lane):
+        # type: (Observer, _Lane) -> None
+        """
+        Deliver the next payload in a lane owned by the current thread.
+
+        :param observer: Observer.
+        :param lane: Lane.
+        """
+        delivery = lane.deliveries[0]
+        exception_info = None  # type: Optional[ObserverExceptionInfo]
+        previous_context = getattr(_lane_local, "context", None)
+        _lane_local.context = (self, delivery, observer)
+        try:
+            observer.__observe__(*delivery.payload)
+        except Exception:
+            exception_type, exception, traceback = exc_info()
+            exception_info = ObserverExceptionInfo(
+                observer=observer,
+                payload=delivery.payload,
+                exception_type=exception_type,
+                exception=exception,
+                traceback=traceback,
+            )
+        finally:
+            _lane_local.context = previous_context
+            with self.__condition:
+                if exception_info is not None:
+                    self.__exception_infos.append(exception_info)
+                    delivery.failed.add(observer)
+                delivery.finished.add(observer)
+                lane.deliveries.popleft()
+                lane.owner = None
+                self.__condition.notify_all()
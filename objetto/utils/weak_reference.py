@@ -15,6 +15,12 @@ __all__ = ["WeakReference"]
 T = TypeVar("T")  # Any type.
 
 
+class _Dead(object):
+    """Referent of weak references created without an object (dies right away)."""
+
+    __slots__ = ("__weakref__",)
+
+
 class WeakReference(Generic[T], object):
     """
     Weak reference object that supports pickling.
@@ -46,9 +52,7 @@ class WeakReference(Generic[T], object):
     def __init__(self, obj=None):
         # type: (T) -> None
         if obj is None:
-            self.__ref = _ref(
-                type("Dead", (object,), {"__slots__": ("__weakref__",)})()
-            )
+            self.__ref = _ref(_Dead())
         else:
             self.__ref = _ref(obj)
 
@@ -16,6 +16,7 @@ setuptools.setup(
     package_data={"objetto": ["py.typed", "*.pyi"]},
     install_requires=[
         "enum34; python_version < '3.4'",
+        "futures; python_version < '3.2'",
         "pyrsistent",
         "six",
         "slotted<2",
@@ -0,0 +1,1263 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+import threading
+from threading import Event, Thread
+from weakref import ref
+
+import pytest
+
+from objetto import (
+    POST,
+    PRE,
+    Application,
+    Object,
+    attribute,
+    history_descriptor,
+    list_attribute,
+    root,
+)
+from objetto._applications import (
+    ActionObserversFailedError,
+    ApplicationLock,
+    Store,
+)
+from objetto.changes import BulkLoad, ListDelete, ListInsert, Update
+from objetto.constants import DELETED
+from objetto.objects import Action, ActionRecord
+from objetto.observers import (
+    ActionDigestObserver,
+    ActionObserver,
+    ActionObserverTimer,
+    DebouncedActionObserver,
+    ThrottledActionObserver,
+)
+from objetto.reactions import UniqueAttributes, reaction
+
+
+def test_lock_free_read():
+    class Person(Object):
+        name = attribute(str, default="Albert")
+
+    app = Application()
+    person = Person(app)
+
+    entered = Event()
+    release = Event()
+
+    def write():
+        with app.write_context():
+            person.name = "Einstein"
+            assert person.name == "Einstein"
+            entered.set()
+            release.wait(5)
+
+    writer = Thread(target=write)
+    writer.start()
+    try:
+        assert entered.wait(5)
+
+        # Reading from another thread does not wait for the writer.
+        assert not app.is_writing
+        assert person.name == "Albert"
+        with app.read_context():
+            assert app.is_reading
+            assert person.name == "Albert"
+    finally:
+        release.set()
+        writer.join(5)
+
+    assert person.name == "Einstein"
+
+
+def test_read_context_pins_storage():
+    class Person(Object):
+        name = attribute(str, default="Albert")
+
+    app = Application()
+    person = Person(app)
+
+    with app.read_context():
+        thread = Thread(target=lambda: setattr(person, "name", "Einstein"))
+        thread.start()
+        thread.join(5)
+        assert person.name == "Albert"
+        with pytest.raises(RuntimeError):
+            with app.write_context():
+                pass
+    assert person.name == "Einstein"
+
+
+def test_snapshot_per_thread():
+    class Person(Object):
+        name = attribute(str, default="Albert")
+
+    app = Application()
+    person = Person(app)
+    snapshots = {}
+    for name in ("A", "B", "C"):
+        person.name = name
+        snapshots[name] = app.take_snapshot()
+
+    # Threads read different snapshots at once while a writer holds the lock.
+    results = {}
+
+    def read(name_):
+        with app.read_context(snapshots[name_]):
+            with app.read_context(snapshots["A"]):
+                inner = person.name
+            results[name_] = (person.name, inner)
+
+    with app.write_context():
+        person.name = "Einstein"
+        threads = [Thread(target=read, args=(n,)) for n in snapshots]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+            assert not thread.is_alive()
+        with app.read_context(snapshots["B"]):
+            assert person.name == "B"
+        assert person.name == "Einstein"
+
+    assert results == {"A": ("A", "A"), "B": ("B", "A"), "C": ("C", "A")}
+    assert person.name == "Einstein"
+
+
+def test_snapshot_diff():
+    class Leaf(Object):
+        value = attribute(int, default=0)
+
+    class Branch(Object):
+        children = list_attribute(Leaf)
+
+    app = Application()
+    branch = Branch(app)
+    leaf_a = Leaf(app)
+    leaf_b = Leaf(app)
+    branch.children.extend((leaf_a, leaf_b))
+    snapshot_a = app.take_snapshot()
+
+    branch.children.remove(leaf_b)
+    leaf_a.value = 1
+    leaf_c = Leaf(app)
+    snapshot_b = app.take_snapshot()
+
+    diff = snapshot_a.diff(snapshot_b)
+    assert diff.added == frozenset((leaf_c,))
+    assert not diff.removed
+    assert diff.modified == {
+        leaf_a: {"value": (0, 1)},
+        branch.children: {1: (leaf_b, DELETED)},
+    }
+    assert snapshot_b.diff(snapshot_a).modified[leaf_a] == {"value": (1, 0)}
+    assert snapshot_b.diff(app.take_snapshot()) == (frozenset(), frozenset(), {})
+
+    # Objects created in a fork are only in the fork's snapshots.
+    with app.fork_context(app.fork()):
+        leaf_d = Leaf(app)
+        snapshot_c = app.take_snapshot()
+    diff = snapshot_c.diff(snapshot_b)
+    assert diff.removed == frozenset((leaf_d,))
+    assert not diff.added and not diff.modified
+
+    with pytest.raises(ValueError):
+        snapshot_a.diff(Application().take_snapshot())
+
+
+def test_journal_rollback():
+    class Person(Object):
+        name = attribute(str, default="Albert")
+
+    class PersonObserver(ActionObserver):
+        def __observe__(self, action, phase):
+            observed.append((phase, action.change.new_values["name"], person.name))
+
+    app = Application()
+    person = Person(app)
+    observed = []
+    observer = PersonObserver()
+    observer.start_observing(person)
+
+    with pytest.raises(ValueError):
+        with app.write_context():
+            person.name = "Einstein"
+            raise ValueError()
+    assert person.name == "Albert"
+    assert not observed
+
+    with app.write_context():
+        person.name = "Einstein"
+        try:
+            with app.write_context():
+                person.name = "Bohr"
+                raise ValueError()
+        except ValueError:
+            pass
+        assert person.name == "Einstein"
+        person.name = "Curie"
+    assert person.name == "Curie"
+
+    assert observed == [
+        (PRE, "Einstein", "Albert"),
+        (POST, "Einstein", "Einstein"),
+        (PRE, "Curie", "Einstein"),
+        (POST, "Curie", "Curie"),
+    ]
+
+
+def test_deferred_data_propagation():
+    class Leaf(Object):
+        value = attribute(int, default=0)
+
+    class Branch(Object):
+        leaves = list_attribute(Leaf)
+
+    class Tree(Object):
+        branch = attribute(Branch)
+
+    class TreeObserver(ActionObserver):
+        def __observe__(self, action, phase):
+            observed.append((phase, [leaf.value for leaf in tree.data.branch.leaves]))
+
+    app = Application()
+    tree = Tree(app, branch=Branch(app))
+    tree.branch.leaves.extend(Leaf(app) for _ in range(3))
+    leaves = list(tree.branch.leaves)
+
+    with app.write_context():
+        for i, leaf in enumerate(leaves):
+            leaf.value = i + 1
+        assert [leaf.value for leaf in tree.data.branch.leaves] == [1, 2, 3]
+        leaves[0].value = 10
+        try:
+            with app.write_context():
+                leaves[1].value = 20
+                raise ValueError()
+        except ValueError:
+            pass
+        leaves[2].value = 30
+    assert [leaf.value for leaf in tree.data.branch.leaves] == [10, 2, 30]
+    assert tree.branch.data.leaves[2].value == 30
+
+    with app.write_context():
+        leaves[0].value = 100
+        tree.branch.leaves.insert(0, Leaf(app, value=-1))
+        leaves[2].value = 300
+    assert [leaf.value for leaf in tree.data.branch.leaves] == [-1, 100, 2, 300]
+
+    observed = []
+    observer = TreeObserver()
+    observer.start_observing(tree)
+    with app.write_context():
+        leaves[0].value = 1
+        leaves[1].value = 20
+    assert observed == [
+        (PRE, [-1, 100, 2, 300]),
+        (POST, [-1, 1, 2, 300]),
+        (PRE, [-1, 1, 2, 300]),
+        (POST, [-1, 1, 20, 300]),
+    ]
+
+
+def test_interested_ancestors():
+    class Leaf(Object):
+        value = attribute(int, default=0)
+
+    class Branch(Object):
+        children = list_attribute(Leaf)
+
+    class ReactiveBranch(Branch):
+        @reaction
+        def __react(self, action, phase):
+            reacted.append((phase, action.receiver, list(action.locations)))
+
+    class Root(Object):
+        children = list_attribute(Branch)
+
+    class ReactiveRoot(Object):
+        children = list_attribute(ReactiveBranch)
+
+    class Observer(ActionObserver):
+        def __observe__(self, action, phase):
+            observed.append((phase, action.change.new_values["value"]))
+
+    class DigestObserver(ActionDigestObserver):
+        def __observe__(self, digest):
+            digests.append(digest)
+
+    reacted = []
+    observed = []
+    digests = []
+
+    app = Application()
+    app.enable_stats()
+    root = Root(app)
+    branch = Branch(app)
+    leaf = Leaf(app)
+    branch.children.append(leaf)
+    root.children.append(branch)
+
+    # Ancestors without reactions or observers get no actions.
+    app.reset_stats()
+    leaf.value = 1
+    assert app.stats().actions == 0
+    assert root.data.children[0].children[0].value == 1
+
+    # Ancestors with reactions only.
+    reactive_root = ReactiveRoot(app)
+    reactive_branch = ReactiveBranch(app)
+    reactive_leaf = Leaf(app)
+    reactive_branch.children.append(reactive_leaf)
+    reactive_root.children.append(reactive_branch)
+    del reacted[:]
+    app.reset_stats()
+    reactive_leaf.value = 1
+    assert app.stats().actions == 1
+    assert reacted == [
+        (PRE, reactive_branch, ["children", 0]),
+        (POST, reactive_branch, ["children", 0]),
+    ]
+
+    # Ancestors with digest observers only.
+    digest_observer = DigestObserver()
+    digest_observer.start_observing(root)
+    app.reset_stats()
+    leaf.value = 2
+    assert app.stats().actions == 1
+    (digest,) = digests
+    assert digest.receiver is root
+    assert [d.sender for d in digest.objects] == [leaf]
+    assert digest.objects[0].locations == ("children", 0, "children", 0)
+
+    # Observers registered in the middle of a transaction miss earlier actions.
+    observer = Observer()
+    with app.write_context():
+        leaf.value = 3
+        observer.start_observing(branch)
+        leaf.value = 4
+    assert observed == [(PRE, 4), (POST, 4)]
+
+
+def test_hierarchy_cache():
+    class Leaf(Object):
+        value = attribute(int, default=0)
+
+    class Branch(Object):
+        children = list_attribute(Leaf)
+
+    class Root(Object):
+        children = list_attribute(Branch)
+
+    app = Application()
+    root_a = Root(app)
+    root_b = Root(app)
+    branch = Branch(app)
+    leaf = Leaf(app)
+    branch.children.append(leaf)
+    root_a.children.append(branch)
+
+    leaf.value = 1
+    assert root_a.data.children[0].children[0].value == 1
+
+    # Adopting children elsewhere doesn't invalidate unrelated cached hierarchies.
+    cached = leaf.__.hierarchy
+    assert cached is not None
+    other_branch = Branch(app)
+    Root(app).children.append(other_branch)
+    other_branch.children.append(Leaf(app))
+    leaf.value = 1
+    assert leaf.__.hierarchy is cached
+
+    root_a.children.remove(branch)
+    root_b.children.append(branch)
+    leaf.value = 2
+    assert root_b.data.children[0].children[0].value == 2
+    assert not root_a.data.children
+
+    with pytest.raises(ValueError):
+        with app.write_context():
+            root_b.children.remove(branch)
+            root_a.children.append(branch)
+            raise ValueError()
+    leaf.value = 3
+    assert branch._parent._parent is root_b
+    assert root_b.data.children[0].children[0].value == 3
+
+    with pytest.raises(ValueError):
+        root_a.children.append(branch)
+
+
+def test_object_slots():
+    class Leaf(Object):
+        value = attribute(int, default=0)
+
+    class Branch(Object):
+        children = list_attribute(Leaf)
+
+    app = Application()
+    branch = Branch(app)
+    branch.children.extend(Leaf(app, value=i) for i in range(3))
+    slot = branch.children[0].__.slot
+    weak_branch = ref(branch)
+    weak_leaf = ref(branch.children[0])
+    assert branch.data.children[0].value == 0
+
+    # Dropping the branch releases its children and recycles their slots.
+    gc.disable()
+    try:
+        del branch
+        leaf = Leaf(app, value=3)
+        assert weak_branch() is None
+        assert weak_leaf() is None
+        assert Leaf(app).__.slot in (slot, slot + 1, slot + 2)
+    finally:
+        gc.enable()
+    assert leaf.value == 3
+
+    with pytest.raises(RuntimeError):
+        app.__.init_object(leaf)
+
+
+def test_store():
+    class Item(Object):
+        value = attribute(int, default=0)
+
+    app = Application()
+    item = Item(app)
+    store = app.__.read(item)
+    assert isinstance(store, Store)
+    assert store.parent_ref() is None
+    assert not store.children
+
+    new_store = store.set("parent_ref", item.__.obj_ref)
+    assert new_store.parent_ref() is item
+    assert new_store.state is store.state
+    assert store.parent_ref() is None
+
+    new_store = store.update({"data": None, "history": None})
+    assert new_store.data is None
+    assert new_store.metadata is store.metadata
+
+
+def test_bulk_load_context():
+    class Item(Object):
+        name = attribute(str, default="item")
+
+    class Inventory(Object):
+        items = list_attribute(
+            Item, reactions=UniqueAttributes(name=lambda v, _: "{}_".format(v))
+        )
+        history = history_descriptor()
+
+    class InventoryObserver(ActionObserver):
+        def __observe__(self, action, phase):
+            observed.append((type(action.change), phase))
+
+    app = Application()
+    inventory = Inventory(app)
+    observed = []
+    observer = InventoryObserver()
+    observer.start_observing(inventory)
+
+    with app.bulk_load_context():
+        inventory.items.extend(Item(app, name=n) for n in ("a", "b", "a"))
+        assert not observed
+
+    assert sorted(item.name for item in inventory.items) == ["a", "a_", "b"]
+    renamed = inventory.items.find_with_attributes(name="a_")
+    assert renamed._parent is inventory.items
+    assert inventory.data.items[inventory.items.index(renamed)].name == "a_"
+    assert inventory.history.index == 0
+
+    assert observed[0] == (BulkLoad, PRE)
+    assert observed[-1] == (BulkLoad, POST)
+
+    with pytest.raises(ValueError):
+        with app.bulk_load_context():
+            inventory.items.append(Item(app, name="c"))
+            raise ValueError()
+    assert len(inventory.items) == 3
+
+
+def test_application_lock():
+    lock = ApplicationLock()
+
+    # Many simultaneous readers.
+    reading = [Event(), Event()]
+    release = Event()
+
+    def read(index):
+        with lock.read_context():
+            reading[index].set()
+            release.wait(5)
+
+    readers = [Thread(target=read, args=(i,)) for i in range(2)]
+    for reader in readers:
+        reader.start()
+    try:
+        assert all(event.wait(5) for event in reading)
+    finally:
+        release.set()
+        for reader in readers:
+            reader.join()
+
+    # Single writer excludes readers.
+    written = Event()
+    release.clear()
+
+    def write():
+        with lock:
+            written.set()
+            release.wait(5)
+
+    writer = Thread(target=write)
+    writer.start()
+    try:
+        assert written.wait(5)
+        reading[0].clear()
+        reader = Thread(target=read, args=(0,))
+        reader.start()
+        assert not reading[0].wait(0.1)
+    finally:
+        release.set()
+        writer.join()
+        reader.join()
+    assert reading[0].is_set()
+
+    # Re-entrant, sole reader can upgrade to writer.
+    with lock.read_context():
+        with lock.read_context():
+            with lock:
+                with lock:
+                    with lock.read_context():
+                        pass
+
+    # Only one of two readers can upgrade at the same time.
+    held = [Event(), Event()]
+    errors = []
+
+    def upgrade(index):
+        with lock.read_context():
+            held[index].set()
+            held[1 - index].wait(5)
+            try:
+                with lock:
+                    pass
+            except RuntimeError:
+                errors.append(index)
+
+    upgraders = [Thread(target=upgrade, args=(i,)) for i in range(2)]
+    for upgrader in upgraders:
+        upgrader.start()
+    for upgrader in upgraders:
+        upgrader.join()
+    assert len(errors) == 1
+
+    with pytest.raises(RuntimeError):
+        lock.release_read()
+    with pytest.raises(RuntimeError):
+        lock.release_write()
+
+    assert isinstance(deepcopy(lock), ApplicationLock)
+    assert deepcopy(lock) is not lock
+    assert isinstance(pickle.loads(pickle.dumps(lock)), ApplicationLock)
+
+
+def test_sharded_write_context():
+    class Document(Object):
+        title = attribute(str, default="")
+
+    class App(Application):
+        document_a = root(Document, title="a")
+        document_b = root(Document, title="b")
+
+    app = App(sharded=True)
+    assert app.is_sharded
+    assert not Application().is_sharded
+
+    # Writers to disjoint subtrees proceed in parallel.
+    writing = Event()
+    written = Event()
+
+    def write():
+        with app.write_context(app.document_b):
+            writing.set()
+            app.document_b.title = "B"
+            assert written.wait(5)
+
+    writer = Thread(target=write)
+    writer.start()
+    try:
+        assert writing.wait(5)
+        app.document_a.title = "A"
+        written.set()
+    finally:
+        writer.join()
+    assert app.document_a.title == "A"
+    assert app.document_b.title == "B"
+
+    # Writing outside of the locked subtrees is not allowed.
+    with pytest.raises(RuntimeError):
+        with app.write_context(app.document_a):
+            app.document_a.title = "AA"
+            app.document_b.title = "BB"
+    assert app.document_a.title == "A"
+    assert app.document_b.title == "B"
+
+    with pytest.raises(RuntimeError):
+        with app.write_context(app.document_a):
+            with app.write_context(app.document_b):
+                pass
+
+    # Objects created in the transaction can be written to.
+    with app.write_context(app.document_a):
+        document = Document(app, title="C")
+        document.title = "D"
+    assert document.title == "D"
+
+    # Published objects that are not under a root require the exclusive lock.
+    with pytest.raises(RuntimeError):
+        with app.write_context(app.document_a):
+            document.title = "E"
+    with pytest.raises(RuntimeError):
+        with app.write_context(app.document_a):
+            with app.write_context(document):
+                pass
+    with app.write_context(app.document_a, document):
+        document.title = "E"
+    assert document.title == "E"
+
+    class Counter(Object):
+        value = attribute(int, default=0)
+
+    counter = Counter(app)
+
+    def increment():
+        for _ in range(150):
+            with app.write_context(counter):
+                counter.value += 1
+
+    threads = [Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 600
+
+    app_copy = deepcopy(app)
+    assert app_copy.is_sharded
+    with app_copy.write_context(app_copy.document_a, app_copy.document_b):
+        app_copy.document_a.title = "AA"
+        app_copy.document_b.title = "BB"
+    assert app_copy.document_a.title == "AA"
+
+
+def test_sharded_history():
+    class Document(Object):
+        title = attribute(str, default="")
+        history = history_descriptor()
+
+    class App(Application):
+        document_a = root(Document, title="a")
+        document_b = root(Document, title="b")
+
+    app = App(sharded=True)
+
+    # Histories are guarded by the subtree locks of their providers.
+    app.document_a.title = "A"
+    with app.write_context(app.document_b):
+        app.document_b.title = "B"
+        app.document_b.title = "BB"
+    assert app.document_b.history.index == 2
+    app.document_a.history.undo()
+    assert app.document_a.title == "a"
+    app.document_b.history.undo()
+    assert app.document_b.title == "B"
+    app.document_b.history.redo()
+    assert app.document_b.title == "BB"
+
+    # Writing to a history of another subtree is not allowed.
+    with pytest.raises(RuntimeError):
+        with app.write_context(app.document_a):
+            app.document_b.history.undo()
+    assert app.document_b.title == "BB"
+
+
+def test_submit(monkeypatch):
+    class Person(Object):
+        name = attribute(str, default="Albert")
+
+    app = Application()
+    person_a = Person(app)
+    person_b = Person(app)
+
+    def fail():
+        person_b.name = "Failed"
+        raise ValueError()
+
+    # Callables queued while the writer waits for the lock are grouped together.
+    with app.write_context():
+        future_a = app.submit(setattr, person_a, "name", "A")
+        future_fail = app.submit(fail)
+        future_b = app.submit(setattr, person_b, "name", "B")
+        future_result = app.submit(lambda: person_a.name)
+        assert not future_a.done()
+
+    assert future_a.result(5) is None
+    assert person_b.name == "B"
+    assert future_result.result(5) == "A"
+    with pytest.raises(ValueError):
+        future_fail.result(5)
+    assert person_a.name == "A"
+    assert person_b.name == "B"
+
+    # Observer failures after merging don't fail the futures, they get raised in
+    # the writer thread instead.
+    class FailingObserver(ActionObserver):
+        def __observe__(self, action, phase):
+            if phase is POST:
+                raise RuntimeError()
+
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", lambda args: errors.append(args))
+    observer = FailingObserver()
+    observer.start_observing(person_a)
+    with app.write_context():
+        future_a = app.submit(setattr, person_a, "name", "AA")
+        future_fail = app.submit(fail)
+        future_b = app.submit(setattr, person_b, "name", "BB")
+    assert future_a.result(5) is None
+    assert future_b.result(5) is None
+    with pytest.raises(ValueError):
+        future_fail.result(5)
+    assert person_a.name == "AA"
+    assert person_b.name == "BB"
+
+    # The writer keeps going.
+    observer.stop_observing(person_a)
+    assert app.submit(setattr, person_a, "name", "A").result(5) is None
+    assert person_a.name == "A"
+    assert len(errors) == 1
+    assert errors[0].exc_type is ActionObserversFailedError
+
+    # Other base exceptions roll back and fail the whole group, and get raised in
+    # the writer thread.
+    class Interrupt(BaseException):
+        pass
+
+    def interrupt():
+        raise Interrupt()
+
+    with app.write_context():
+        future_a = app.submit(setattr, person_a, "name", "AAA")
+        future_interrupt = app.submit(interrupt)
+        future_b = app.submit(setattr, person_b, "name", "BBB")
+    for future in (future_a, future_interrupt, future_b):
+        with pytest.raises(Interrupt):
+            future.result(5)
+    assert person_a.name == "A"
+    assert person_b.name == "BB"
+    assert app.submit(lambda: person_a.name).result(5) == "A"
+    assert len(errors) == 2
+    assert errors[1].exc_type is Interrupt
+
+
+def test_fork():
+    class Leaf(Object):
+        value = attribute(int, default=0)
+
+    class Branch(Object):
+        children = list_attribute(Leaf)
+
+    app = Application()
+    branch_a = Branch(app)
+    branch_b = Branch(app)
+    leaf = Leaf(app)
+    branch_a.children.append(leaf)
+
+    received = []
+
+    class Observer(ActionObserver):
+        def __observe__(self, action, phase):
+            received.append(action)
+
+    observer = Observer()
+    observer.start_observing(branch_a)
+
+    # Changes made in a fork are not seen by the application or its observers.
+    fork = app.fork()
+    assert fork.app is app
+    with app.fork_context(fork):
+        assert app.is_forked
+        leaf.value = 1
+        branch_a.children.remove(leaf)
+        branch_b.children.append(leaf)
+        new_leaf = Leaf(app, value=2)
+        branch_a.children.append(new_leaf)
+        assert leaf._parent._parent is branch_b
+        assert branch_b.data.children[0].value == 1
+        assert branch_a.data.children[0].value == 2
+    assert not app.is_forked
+    assert not received
+    assert leaf.value == 0
+    assert leaf._parent._parent is branch_a
+    assert branch_a.data.children[0].value == 0
+    with pytest.raises(RuntimeError):
+        _ = new_leaf.value
+
+    # Application changes are not seen by existing forks.
+    leaf.value = 3
+    assert received
+    with app.fork_context(fork):
+        assert leaf.value == 1
+        assert leaf._parent._parent is branch_b
+        snapshot = app.take_snapshot()
+        leaf.value = 4
+        with app.read_context(snapshot):
+            assert leaf.value == 1
+
+    # Forks can be used in parallel.
+    results = {}
+
+    def evaluate(value):
+        with app.fork_context(app.fork()):
+            with app.write_context():
+                leaf.value = value
+                Event().wait(0.01)
+                results[value] = branch_a.data.children[0].value
+
+    threads = [Thread(target=evaluate, args=(v,)) for v in range(10, 15)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == dict((v, v) for v in range(10, 15))
+    assert leaf.value == 3
+
+    with pytest.raises(RuntimeError):
+        with app.write_context():
+            with app.fork_context(fork):
+                pass
+    with pytest.raises(ValueError):
+        app.fork_context(Application().fork()).__enter__()
+
+
+def test_action_record():
+    class Item(Object):
+        name = attribute(str, default="item")
+
+    class Container(Object):
+        items = list_attribute(Item)
+
+    class ContainerObserver(ActionObserver):
+        def __observe__(self, action, phase):
+            if phase is POST:
+                observed.append(action)
+
+    app = Application()
+    container = Container(app)
+    item = Item(app)
+    container.items.append(item)
+
+    observed = []
+    observer = ContainerObserver()
+    observer.start_observing(container)
+    item.name = "foo"
+
+    (record,) = observed
+    assert isinstance(record, ActionRecord)
+    assert record.sender is item
+    assert record.receiver is container
+    assert record.locations == ("items", 0)
+    assert isinstance(record.change, Update)
+
+    action = record.to_action()
+    assert isinstance(action, Action)
+    assert list(action.locations) == ["items", 0]
+    assert record == action
+    assert hash(record) == hash(action)
+    assert not record._update(locations=()).locations
+
+
+def test_stats():
+    class Observer(ActionObserver):
+        def __observe__(self, action, phase):
+            pass
+
+    class Person(Object):
+        name = attribute(str, default="")
+        hobbies = list_attribute(str)
+
+        @reaction
+        def __react(self, action, phase):
+            pass
+
+    app = Application()
+    assert not app.stats_enabled
+    person = Person(app)
+    assert app.stats().commits == 0
+    assert app.stats().objects == 2
+
+    app.enable_stats()
+    assert app.stats_enabled
+    observer = Observer()
+    observer.start_observing(person)
+    person.name = "Albert"
+    person.hobbies.append("physics")
+    with pytest.raises(ValueError):
+        with app.write_context():
+            person.name = "Einstein"
+            raise ValueError()
+
+    stats = app.stats()
+    assert stats.write_contexts >= 4
+    assert stats.commits == 2
+    assert stats.changes == 3
+    assert stats.actions >= 3
+    assert stats.reactions >= 2
+    assert stats.observer_sends == 4
+    assert stats.rollbacks == 1
+    assert stats.write_time > 0
+    assert stats.push_time >= stats.observer_time > 0
+    assert stats.reaction_time > 0
+    assert stats.objects == 2
+    assert stats.stores >= 2
+
+    app.reset_stats()
+    assert app.stats().commits == 0
+    person.name = "Einstein"
+    assert app.stats().commits == 1
+
+    app.disable_stats()
+    person.name = "Albert"
+    assert app.stats().commits == 0
+    assert app.stats().objects == 2
+
+
+def test_observer_filters():
+    class Item(Object):
+        name = attribute(str, default="item")
+
+    class Container(Object):
+        name = attribute(str, default="container")
+        items = list_attribute(Item)
+
+    class ContainerObserver(ActionObserver):
+        def __init__(self):
+            self.observed = []
+
+        def __observe__(self, action, phase):
+            self.observed.append((action.sender, type(action.change), phase))
+
+    app = Application()
+    container = Container(app)
+    item = Item(app)
+    container.items.append(item)
+
+    everything = ContainerObserver()
+    everything.start_observing(container)
+    names = ContainerObserver()
+    names.start_observing(container, attributes=("name",), phases=(POST,))
+    items = ContainerObserver()
+    items.start_observing(container, attributes=("items",), max_depth=1)
+    inserts = ContainerObserver()
+    inserts.start_observing(container, change_types=(ListInsert,))
+
+    container.name = "foo"
+    item.name = "bar"
+    container.items.append(Item(app))
+
+    assert len(everything.observed) == 6
+    assert names.observed == [(container, Update, POST)]
+    assert items.observed == [
+        (container.items, ListInsert, PRE),
+        (container.items, ListInsert, POST),
+    ]
+    assert inserts.observed == items.observed
+
+    # Observing again replaces the filters.
+    names.start_observing(container, max_depth=0)
+    item.name = "baz"
+    container.name = "bar"
+    assert names.observed[1:] == [(container, Update, PRE), (container, Update, POST)]
+
+    with pytest.raises(TypeError):
+        names.start_observing(container, change_types=(int,))
+    with pytest.raises(TypeError):
+        names.start_observing(container, phases=("POST",))
+    with pytest.raises(ValueError):
+        names.start_observing(container, max_depth=-1)
+
+
+def test_digest_observer():
+    class Item(Object):
+        name = attribute(str, default="item")
+
+    class Container(Object):
+        name = attribute(str, default="container")
+        items = list_attribute(Item)
+
+    class ContainerObserver(ActionDigestObserver):
+        def __observe__(self, digest):
+            digests.append(digest)
+
+    app = Application()
+    container = Container(app)
+    digests = []
+    observer = ContainerObserver()
+    observer.start_observing(container)
+
+    with app.write_context():
+        container.name = "a"
+        container.name = "b"
+        for _ in range(10):
+            container.items.append(Item(app))
+        container.items[0].name = "first"
+        removed = container.items[-1]
+        del container.items[-2:]
+        container.items.append(Item(app))
+        assert not digests
+
+    (digest,) = digests
+    assert digest.receiver is container
+    assert digest.changes == 15
+    objects = dict((d.sender, d) for d in digest.objects)
+    assert len(objects) == 3
+
+    container_digest = objects[container]
+    assert container_digest.locations == ()
+    assert container_digest.old_values == {"name": "container"}
+    assert container_digest.new_values == {"name": "b"}
+
+    items_digest = objects[container.items]
+    assert items_digest.locations == ("items",)
+    assert [r[:3] for r in items_digest.list_ranges] == [
+        (ListInsert, 0, 10),
+        (ListDelete, 8, 10),
+        (ListInsert, 8, 9),
+    ]
+    assert len(items_digest.added_children) == 9
+    assert removed not in items_digest.added_children
+    assert not items_digest.removed_children
+
+    item_digest = objects[container.items[0]]
+    assert item_digest.locations == ("items", 0)
+    assert item_digest.new_values == {"name": "first"}
+
+    # One digest per outermost commit, none once stopped.
+    container.name = "c"
+    assert len(digests) == 2
+    assert digests[-1].objects[0].changes == 1
+    observer.stop_observing(container)
+    container.name = "d"
+    assert len(digests) == 2
+
+    class FailingObserver(ActionDigestObserver):
+        def __observe__(self, digest):
+            raise ValueError()
+
+    failing_observer = FailingObserver()
+    failing_observer.start_observing(container)
+    with pytest.raises(ActionObserversFailedError) as exc_info:
+        container.name = "e"
+    (exception_info,) = exc_info.value.exception_infos
+    assert exception_info.observer is failing_observer
+    assert exception_info.digest.receiver is container
+    assert exception_info.action is None
+    assert container.name == "e"
+
+
+def test_observer_executor():
+    class Person(Object):
+        name = attribute(str, default="")
+
+    class PersonObserver(ActionObserver):
+        def __init__(self, dependency=None):
+            self.dependency = dependency
+            self.names = []
+
+        def __observe__(self, action, phase):
+            if self.dependency is not None:
+                self.dependency.wait()
+            if action.change.new_values["name"] == "fail":
+                raise ValueError()
+            self.names.append(action.change.new_values["name"])
+            observed.append((self, action.change.new_values["name"]))
+
+    app = Application()
+    person = Person(app)
+    observed = []
+    observer_a = PersonObserver()
+    token_a = observer_a.start_observing(person, phases=(POST,))
+    observer_b = PersonObserver(dependency=token_a)
+    observer_b.start_observing(person, phases=(POST,))
+
+    with ThreadPoolExecutor(4) as executor:
+        app.set_observer_executor(executor)
+        names = [str(i) for i in range(20)]
+        for name in names:
+            person.name = name
+        app.drain_observers(5)
+        assert observer_a.names == observer_b.names == names
+        for name in names:
+            a_index = observed.index((observer_a, name))
+            assert a_index < observed.index((observer_b, name))
+
+        person.name = "fail"
+        with pytest.raises(ActionObserversFailedError) as exc_info:
+            app.drain_observers(5)
+        assert len(exc_info.value.exception_infos) == 2
+        app.drain_observers(5)
+
+        app.set_observer_executor(None)
+
+    person.name = "sync"
+    assert observer_a.names[-1] == observer_b.names[-1] == "sync"
+
+
+class _FakeTimer(ActionObserverTimer):
+    def __init__(self):
+        self.time = 0.0
+        self.scheduled = []
+
+    def call_later(self, delay, callback):
+        handle = [self.time + delay, callback, False]
+        self.scheduled.append(handle)
+        return _FakeTimerHandle(handle)
+
+    def advance(self, delta):
+        end = self.time + delta
+        while self.scheduled:
+            handle = min(self.scheduled, key=lambda h: h[0])
+            if handle[0] > end:
+                break
+            self.scheduled.remove(handle)
+            self.time, callback, cancelled = handle
+            if not cancelled:
+                callback()
+        self.time = end
+
+
+class _FakeTimerHandle(object):
+    def __init__(self, handle):
+        self.handle = handle
+
+    def cancel(self):
+        self.handle[2] = True
+
+
+def test_rate_limited_observers():
+    class Slider(Object):
+        value = attribute(int, default=0)
+        label = attribute(str, default="")
+        ticks = list_attribute(int)
+
+    class SliderObserver(ActionObserver):
+        def __init__(self):
+            self.observed = []
+
+        def __observe__(self, action, phase):
+            assert type(action) is ActionRecord
+            change = action.change
+            if type(change) is Update:
+                self.observed.append((dict(change.old_values), dict(change.new_values)))
+            else:
+                self.observed.append((type(change), phase))
+
+    app = Application()
+    slider = Slider(app)
+    timer = _FakeTimer()
+
+    # Debounced: delivered once no updates arrive for a whole window.
+    debounced = SliderObserver()
+    debounced_observer = DebouncedActionObserver(debounced, 1, timer=timer)
+    debounced_observer.start_observing(slider)
+    for i in range(1, 4):
+        slider.value = i
+        timer.advance(0.5)
+    assert not debounced.observed
+    slider.update(value=4, label="a")
+    timer.advance(0.9)
+    assert not debounced.observed
+    timer.advance(0.1)
+    assert debounced.observed == [
+        ({"value": 0, "label": ""}, {"value": 4, "label": "a"}),
+    ]
+
+    # Other actions are relayed right away, in both phases.
+    del debounced.observed[:]
+    slider.ticks.append(1)
+    assert debounced.observed == [(ListInsert, PRE), (ListInsert, POST)]
+    debounced_observer.stop_observing(slider)
+
+    # Throttled: first update right away, then at most one per window.
+    throttled = SliderObserver()
+    throttled_observer = ThrottledActionObserver(throttled, 1, timer=timer)
+    throttled_observer.start_observing(slider)
+    for i in range(5, 9):
+        slider.value = i
+        timer.advance(0.3)
+    assert throttled.observed == [
+        ({"value": 4}, {"value": 5}),
+        ({"value": 5}, {"value": 8}),
+    ]
+    slider.value = 9
+    timer.advance(2)
+    assert throttled.observed[-1] == ({"value": 8}, {"value": 9})
+    assert len(throttled.observed) == 3
+    assert not timer.scheduled
+    throttled_observer.stop_observing(slider)
+
+    # Not merging relays the last action as-is, flushing relays right away.
+    latest = SliderObserver()
+    latest_observer = DebouncedActionObserver(latest, 1, merge=False, timer=timer)
+    latest_observer.start_observing(slider)
+    slider.value = 10
+    slider.value = 11
+    latest_observer.flush()
+    assert latest.observed == [({"value": 10}, {"value": 11})]
+    timer.advance(1)
+    assert len(latest.observed) == 1
+
+    # Each action is relayed only once.
+    slider.update(value=12, label="b")
+    slider.value = 13
+    timer.advance(1)
+    assert latest.observed[1:] == [
+        ({"value": 11, "label": "a"}, {"value": 12, "label": "b"}),
+        ({"value": 12}, {"value": 13}),
+    ]
+    slider.update(value=14, label="c")
+    timer.advance(1)
+    assert latest.observed[3:] == [
+        ({"value": 13, "label": "b"}, {"value": 14, "label": "c"}),
+    ]
+    latest_observer.stop_observing(slider)
+
+    # Failures after the window closes go to the exception handler.
+    class FailingObserver(ActionObserver):
+        def __observe__(self, action, phase):
+            raise ValueError()
+
+    failing_observer = DebouncedActionObserver(FailingObserver(), 1, timer=timer)
+    failing_observer.start_observing(slider)
+    slider.value = 15
+    with pytest.raises(ActionObserversFailedError) as exc_info:
+        timer.advance(1)
+    (exception_info,) = exc_info.value.exception_infos
+    assert exception_info.observer is failing_observer.observer
+    assert type(exception_info.action) is Action
+    assert exception_info.action.change.new_values["value"] == 15
+
+    with pytest.raises(ValueError):
+        DebouncedActionObserver(debounced, 0)
+    with pytest.raises(TypeError):
+        ThrottledActionObserver(debounced, 1, timer=object())
+
+
+if __name__ == "__main__":
+    pytest.main()
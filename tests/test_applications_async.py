@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from threading import Event, Thread
+
+import pytest
+
+from objetto import POST, PRE, Application, Object, attribute
+from objetto._applications import TemporaryContextException
+from objetto.exceptions import ActionObserversFailedError
+from objetto.observers import ActionObserver, AsyncActionObserver
+
+
+class Person(Object):
+    name = attribute(str, default="Albert")
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_async_write_context():
+    app = Application()
+    person = Person(app)
+    observed = []
+
+    class PersonObserver(ActionObserver):
+        async def __observe__(self, action, phase):
+            await asyncio.sleep(0)
+            observed.append((action.change.new_values["name"], phase))
+
+    observer = PersonObserver()
+    observer.start_observing(person)
+
+    async def write():
+        async with app.async_write_context():
+            person.name = "Einstein"
+            await asyncio.sleep(0)
+            assert not observed
+        assert sorted(observed, key=lambda o: o[1] is POST) == [
+            ("Einstein", PRE),
+            ("Einstein", POST),
+        ]
+
+        async with app.async_read_context(app.take_snapshot()):
+            assert person.name == "Einstein"
+
+    run(write())
+    assert person.name == "Einstein"
+
+
+def test_async_write_context_does_not_block_loop():
+    app = Application()
+    person = Person(app)
+
+    locked = Event()
+    release = Event()
+
+    def hold():
+        with app.write_context():
+            locked.set()
+            release.wait(5)
+
+    holder = Thread(target=hold)
+    holder.start()
+    assert locked.wait(5)
+
+    ticks = []
+
+    async def tick():
+        while not release.is_set():
+            ticks.append(None)
+            if len(ticks) == 3:
+                release.set()
+            await asyncio.sleep(0.001)
+
+    async def write():
+        async with app.async_write_context():
+            person.name = "Einstein"
+
+    async def main():
+        await asyncio.gather(write(), tick())
+
+    try:
+        run(main())
+    finally:
+        release.set()
+        holder.join()
+    assert len(ticks) >= 3
+    assert person.name == "Einstein"
+
+
+def test_async_write_context_rollback():
+    app = Application()
+    person = Person(app)
+
+    async def fail():
+        async with app.async_write_context():
+            person.name = "Einstein"
+            raise ValueError()
+
+    with pytest.raises(ValueError):
+        run(fail())
+    assert person.name == "Albert"
+
+    async def temporary():
+        async with app.async_write_context():
+            person.name = "Einstein"
+            raise TemporaryContextException()
+
+    run(temporary())
+    assert person.name == "Albert"
+
+
+def test_async_write_context_ownership():
+    app = Application()
+    person = Person(app)
+
+    errors = []
+
+    async def write_a(event):
+        async with app.async_write_context():
+            person.name = "A"
+            event.set()
+            await asyncio.sleep(0.01)
+
+    async def write_b(event):
+        await event.wait()
+        try:
+            person.name = "B"
+        except RuntimeError:
+            errors.append("sync")
+        async with app.async_write_context():
+            person.name = "B"
+
+    async def main():
+        event = asyncio.Event()
+        await asyncio.gather(write_a(event), write_b(event))
+
+    run(main())
+    assert errors == ["sync"]
+    assert person.name == "B"
+
+
+def test_async_write_context_isolation():
+    app = Application()
+    person = Person(app, name="A")
+
+    seen = []
+
+    async def write(event):
+        with pytest.raises(ValueError):
+            async with app.async_write_context():
+                person.name = "UNCOMMITTED"
+                new_person = Person(app, name="NEW")
+                event.set()
+                await asyncio.sleep(0.01)
+                assert person.name == "UNCOMMITTED"
+                raise ValueError()
+        return new_person
+
+    async def read(event):
+        await event.wait()
+        seen.append(person.name)
+        with app.read_context():
+            seen.append(person.name)
+
+    async def main():
+        event = asyncio.Event()
+        new_person, _ = await asyncio.gather(write(event), read(event))
+        return new_person
+
+    new_person = run(main())
+    assert seen == ["A", "A"]
+    assert person.name == "A"
+    with pytest.raises(RuntimeError):
+        new_person.name
+
+
+def test_async_observer_errors():
+    app = Application()
+    person = Person(app)
+
+    class FailingObserver(ActionObserver):
+        async def __observe__(self, action, phase):
+            raise ValueError(phase)
+
+    observer = FailingObserver()
+    observer.start_observing(person)
+
+    async def write():
+        async with app.async_write_context():
+            person.name = "Einstein"
+
+    with pytest.raises(ActionObserversFailedError) as info:
+        run(write())
+    assert len(info.value.exception_infos) == 2
+    assert person.name == "Einstein"
+
+    with pytest.raises(ActionObserversFailedError):
+        person.name = "Albert"
+
+
+def test_async_action_observer():
+    app = Application()
+    person = Person(app)
+    observed = []
+    failures = []
+
+    class PersonObserver(AsyncActionObserver):
+        async def __observe__(self, action, phase):
+            name = action.change.new_values["name"]
+            await asyncio.sleep(0.01 if name == "A" else 0)
+            if name == "C":
+                raise ValueError(name)
+            observed.append((name, phase))
+
+        def __observe_exception__(self, exception_info):
+            failures.append(exception_info)
+
+    # Without a loop, observe on the running one.
+    with pytest.raises(ValueError):
+        PersonObserver().start_observing(person)
+
+    async def start():
+        running_observer = PersonObserver()
+        running_observer.start_observing(person)
+        running_observer.stop_observing(person)
+        return running_observer.loop
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(start()) is loop
+    finally:
+        loop.close()
+
+    loop = asyncio.new_event_loop()
+    try:
+        observer = PersonObserver()
+        observer.start_observing(person, loop=loop, phases=(POST,))
+        assert observer.loop is loop
+        with pytest.raises(ValueError):
+            observer.start_observing(person, loop=asyncio.new_event_loop())
+
+        for name in "ABCD":
+            person.name = name
+        assert not observed
+
+        loop.run_until_complete(observer.join())
+        assert observed == [("A", POST), ("B", POST), ("D", POST)]
+        (failure,) = failures
+        assert failure.observer is observer
+        assert failure.action.change.new_values["name"] == "C"
+        assert failure.phase is POST
+        assert isinstance(failure.exception, ValueError)
+    finally:
+        loop.close()
+
+
+def test_async_action_observer_bounded_queue():
+    app = Application()
+    person = Person(app)
+    observed = []
+
+    class PersonObserver(AsyncActionObserver):
+        async def __observe__(self, action, phase):
+            await asyncio.sleep(0.001)
+            observed.append(action.change.new_values["name"])
+
+    # Can't wait for the queue to drain in the loop's thread.
+    loop = asyncio.new_event_loop()
+    observer = PersonObserver()
+    observer.start_observing(person, loop=loop, maxsize=2, phases=(POST,))
+    person.name = "A"
+    person.name = "B"
+    with pytest.raises(RuntimeError):
+        person.name = "C"
+    assert person.name == "C"
+    loop.run_until_complete(observer.join())
+    assert observed == ["A", "B", "C"]
+    observer.stop_observing(person)
+    loop.close()
+
+    # Writers in other threads wait for room.
+    del observed[:]
+    loop = asyncio.new_event_loop()
+    running = Event()
+    loop.call_soon(running.set)
+    thread = Thread(target=loop.run_forever)
+    thread.start()
+    running.wait()
+
+    async def join():
+        await asyncio.wait_for(observer.join(), 5)
+
+    try:
+        observer = PersonObserver()
+        observer.start_observing(person, loop=loop, maxsize=2, phases=(POST,))
+        names = [str(i) for i in range(20)]
+        for name in names:
+            person.name = name
+        asyncio.run_coroutine_threadsafe(join(), loop).result()
+        assert observed == names
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_async_action_observer_commit_order():
+    class Counter(Object):
+        value = attribute(int, default=0)
+
+    app = Application()
+    counter = Counter(app)
+    observed = []
+
+    class CounterObserver(AsyncActionObserver):
+        def __observe__(self, action, phase):
+            observed.append(action.change.new_values["value"])
+
+    loop = asyncio.new_event_loop()
+    running = Event()
+    loop.call_soon(running.set)
+    loop_thread = Thread(target=loop.run_forever)
+    loop_thread.start()
+    running.wait()
+
+    async def join():
+        await asyncio.wait_for(observer.join(), 5)
+
+    def increment():
+        for _ in range(500):
+            with app.write_context():
+                counter.value += 1
+
+    try:
+        observer = CounterObserver()
+        observer.start_observing(counter, loop=loop, maxsize=8, phases=(POST,))
+        threads = [Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        asyncio.run_coroutine_threadsafe(join(), loop).result()
+        assert observed == list(range(1, 2001))
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+
+if __name__ == "__main__":
+    pytest.main()
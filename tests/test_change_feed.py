@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import pickle
+
+import pytest
+
+from objetto import (
+    POST,
+    Application,
+    Object,
+    attribute,
+    dict_attribute,
+    list_attribute,
+    root,
+    set_attribute,
+)
+from objetto.applications import ChangeRecord
+from objetto.observers import ActionObserver
+from objetto.reactions import reaction
+
+
+class Leaf(Object):
+    value = attribute(int, default=0)
+
+
+class Branch(Object):
+    name = attribute(str, default="")
+    leaves = list_attribute(Leaf)
+    tags = set_attribute(str)
+    props = dict_attribute(int, key_types=str)
+
+
+class Tree(Object):
+    branches = list_attribute(Branch)
+    count = attribute(int, default=0)
+
+    @reaction
+    def __count(self, action, phase):
+        if action.sender is not self and phase is POST:
+            self.count = len(self.branches)
+
+
+class App(Application):
+    tree = root(Tree)
+
+
+def test_change_feed():
+    app = App()
+    records = []
+    with app.change_feed(records.extend):
+        with app.write_context():
+            branch = Branch(app, name="a")
+            branch.leaves.extend(Leaf(app, value=i) for i in range(3))
+            app.tree.branches.append(branch)
+        branch.tags.update(("x", "y"))
+        branch.tags.remove("x")
+        branch.props.update({"k": 1, "j": 2})
+        del branch.props["k"]
+        branch.leaves.move(0, 3)
+        branch.leaves[1] = Leaf(app, value=9)
+        del branch.leaves[0]
+    app.tree.branches.append(Branch(app, name="b"))
+
+    assert all(isinstance(r, ChangeRecord) for r in records)
+    assert records[0].obj_type is not None
+    deletes = [r for r in records if r.change_type == "ListDelete"]
+    assert len(deletes) == 1 and deletes[0].obj_type is None
+
+    replica = App()
+    replica.replay(pickle.loads(pickle.dumps(records)))
+    assert replica.tree.branches[0].data == branch.data
+    assert replica.tree.count == 1
+    assert replica.tree.branches[0]._parent._parent is replica.tree
+
+
+def test_replay_catch_up():
+    app, replica = App(), App()
+    batches = []
+    feed = app.change_feed(batches.append)
+
+    app.tree.branches.append(Branch(app, name="a"))
+    leaf = Leaf(app, value=1)
+    app.tree.branches[0].leaves.append(leaf)
+
+    for batch in batches:
+        replica.replay(batch)
+    del batches[:]
+    assert replica.tree.data == app.tree.data
+
+    # Objects that are gone get released.
+    del app.tree.branches[0].leaves[0]
+    del leaf
+    gc.collect()
+    app.tree.branches[0].name = "b"
+    assert any(r.change_type == "Release" for b in batches for r in b)
+
+    for batch in batches:
+        replica.replay(batch)
+    assert replica.tree.data == app.tree.data
+    assert replica.tree.branches[0].name == "b"
+
+    feed.close()
+    count = len(batches)
+    app.tree.branches[0].name = "c"
+    assert len(batches) == count
+
+
+def test_replay_suspends_reactions_and_observers():
+    class Observer(ActionObserver):
+        def __observe__(self, action, phase):
+            received.append(action)
+
+    app, replica = App(), App()
+    received = []
+    records = []
+    with app.change_feed(records.extend):
+        app.tree.branches.append(Branch(app, name="a"))
+    assert app.tree.count == 1
+    assert [r.change_type for r in records].count("Update") == 2
+
+    observer = Observer()
+    observer.start_observing(replica.tree)
+    replica.replay(records)
+    assert not received
+    assert replica.tree.count == 1
+    assert len(replica.tree.branches) == 1
+
+
+def test_replay_errors():
+    app = App()
+    with pytest.raises(ValueError):
+        app.replay([ChangeRecord(0, None, "Update", pickle.dumps(({}, {})))])
+    with pytest.raises(ValueError):
+        app.replay([ChangeRecord(("tree",), None, "Unknown", b"")])
+    with pytest.raises(TypeError):
+        app.change_feed(None)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from objetto import Application, Object, attribute, list_attribute, root
+from objetto import _snapshot_log
+from objetto.applications import ApplicationSnapshotLog
+
+
+class Leaf(Object):
+    value = attribute(int, default=0)
+
+
+class Branch(Object):
+    name = attribute(str, default="")
+    leaves = list_attribute(Leaf)
+
+
+class Tree(Object):
+    branches = list_attribute(Branch)
+
+
+class App(Application):
+    tree = root(Tree)
+
+
+def _make_app():
+    app = App()
+    with app.write_context():
+        for name in ("a", "b"):
+            branch = Branch(app, name=name)
+            branch.leaves.extend(Leaf(app, value=i) for i in range(3))
+            app.tree.branches.append(branch)
+    return app
+
+
+def _dump(app):
+    return [
+        (branch.name, [leaf.value for leaf in branch.leaves])
+        for branch in app.tree.branches
+    ]
+
+
+def test_append_and_load(tmp_path):
+    path = str(tmp_path / "app.log")
+    app = _make_app()
+    with ApplicationSnapshotLog(path) as log:
+        log.append(app.take_snapshot())
+
+    new_app = App()
+    with ApplicationSnapshotLog(path) as log:
+        log.load(new_app)
+
+    assert _dump(new_app) == _dump(app)
+    assert new_app.tree.data == app.tree.data
+
+    branch = new_app.tree.branches[1]
+    leaf = branch.leaves[2]
+    assert leaf._parent._parent is branch
+    assert branch._parent._parent is new_app.tree
+    assert leaf.app is new_app
+
+    # Loaded objects are fully functional.
+    leaf.value = 42
+    branch.leaves.append(Leaf(new_app, value=3))
+    assert _dump(new_app) == [("a", [0, 1, 2]), ("b", [0, 1, 42, 3])]
+    assert new_app.tree.branches[1].data.leaves[2].value == 42
+
+
+def test_incremental_append(tmp_path):
+    path = str(tmp_path / "app.log")
+    app = _make_app()
+    with ApplicationSnapshotLog(path) as log:
+        log.append(app.take_snapshot())
+        size = tmp_path.joinpath("app.log").stat().st_size
+
+        app.tree.branches[0].leaves[0].value = 10
+        log.append(app.take_snapshot())
+        small_size = tmp_path.joinpath("app.log").stat().st_size - size
+        assert small_size < size
+
+        del app.tree.branches[1]
+        log.append(app.take_snapshot())
+
+    new_app = App()
+    with ApplicationSnapshotLog(path) as log:
+        log.load(new_app)
+    assert _dump(new_app) == [("a", [10, 1, 2])]
+
+    # Appending after loading keeps going incrementally.
+    with ApplicationSnapshotLog(path) as log:
+        log.load(new_app)
+        new_app.tree.branches[0].name = "c"
+        log.append(new_app.take_snapshot())
+
+    newer_app = App()
+    with ApplicationSnapshotLog(path) as log:
+        log.load(newer_app)
+    assert _dump(newer_app) == [("c", [10, 1, 2])]
+
+
+def test_index_segments(tmp_path):
+    path = tmp_path / "app.log"
+
+    def index_size():
+        data = path.read_bytes()
+        return _snapshot_log._TRAILER.unpack(data[-_snapshot_log._TRAILER.size :])[1]
+
+    app = App()
+    with app.write_context():
+        branch = Branch(app)
+        branch.leaves.extend(Leaf(app) for _ in range(10))
+        app.tree.branches.append(branch)
+
+    with ApplicationSnapshotLog(str(path)) as log:
+        log.append(app.take_snapshot())
+        full_size = index_size()
+
+        # Small changes append small index segments, until the chain gets longer
+        # than the index and a full one is written again.
+        sizes = []
+        for i in range(10):
+            branch.leaves[i].value = i + 1
+            log.append(app.take_snapshot())
+            sizes.append(index_size())
+        assert sizes[0] < full_size // 2
+        assert max(sizes) >= full_size
+
+    new_app = App()
+    with ApplicationSnapshotLog(str(path)) as log:
+        log.load(new_app)
+        leaves = new_app.tree.branches[0].leaves
+        assert [leaf.value for leaf in leaves] == list(range(1, 11))
+
+        leaves[0].value = 0
+        log.append(new_app.take_snapshot())
+        assert index_size() < full_size // 2
+
+    newer_app = App()
+    with ApplicationSnapshotLog(str(path)) as log:
+        log.load(newer_app)
+    leaves = newer_app.tree.branches[0].leaves
+    assert [leaf.value for leaf in leaves] == [0] + list(range(2, 11))
+
+
+def test_lazy_load(tmp_path, monkeypatch):
+    path = str(tmp_path / "app.log")
+    app = _make_app()
+    with ApplicationSnapshotLog(path) as log:
+        log.append(app.take_snapshot())
+
+    loaded = []
+
+    class RecordUnpickler(_snapshot_log._RecordUnpickler):
+        def load(self):
+            record = super(RecordUnpickler, self).load()
+            loaded.append(record)
+            return record
+
+    monkeypatch.setattr(_snapshot_log, "_RecordUnpickler", RecordUnpickler)
+
+    new_app = App()
+    with ApplicationSnapshotLog(path) as log:
+        log.load(new_app)
+        assert not loaded
+
+        assert new_app.tree.branches[0].leaves[1].value == 1
+        assert loaded
+        count = len(loaded)
+        assert new_app.tree.branches[0].leaves[1].value == 1
+        assert len(loaded) == count
+
+    assert new_app.tree.data == app.tree.data
+
+    # Closing the log loads the stores that were not loaded yet.
+    del loaded[:]
+    new_app = App()
+    with ApplicationSnapshotLog(path) as log:
+        log.load(new_app)
+        assert not loaded
+    assert loaded
+    del loaded[:]
+    assert new_app.tree.data == app.tree.data
+    assert not loaded
+
+
+def test_invalid_log(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"not a log")
+    with pytest.raises(ValueError):
+        ApplicationSnapshotLog(str(path))
+
+    with ApplicationSnapshotLog(str(tmp_path / "empty.log")) as log:
+        with pytest.raises(ValueError):
+            log.load(App())
+
+    with pytest.raises(TypeError):
+        with ApplicationSnapshotLog(str(tmp_path / "other.log")) as log:
+            log.append(App())
+
+
+if __name__ == "__main__":
+    pytest.main()
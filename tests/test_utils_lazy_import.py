@@ -35,6 +35,13 @@ def test_get_path():
     with pytest.raises(ValueError):
         get_path(LocalClass)
 
+    # Paths that point to missing attributes are not consistent.
+    class MissingClass(object):
+        __qualname__ = "MyClass.MissingClass"
+
+    with pytest.raises(ValueError):
+        get_path(MissingClass)
+
 
 def test_decorate_path():
     assert decorate_path("abstractmethod", "abc") == "abc|abstractmethod"
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from objetto.utils.storage import SlotAllocator, SlotStorage, Storage
+
+
+class Cls(object):
+    slot = None
+
+
+def get_slot(key):
+    return key.slot
+
+
+def make_keys(allocator, count):
+    keys = [Cls() for _ in range(count)]
+    for key in keys:
+        key.slot = allocator.allocate(key)
+    return keys
+
+
+def test_storage():
+    key_a, key_b = Cls(), Cls()
+    storage_a = Storage({key_a: 1})
+    storage_b = storage_a.update({key_b: 2})
+    assert storage_a.query(key_a) == 1
+    with pytest.raises(KeyError):
+        storage_a.query(key_b)
+    assert storage_b.to_dict() == {key_a: 1, key_b: 2}
+    assert storage_b.update({}) is storage_b
+
+    evolver = storage_b.evolver()
+    evolver.update({key_a: 3})
+    assert evolver.query(key_a) == 3
+    assert evolver.persistent().to_dict() == {key_a: 3, key_b: 2}
+    assert storage_b.query(key_a) == 1
+
+
+def test_storage_copy():
+    key = Cls()
+    storage = Storage({key: 1})
+    memo = {}
+    storage_copy = deepcopy(storage, memo)
+    assert storage_copy is not storage
+    assert storage_copy.to_dict() == {memo[id(key)]: 1}
+    assert pickle.loads(pickle.dumps(Storage())).to_dict() == {}
+
+
+def test_storage_reclamation():
+    keys = [Cls() for _ in range(10)]
+    storage_a = Storage(dict((k, i) for i, k in enumerate(keys)))
+    storage_b = storage_a.update({keys[0]: -1})
+
+    del keys[5:]
+    gc.collect()
+    assert len(storage_a.to_dict()) == 5
+    assert len(storage_b.to_dict()) == 5
+    assert storage_b.update({keys[1]: -2}).query(keys[1]) == -2
+
+
+def test_slot_allocator():
+    allocator = SlotAllocator()
+    keys = make_keys(allocator, 3)
+    assert [k.slot for k in keys] == [0, 1, 2]
+    assert allocator.get(1) is keys[1]
+    assert allocator.count == 3
+
+    del keys[1]
+    gc.collect()
+    assert allocator.get(1) is None
+    assert allocator.count == 2
+    assert allocator.pop_released() == [1]
+    assert allocator.pop_released() == []
+
+    (key,) = make_keys(allocator, 1)
+    assert key.slot == 1
+    assert allocator.size == 3
+    assert allocator.count == 3
+
+
+def test_slot_storage():
+    allocator = SlotAllocator()
+    key_a, key_b = make_keys(allocator, 2)
+    storage_a = SlotStorage(get_slot, {key_a: 1})
+    storage_b = storage_a.update({key_b: 2})
+    assert storage_a.query(key_a) == 1
+    with pytest.raises(KeyError):
+        storage_a.query(key_b)
+    with pytest.raises(KeyError):
+        storage_a.query(Cls())
+    assert storage_b.to_dict() == {key_a: 1, key_b: 2}
+    assert storage_b.to_slots() == {0: (key_a, 1), 1: (key_b, 2)}
+    assert (storage_a.count, storage_b.count) == (1, 2)
+    assert storage_b.update_slots({1: (key_b, 3)}).query(key_b) == 3
+    assert storage_b.update({}) is storage_b
+
+    # Recycled slots don't see values of dead keys.
+    del key_b
+    gc.collect()
+    (key_c,) = make_keys(allocator, 1)
+    assert key_c.slot == 1
+    with pytest.raises(KeyError):
+        storage_b.query(key_c)
+    storage_c = storage_b.discard(allocator.pop_released())
+    assert storage_c.to_slots() == {0: (key_a, 1)}
+    assert storage_c.count == 1
+    assert storage_c.discard([0]) is storage_c
+
+
+def test_slot_storage_diff():
+    allocator = SlotAllocator()
+    key_a, key_b, key_c = make_keys(allocator, 3)
+    storage_a = SlotStorage(get_slot, {key_a: 1, key_b: 2})
+    storage_b = storage_a.update({key_a: 3}).update({key_c: 4})
+    expected = {0: ((key_a, 1), (key_a, 3)), 2: (None, (key_c, 4))}
+    assert storage_a.diff(storage_b) == expected
+    assert storage_b.diff(storage_a) == dict(
+        (s, (n, o)) for s, (o, n) in expected.items()
+    )
+    assert storage_b.diff(storage_b) == {}
+
+    # Storages from different lineages (or too far apart) get compared slot by slot.
+    storage_c = SlotStorage(get_slot, {key_a: 3, key_b: 2})
+    assert storage_c.diff(storage_b) == {2: (None, (key_c, 4))}
+    storage_d = storage_a
+    for i in range(SlotStorage.max_delta_slots + 1):
+        storage_d = storage_d.update({key_c: i})
+    assert storage_a.diff(storage_d) == {
+        2: (None, (key_c, SlotStorage.max_delta_slots))
+    }
+
+
+def test_slot_storage_copy():
+    allocator = SlotAllocator()
+    (key,) = make_keys(allocator, 1)
+    storage = SlotStorage(get_slot, {key: 1})
+    memo = {}
+    storage_copy, allocator_copy = deepcopy((storage, allocator), memo)
+    assert storage_copy.to_dict() == {memo[id(key)]: 1}
+    assert allocator_copy.get(0) is memo[id(key)]
+    assert (storage_copy.count, allocator_copy.count) == (1, 1)
+
+    storage_copy, allocator_copy, (key_copy,) = pickle.loads(
+        pickle.dumps((storage, allocator, [key]))
+    )
+    assert storage_copy.query(key_copy) == 1
+    assert allocator_copy.get(0) is key_copy
@@ -1,7 +1,15 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
 import pytest
 
-from objetto.utils.subject_observer import Observer, ObserverToken, Subject
+from objetto.utils.subject_observer import (
+    Observer,
+    ObserverLanes,
+    ObserverToken,
+    Subject,
+)
 
 
 def test_send_payload():
@@ -38,6 +46,109 @@ def test_send_payload():
     assert observer_b.payload == payload
 
 
+def test_send_filtered():
+    class MyObserver(Observer):
+        def __init__(self):
+            self.payloads = []
+
+        def __observe__(self, *payload):
+            self.payloads.append(payload)
+
+    def get_keys(*payload):
+        requested.append(payload)
+        return payload
+
+    subject = Subject()
+    requested = []
+
+    observer_all = MyObserver()
+    subject.register_observer(observer_all)
+    assert not subject.send_filtered(get_keys, 1, 2)
+    assert not requested
+
+    observer_a = MyObserver()
+    subject.register_observer(observer_a, keys=(1, 3))
+    observer_b = MyObserver()
+    subject.register_observer(observer_b, keys=(4,))
+
+    assert not subject.send_filtered(get_keys, 1, 2)
+    assert not subject.send_filtered(get_keys, 2, 3)
+    assert not subject.send(5)
+    assert observer_all.payloads == [(1, 2), (1, 2), (2, 3), (5,)]
+    assert observer_a.payloads == [(1, 2), (2, 3), (5,)]
+    assert observer_b.payloads == [(5,)]
+
+    subject.register_observer(observer_b)
+    subject.deregister_observer(observer_a)
+    assert not subject.send_filtered(get_keys, 1, 3)
+    assert observer_a.payloads == [(1, 2), (2, 3), (5,)]
+    assert observer_b.payloads == [(5,), (1, 3)]
+
+
+def test_lanes():
+    class MyObserver(Observer):
+        def __init__(self, name, dependency=None):
+            self.name = name
+            self.dependency = dependency
+            self.payloads = []
+
+        def __observe__(self, *payload):
+            if payload == ("meet",):
+                events[self.name].set()
+                assert events["B" if self.name == "A" else "A"].wait(5)
+            elif payload == ("fail",):
+                raise ValueError(self.name)
+            elif self.dependency is not None:
+                self.dependency.wait()
+            self.payloads.append(payload)
+            received.append((self.name, payload))
+
+    subject = Subject()
+    received = []
+    events = {"A": Event(), "B": Event()}
+
+    observer_a = MyObserver("A")
+    token_a = observer_a.start_observing(subject)
+    observer_b = MyObserver("B", dependency=token_a)
+    observer_b.start_observing(subject)
+
+    # A single worker doesn't starve lanes waiting for each other.
+    with ThreadPoolExecutor(1) as executor:
+        lanes = ObserverLanes(executor)
+        for i in range(50):
+            assert not subject.dispatch(lanes, lambda *_: (), i)
+        assert not lanes.drain(5)
+    expected = [(i,) for i in range(50)]
+    assert observer_a.payloads == observer_b.payloads == expected
+    for i in range(50):
+        assert received.index(("A", (i,))) < received.index(("B", (i,)))
+
+    with ThreadPoolExecutor(4) as executor:
+        lanes = ObserverLanes(executor)
+
+        # Different observers run concurrently.
+        subject.dispatch(lanes, lambda *_: (), "meet")
+        assert not lanes.drain(5)
+
+        # Exceptions are collected until drained.
+        subject.dispatch(lanes, lambda *_: (), "fail")
+        exception_infos = lanes.drain(5)
+        assert set(e.observer for e in exception_infos) == {observer_a, observer_b}
+        assert all(isinstance(e.exception, ValueError) for e in exception_infos)
+        assert not lanes.drain(5)
+
+        # Wait cycles are detected.
+        observer_b.dependency = None
+        observer_a.dependency = subject.get_token(observer_b)
+        subject.dispatch(lanes, lambda *_: (), "cycle")
+        assert not lanes.drain(5)
+        observer_b.dependency = token_a
+        subject.dispatch(lanes, lambda *_: (), "cycle")
+        exception_infos = lanes.drain(5)
+        assert len(exception_infos) == 2
+        assert all(isinstance(e.exception, RuntimeError) for e in exception_infos)
+
+
 def test_tokens():
     class MyObserver(Observer):
         def __init__(self, index):